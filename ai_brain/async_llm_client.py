@@ -0,0 +1,306 @@
+# ai_brain/async_llm_client.py
+
+import asyncio
+import time
+import httpx
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionChunk
+from ai_brain.mistral_api_interface import _chunk_text, _chunk_to_dict
+from ai_brain.prompts import LM_STUDIO_TTL_SECONDS
+from ai_brain.response_cache import cache_key
+
+# --- Configuration ---
+# Server URLs and models are the llm section of config.settings (see config/schema.py LLMSettings)
+HEALTH_CHECK_INTERVAL = 30      # Seconds between background health checks
+HEALTH_CHECK_TIMEOUT = 5.0
+MAX_CONSECUTIVE_FAILURES = 3    # Failed requests before a backend is taken out of rotation
+REQUEST_TIMEOUT = 300.0
+
+class Backend:
+    """
+    One OpenAI-compatible server: its client, model id, routing weight and concurrency cap.
+    """
+    def __init__(self, name, base_url, model, api_key="not-needed", weight=1.0,
+                 max_concurrency=None, fallback=False, extra_body=None, http_client=None):
+        """
+        Args:
+            name (str): Label used in logs and stats.
+            base_url (str): OpenAI-compatible API root, e.g. "http://gpu-box:1234/v1".
+            model (str): Model id as this server names it.
+            weight (float): Relative throughput; a box twice as fast gets weight 2.
+            max_concurrency (int): Requests sent to this server at once; llm.backend_concurrency
+                                   from the settings if omitted.
+            fallback (bool): Only used when no primary backend is available.
+            extra_body (dict): Server-specific request fields (LM Studio "ttl", ...).
+            http_client (httpx.AsyncClient): Shared keep-alive pool; one is created if omitted.
+        """
+        if max_concurrency is None:
+            from config.settings import get_settings
+            max_concurrency = get_settings().llm.backend_concurrency
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.fallback = fallback
+        self.extra_body = extra_body
+        self.http_client = http_client or httpx.AsyncClient(
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=HEALTH_CHECK_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_concurrency + 1, max_keepalive_connections=max_concurrency + 1)
+        )
+        self.client = AsyncOpenAI(base_url=self.base_url, api_key=api_key, http_client=self.http_client, max_retries=0)
+        self.in_flight = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+
+    def load(self):
+        """Weighted load: requests in flight (including the next one) per unit of weight."""
+        return (self.in_flight + 1) / self.weight
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.healthy = True
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+            self.healthy = False
+
+    async def check_health(self):
+        """Probe GET /models; returns and records whether the server answered."""
+        try:
+            response = await self.http_client.get(f"{self.base_url}/models", timeout=HEALTH_CHECK_TIMEOUT,
+                                                  headers={"Authorization": f"Bearer {self.client.api_key}"})
+            self.healthy = response.status_code == 200
+        except httpx.HTTPError:
+            self.healthy = False
+        if self.healthy:
+            self.consecutive_failures = 0
+        return self.healthy
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+def backends_from_env():
+    """Build the backend list from the llm settings (LM_STUDIO_URL, OLLAMA_API_BASE_URL and
+    LLM_FALLBACK_URL in the environment)."""
+    from config.settings import get_settings
+    settings = get_settings()
+    llm = settings.llm
+    backends = []
+    for i, url in enumerate(u.strip() for u in llm.lm_studio_url.split(",") if u.strip()):
+        backends.append(Backend(f"lmstudio-{i}", url, llm.lm_studio_model, api_key=llm.lm_studio_api_key,
+                                max_concurrency=llm.backend_concurrency, extra_body={"ttl": LM_STUDIO_TTL_SECONDS}))
+    for i, url in enumerate(u.strip() for u in llm.ollama_url.split(",") if u.strip()):
+        # Ollama serves the OpenAI-compatible API under /v1
+        backends.append(Backend(f"ollama-{i}", url.rstrip("/") + "/v1", llm.ollama_chat_model, api_key="ollama",
+                                max_concurrency=llm.backend_concurrency))
+    if llm.fallback_url:
+        backends.append(Backend("fallback", llm.fallback_url, llm.fallback_model,
+                                api_key=settings.api_keys.llm_fallback, fallback=True))
+    return backends
+
+class AsyncLLMClient:
+    """
+    Non-blocking counterpart of MistralAPIInterface that spreads requests over several backends.
+
+    Each request goes to the healthy primary backend with the lowest weighted load that has
+    a free slot; if it fails, the next candidate is tried, ending with the fallbacks. Adding
+    a server adds its slots to the pool, so throughput grows with the number of backends.
+    """
+    def __init__(self, backends, cache=None, health_check_interval=HEALTH_CHECK_INTERVAL):
+        """
+        Args:
+            backends (list): Backend instances, e.g. from backends_from_env().
+            cache (ResponseCache): Optional response cache shared with MistralAPIInterface.
+            health_check_interval (float): Seconds between background probes; None disables them.
+        """
+        if not backends:
+            raise ValueError("AsyncLLMClient needs at least one backend")
+        self.backends = list(backends)
+        self.cache = cache
+        self.health_check_interval = health_check_interval
+        self._health_task = None
+        self._slot_freed = asyncio.Condition()
+
+    @classmethod
+    def from_env(cls, cache=None):
+        return cls(backends_from_env(), cache=cache)
+
+    def set_backend_concurrency(self, max_concurrency):
+        """Change the per-server request cap, e.g. after a settings reload.
+
+        Requests already in flight finish normally; waiting requests see the new cap the
+        next time a slot is released. HTTP connection pools keep the size they were
+        created with, so raising the cap far above it queues requests in httpx instead.
+        """
+        for backend in self.backends:
+            backend.max_concurrency = max_concurrency
+
+    def _candidates(self):
+        """Backends to try, best first: healthy primaries by load, then fallbacks, then unhealthy ones."""
+        def rank(backend):
+            return (not backend.healthy, backend.fallback, backend.load())
+        return sorted(self.backends, key=rank)
+
+    async def _acquire(self, exclude):
+        """Wait for a free slot on the best remaining backend and reserve it."""
+        async with self._slot_freed:
+            while True:
+                candidates = [b for b in self._candidates() if b not in exclude]
+                if not candidates:
+                    return None
+                # Prefer a backend of the best tier that has a slot free right now
+                best = candidates[0]
+                tier = [b for b in candidates if (b.healthy, b.fallback) == (best.healthy, best.fallback)]
+                free = [b for b in tier if b.in_flight < b.max_concurrency]
+                if free:
+                    backend = free[0]
+                    backend.in_flight += 1
+                    backend.requests += 1
+                    return backend
+                await self._slot_freed.wait()
+
+    async def _release(self, backend):
+        backend.in_flight -= 1
+        async with self._slot_freed:
+            self._slot_freed.notify_all()
+
+    async def get_completion(self, messages, temperature=0.7, max_tokens=250, stream=False, seed=None):
+        """
+        Same contract as MistralAPIInterface.get_completion, but awaitable.
+
+        Returns:
+            Union[str, AsyncIterator]: The response text, or an async iterator of
+                                       ChatCompletionChunk when stream=True.
+                                       Returns None if every backend failed.
+
+        A stream holds its backend's concurrency slot until it is exhausted or closed.
+        Callers that may stop iterating early must aclose() it, e.g.
+        ``async with contextlib.aclosing(await llm.get_completion(..., stream=True)) as stream:``;
+        otherwise the slot is only freed when the generator is garbage collected.
+        """
+        if self._health_task is None and self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+        key = None
+        if self.cache is not None:
+            # Backends may name the model differently; key on the primary model id
+            key = cache_key(self.backends[0].model, messages, temperature, max_tokens, seed)
+            if stream:
+                chunks = self.cache.get_chunks(key)
+                if chunks is not None:
+                    return _replay(chunks)
+            else:
+                text = self.cache.get_text(key)
+                if text is not None:
+                    return text
+
+        tried = []
+        while True:
+            backend = await self._acquire(tried)
+            if backend is None:
+                print(f"All LLM backends failed: {[b.name for b in tried]}")
+                return None
+            tried.append(backend)
+            try:
+                response = await backend.client.chat.completions.create(
+                    model=backend.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=stream,
+                    **({"seed": seed} if seed is not None else {}),
+                    extra_body=backend.extra_body
+                )
+            except Exception as e:
+                print(f"Error calling LLM backend {backend.name}: {e}")
+                backend.record_failure()
+                await self._release(backend)
+                continue
+
+            if stream:
+                # The slot stays reserved until the caller has drained or closed the stream
+                return self._stream(backend, response, key)
+
+            backend.record_success()
+            await self._release(backend)
+            if response.choices and response.choices[0].message:
+                content = response.choices[0].message.content
+                if key is not None and content is not None:
+                    self.cache.put(key, content)
+                return content
+            print(f"Received an empty response from {backend.name}.")
+            return None
+
+    async def _stream(self, backend, response, key):
+        chunks = []
+        try:
+            async for chunk in response:
+                if key is not None:
+                    chunks.append(_chunk_to_dict(chunk))
+                yield chunk
+            backend.record_success()
+            if key is not None:
+                self.cache.put(key, "".join(_chunk_text(chunk) or "" for chunk in chunks), chunks)
+        except Exception as e:
+            print(f"Error streaming from LLM backend {backend.name}: {e}")
+            backend.record_failure()
+            raise
+        finally:
+            await self._release(backend)
+
+    async def check_health(self):
+        """Probe every backend concurrently; returns {name: healthy}."""
+        results = await asyncio.gather(*(backend.check_health() for backend in self.backends))
+        async with self._slot_freed:
+            self._slot_freed.notify_all()
+        return {backend.name: healthy for backend, healthy in zip(self.backends, results)}
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    def stats(self):
+        """Per-backend request counts and state."""
+        return [backend.stats() for backend in self.backends]
+
+    async def aclose(self):
+        """Stop health checks and close the keep-alive pools."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(*(backend.http_client.aclose() for backend in self.backends))
+
+async def _replay(chunks):
+    for chunk in chunks:
+        yield ChatCompletionChunk.model_validate(chunk)
+
+# --- Example Usage (for testing this file directly) ---
+if __name__ == "__main__":
+    async def demo():
+        llm = AsyncLLMClient.from_env()
+        print("Health:", await llm.check_health())
+        messages = [
+            {"role": "system", "content": "You are a helpful AI assistant."},
+            {"role": "user", "content": "Tell me a short, interesting fact about space."}
+        ]
+        start = time.perf_counter()
+        answers = await asyncio.gather(*(llm.get_completion(messages, max_tokens=100, seed=i) for i in range(4)))
+        print(f"4 completions in {time.perf_counter() - start:.1f}s")
+        for answer in answers:
+            print("-", answer)
+        print(llm.stats())
+        await llm.aclose()
+
+    asyncio.run(demo())
@@ -1,53 +1,82 @@
 # ai_brain/mistral_api_interface.py
 
-import os
 from openai import OpenAI # We use the standard OpenAI library
-from dotenv import load_dotenv # To load environment variables
-
-# Load environment variables from the .env file
-load_dotenv()
+from openai.types.chat import ChatCompletionChunk
+from ai_brain.prompts import LM_STUDIO_TTL_SECONDS
+from ai_brain.response_cache import cache_key
 
 # --- Configuration ---
-# Get the LM Studio API base URL and dummy API key from environment variables
-# Make sure these are set in your project's .env file
-LM_STUDIO_URL = os.getenv("LM_STUDIO_URL", "http://localhost:1234/v1") # Default to common LM Studio address
-LM_STUDIO_API_KEY = os.getenv("LM_STUDIO_API_KEY", "lm-studio") # Default dummy key
+# The LM Studio URL and API key are llm.lm_studio_url and llm.lm_studio_api_key in config.settings
+# (LM_STUDIO_URL and LM_STUDIO_API_KEY in .env), read when an interface is created
+
+def _chunk_to_dict(chunk):
+    return chunk.model_dump(mode="json", exclude_unset=True)
+
+def _chunk_text(chunk):
+    choices = chunk.get("choices") or []
+    return choices[0].get("delta", {}).get("content") if choices else None
 
 class MistralAPIInterface:
     """
     Handles communication with the LM Studio local API running a Mistral model.
     """
-    def __init__(self, model_name):
+    def __init__(self, model_name, keep_alive=LM_STUDIO_TTL_SECONDS, cache=None):
         """
         Initializes the MistralAPIInterface.
 
         Args:
             model_name (str): The identifier of the model loaded in LM Studio.
                               E.g., "lmstudio-community/Mistral-Small-3.1-24B-Instruct-2503-GGUF/Mistral-Small-3.1-2403-Q3_K_L.gguf"
+            keep_alive (int): Seconds LM Studio keeps the model, and with it the cached
+                              prompt prefix, loaded after a request. None uses the server default.
+            cache (ResponseCache): Optional ai_brain.response_cache.ResponseCache. Identical requests
+                                   (model, messages, temperature, max_tokens, seed) are then answered
+                                   from it instead of the server.
         """
         self.model_name = model_name
+        self.keep_alive = keep_alive
+        self.cache = cache
         # Initialize the OpenAI client, pointing it to the LM Studio server
-        self.client = OpenAI(base_url=LM_STUDIO_URL, api_key=LM_STUDIO_API_KEY)
+        from config.settings import get_settings
+        llm = get_settings().llm
+        self.client = OpenAI(base_url=llm.lm_studio_url, api_key=llm.lm_studio_api_key)
         print(f"Initialized MistralAPIInterface for model: {self.model_name}")
-        print(f"API Base URL: {LM_STUDIO_URL}")
+        print(f"API Base URL: {llm.lm_studio_url}")
 
 
-    def get_completion(self, messages, temperature=0.7, max_tokens=250, stream=False):
+    def get_completion(self, messages, temperature=0.7, max_tokens=250, stream=False, seed=None):
         """
         Sends messages to the LLM and gets a completion response.
 
+        Keep the leading messages identical between calls (see ai_brain.prompts.build_chat_messages)
+        so the server can reuse the KV cache of the shared prefix.
+
         Args:
             messages (list): A list of message dictionaries in the OpenAI format
                              (e.g., [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}])
             temperature (float): Controls randomness (0.0 to 2.0). Lower is more deterministic.
             max_tokens (int): The maximum number of tokens to generate in the response.
             stream (bool): If True, streams the response token by token.
+            seed (int): Sampling seed passed to the server; part of the cache key.
 
         Returns:
             Union[str, Iterator]: If stream=False, returns the response text (str).
                                  If stream=True, returns an iterator of response chunks.
+                                 Cached streams are replayed as the same ChatCompletionChunk objects.
                                  Returns None if an error occurs.
         """
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model_name, messages, temperature, max_tokens, seed)
+            if stream:
+                chunks = self.cache.get_chunks(key)
+                if chunks is not None:
+                    return iter([ChatCompletionChunk.model_validate(chunk) for chunk in chunks])
+            else:
+                text = self.cache.get_text(key)
+                if text is not None:
+                    return text
+
         try:
             print(f"Sending completion request to model: {self.model_name}")
             # Call the chat completions endpoint
@@ -57,16 +86,24 @@ class MistralAPIInterface:
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=stream,
+                **({"seed": seed} if seed is not None else {}),
+                # LM Studio-specific: idle TTL before the model is unloaded
+                extra_body={"ttl": self.keep_alive} if self.keep_alive else None,
                 # Add other parameters here if needed (e.g., stop sequences, top_p)
             )
 
             if stream:
-                # Return the iterator directly for streaming
+                # Return the iterator directly for streaming; with a cache it is recorded as it is consumed
+                if key is not None:
+                    return self.cache.record_stream(key, response, _chunk_to_dict, _chunk_text)
                 return response
             else:
                 # Extract and return the text content for non-streaming
                 if response.choices and response.choices[0].message:
-                    return response.choices[0].message.content
+                    content = response.choices[0].message.content
+                    if key is not None and content is not None:
+                        self.cache.put(key, content)
+                    return content
                 else:
                     print("Received an empty response from the LLM.")
                     return None
@@ -0,0 +1,84 @@
+# ai_brain/prompts.py
+
+"""
+Prompt assembly shared by the horoscope and social-post generators.
+
+Every prompt is laid out as a stable prefix followed by a variable suffix. LLM servers
+(Ollama, LM Studio) keep the KV cache of the last prompt per loaded model slot and
+only prefill the tokens after the longest common prefix, so anything that is the same
+across calls must come first and byte-for-byte identical:
+
+    horoscope:  preamble -> today's sky (same for all 12 signs) -> sign focus
+    chat/post:  system message (persona + instructions) -> user message (task data)
+"""
+
+HOROSCOPE_PREAMBLE = """You are a master astrologer and research-level analyst trained in both classical and modern astrological traditions. You have been given the exact astronomical positions of all relevant celestial bodies at the moment of birth: this includes the Sun, Moon, Mercury, Venus, Mars, Jupiter, Saturn, Uranus, Neptune, Pluto, Chiron, the North and South Nodes, major asteroids (e.g., Ceres, Pallas, Juno, Vesta), and notable fixed stars.
+
+Your task is to generate a detailed, scholarly natal horoscope analysis that incorporates both the Tropical (Western) and Sidereal (Vedic) zodiac systems, and clearly explains the differences in interpretation between the two frameworks where relevant.
+
+Include the following:
+
+A full psychological and karmic profile based on planetary signs, houses, and aspects.
+
+Clear distinction between Tropical and Sidereal placements when they differ, and commentary on how these affect interpretation.
+
+An explanation of the precession of the equinoxes and how it informs the Tropical/Sidereal divide.
+
+Interpretive commentary using both traditional rulerships and modern planetary associations (e.g., Pluto with Scorpio, Uranus with Aquarius).
+
+Notable configurations (e.g., Grand Cross, Stellium, Yod) and their implications.
+
+Thematic synthesis of soul lessons, challenges, and life trajectory based on aspects, Nodes, and Chiron.
+
+Where relevant, mention modern astrological developments such as psychological astrology, evolutionary astrology, or the use of asteroids and fixed stars.
+
+Use academic-level terminology, integrate cross-tradition insights, and avoid overly generic language.
+
+Make sure this horoscope reads like a research-level document, integrating both ancient and contemporary astrological thought into a coherent, personalized interpretation, based on the following astronomical data:
+
+"""
+
+# How long the backends should keep the model (and its prompt cache) loaded between calls
+OLLAMA_KEEP_ALIVE = "30m"     # Ollama duration string
+LM_STUDIO_TTL_SECONDS = 1800  # LM Studio idle time-to-live
+
+def format_aspect(aspect):
+    return f"- {aspect['body1']} {aspect['aspect']} {aspect['body2']} at {aspect['angle']} degrees\n"
+
+def format_sky(sky):
+    """Positions and aspects of a shared Sky; identical text for every sign's prompt."""
+    text = ""
+    for planet, pos in sky.position_records().items():
+        text += f"- {planet}: {pos['degree']:.2f}° {pos['zodiac']} (longitude {pos['longitude']:.6f}), Retrograde: {'Yes' if pos['retrograde'] else 'No'}\n"
+
+    text += "\nAspects:\n"
+    text += "".join(format_aspect(aspect) for aspect in sky.aspects) if sky.aspects else "None\n"
+    return text
+
+def horoscope_prefix(sky):
+    """Static preamble plus today's sky: the part all 12 sign prompts share."""
+    return HOROSCOPE_PREAMBLE + format_sky(sky)
+
+def horoscope_suffix(view):
+    """The sign-specific tail of a horoscope prompt."""
+    text = f"\nZodiac sign: {view.sign}, ruled by {view.focus_planet}\n"
+    text += f"Aspects to {view.focus_planet}:\n"
+    text += "".join(format_aspect(aspect) for aspect in view.focus_aspects) if view.focus_aspects else "None\n"
+    return text
+
+def build_horoscope_prompt(view):
+    """Full horoscope prompt for one sign's view of the shared sky."""
+    return horoscope_prefix(view.sky) + horoscope_suffix(view)
+
+def build_chat_messages(persona, instructions, content):
+    """OpenAI-style messages with the persona and instructions as a stable system prefix.
+
+    Args:
+        persona (str): Lumina's persona prompt, unchanged between calls.
+        instructions (str): Static instructions for this kind of content (caption, story...).
+        content (str): The per-call data (news item, sky summary...).
+    """
+    return [
+        {"role": "system", "content": f"{persona}\n\n{instructions}"},
+        {"role": "user", "content": content}
+    ]
@@ -0,0 +1,145 @@
+# ai_brain/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- Configuration ---
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+def cache_key(model_name, messages, temperature, max_tokens, seed=None):
+    """Canonical SHA-256 of everything that determines a completion."""
+    payload = json.dumps(
+        {"model": model_name, "messages": messages, "temperature": temperature,
+         "max_tokens": max_tokens, "seed": seed},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Content-addressed store of LLM responses in SQLite, with TTL and LRU eviction.
+
+    Each entry keeps the response text and, when it was recorded from a stream, the raw
+    stream chunks, so a cached stream can be replayed chunk for chunk.
+    """
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                 max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES, clock=time.time):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache).
+            ttl_seconds (float): Entries older than this are treated as misses and dropped. None disables.
+            max_entries (int): Least recently used entries are evicted beyond this count.
+            max_bytes (int): ...or beyond this total payload size.
+            clock (callable): Time source, replaceable in tests.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, text TEXT, chunks TEXT, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _lookup(self, key, column):
+        with self._lock:
+            row = self._db.execute(f"SELECT {column}, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = self.clock()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None or row[0] is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def get_text(self, key):
+        """Cached response text, or None on a miss."""
+        return self._lookup(key, "text")
+
+    def get_chunks(self, key):
+        """Cached stream chunks (list of dicts), or None if no stream was recorded for key."""
+        chunks = self._lookup(key, "chunks")
+        return json.loads(chunks) if chunks is not None else None
+
+    def put(self, key, text, chunks=None):
+        """Store a response; chunks is the list of stream chunk dicts it was assembled from."""
+        chunks_json = json.dumps(chunks, separators=(",", ":")) if chunks is not None else None
+        size = len(text.encode("utf-8")) + (len(chunks_json) if chunks_json else 0)
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, text, chunks, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, chunks_json, size, now, now)
+            )
+            self._evict()
+
+    def resize(self, max_entries=None, max_bytes=None, ttl_seconds=None):
+        """Change the limits of a live cache (e.g. after a settings reload) and evict down to them."""
+        with self._lock:
+            self.max_entries = max_entries or self.max_entries
+            self.max_bytes = max_bytes or self.max_bytes
+            self.ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+            self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until within the size limits."""
+        if self.ttl_seconds is not None:
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (self.clock() - self.ttl_seconds,))
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+    def record_stream(self, key, stream, to_dict, to_text):
+        """
+        Pass a live stream through unchanged, storing it once it has been fully consumed.
+
+        Args:
+            stream (Iterator): Live chunks from the backend.
+            to_dict (callable): Serializes a chunk to a JSON-compatible dict.
+            to_text (callable): Extracts a chunk's text delta (or None).
+        """
+        chunks = []
+        for chunk in stream:
+            chunks.append(to_dict(chunk))
+            yield chunk
+        self.put(key, "".join(to_text(chunk) or "" for chunk in chunks), chunks)
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total
+        }
+
+    def close(self):
+        self._db.close()
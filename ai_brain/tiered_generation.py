@@ -0,0 +1,191 @@
+# ai_brain/tiered_generation.py
+
+"""
+Draft-and-verify generation for long outputs.
+
+A small local model writes each section; the large model then reads the draft and either
+answers PASS (a handful of output tokens; reading the draft is a fast, parallel prefill)
+or writes a replacement. Only rejected sections pay the large model's slow decode, so
+long research-style outputs finish in a fraction of the large-only time when most
+drafts pass. The verifier's check doubles as the persona-consistency gate.
+
+Short content types are configured to skip verification and run on the small model only.
+"""
+
+import re
+import time
+import ollama
+
+DRAFT_MODEL = "mistral:7b"
+LARGE_MODEL = "wizard-vicuna-uncensored:30b"
+
+# Verdict the verifier must start its reply with to accept a draft
+PASS_TOKEN = "PASS"
+# Characters of the verifier's reply needed to decide whether it is a PASS
+VERDICT_PREFIX_CHARS = 8
+# PASS as a whole word, so a rewrite opening with "Passionate..." is not taken for a verdict
+PASS_PATTERN = re.compile(rf"\s*{PASS_TOKEN}\b", re.IGNORECASE)
+
+# Sections of the research-level natal/horoscope reading, in output order
+NATAL_SECTIONS = [
+    ("Psychological and karmic profile", "Interpret the planetary signs, houses and aspects."),
+    ("Tropical and Sidereal placements", "Note where the two zodiacs differ and how that changes the reading, "
+                                         "including the precession of the equinoxes."),
+    ("Rulerships", "Use both traditional rulerships and modern planetary associations."),
+    ("Notable configurations", "Grand Cross, Stellium, Yod or other patterns present and their implications."),
+    ("Synthesis", "Soul lessons, challenges and life trajectory from the aspects, Nodes and Chiron."),
+]
+
+# Generation mode per content type:
+#   small  - draft model only
+#   large  - large model only
+#   tiered - small model drafts each section, large model verifies or rewrites it
+GENERATION_TIERS = {
+    "caption": {"mode": "small", "max_tokens": 120},
+    "comment": {"mode": "small", "max_tokens": 120},
+    "story": {"mode": "small", "max_tokens": 200},
+    "post": {"mode": "tiered", "max_tokens": 300, "persona": True},
+    "horoscope": {"mode": "tiered", "sections": NATAL_SECTIONS, "max_tokens": 350},
+}
+
+VERIFY_INSTRUCTIONS = """You are reviewing a draft written by a junior writer for the request above.
+Check it for factual consistency with the request's data, for quality, and{persona_clause} for fitting the requested tone.
+If the draft is acceptable, reply with exactly: PASS
+Otherwise reply with only the corrected replacement text, no commentary.
+
+Draft:
+{draft}"""
+
+PERSONA_CLAUSE = " for staying in character as the persona described in the system prompt,"
+
+class TieredGenerator:
+    """
+    Generates text for a content type according to GENERATION_TIERS.
+    """
+    def __init__(self, draft_model=DRAFT_MODEL, large_model=LARGE_MODEL, tiers=None, persona=None,
+                 client=None, temperature=0.7, keep_alive=None):
+        """
+        Args:
+            draft_model (str): Small Ollama model used for drafts (and small-only content).
+            large_model (str): Large Ollama model used to verify, rewrite, or generate alone.
+            tiers (dict): Per content type settings, defaults to GENERATION_TIERS.
+            persona (str): Lumina's persona prompt; sent as the system message and checked by the
+                           verifier for content types with "persona": True.
+            client (ollama.AsyncClient): Client to use; a default one is created if omitted.
+            temperature (float): Sampling temperature for drafts and rewrites.
+            keep_alive (str): Ollama keep_alive, so both models stay resident between calls.
+        """
+        self.draft_model = draft_model
+        self.large_model = large_model
+        self.tiers = tiers or GENERATION_TIERS
+        self.persona = persona
+        self.client = client or ollama.AsyncClient()
+        self.temperature = temperature
+        self.keep_alive = keep_alive
+
+    def _messages(self, prompt, persona, extra=None):
+        messages = [{"role": "system", "content": self.persona}] if persona and self.persona else []
+        messages.append({"role": "user", "content": prompt})
+        if extra:
+            messages.extend(extra)
+        return messages
+
+    async def _chat(self, model, messages, max_tokens):
+        response = await self.client.chat(model=model, messages=messages, keep_alive=self.keep_alive,
+                                          options={"temperature": self.temperature, "num_predict": max_tokens})
+        return response["message"]["content"].strip()
+
+    async def _verify(self, messages, draft, max_tokens, persona):
+        """Ask the large model to PASS the draft or rewrite it; stops reading as soon as it says PASS.
+
+        Returns:
+            tuple: (accepted, text) where text is the draft if accepted, else the rewrite.
+        """
+        review = {"role": "user", "content": VERIFY_INSTRUCTIONS.format(
+            draft=draft, persona_clause=PERSONA_CLAUSE if persona else "")}
+        stream = await self.client.chat(model=self.large_model, messages=messages + [review], stream=True,
+                                        keep_alive=self.keep_alive,
+                                        options={"temperature": self.temperature, "num_predict": max_tokens})
+        reply = ""
+        async for chunk in stream:
+            reply += chunk["message"]["content"]
+            if len(reply.lstrip()) >= VERDICT_PREFIX_CHARS or chunk.get("done"):
+                if PASS_PATTERN.match(reply):
+                    # Closing the stream cancels the request, so the large model decodes nothing more
+                    await stream.aclose()
+                    return True, draft
+        reply = reply.strip()
+        if PASS_PATTERN.match(reply):
+            return True, draft
+        return False, reply or draft
+
+    def _section_messages(self, prompt, title, instruction, written, persona):
+        """Prompt, the sections written so far, then the request for the next section."""
+        extra = [{"role": "assistant", "content": "\n\n".join(written)}] if written else []
+        if title:
+            extra.append({"role": "user", "content": f"Write only the section \"{title}\". {instruction}"})
+        return self._messages(prompt, persona, extra)
+
+    async def _section(self, prompt, title, instruction, written, max_tokens, persona):
+        """Draft one section after the ones already accepted, then verify it."""
+        messages = self._section_messages(prompt, title, instruction, written, persona)
+
+        start = time.perf_counter()
+        draft = await self._chat(self.draft_model, messages, max_tokens)
+        drafted = time.perf_counter()
+        accepted, text = await self._verify(messages, draft, max_tokens, persona)
+        verified = time.perf_counter()
+        return text, {
+            "section": title,
+            "accepted": accepted,
+            "draft_s": round(drafted - start, 3),
+            "verify_s": round(verified - drafted, 3)
+        }
+
+    async def generate(self, content_type, prompt, mode=None):
+        """
+        Generates text for a content type.
+
+        Args:
+            content_type (str): Key of the tiers table ("caption", "horoscope", ...).
+            prompt (str): The full prompt (e.g. from ai_brain.prompts).
+            mode (str): Overrides the content type's mode, e.g. "large" for a baseline run.
+
+        Returns:
+            dict: "text", "mode", "elapsed_s" and, for tiered mode, per-section "sections" stats
+                  with how many drafts were "accepted" and "rewritten".
+        """
+        tier = self.tiers[content_type]
+        mode = mode or tier["mode"]
+        max_tokens = tier.get("max_tokens", 500)
+        persona = tier.get("persona", False)
+        start = time.perf_counter()
+
+        if mode in ("small", "large"):
+            model = self.draft_model if mode == "small" else self.large_model
+            written = []
+            for title, instruction in tier.get("sections") or [(None, None)]:
+                messages = self._section_messages(prompt, title, instruction, written, persona)
+                text = await self._chat(model, messages, max_tokens)
+                written.append(f"{title}\n\n{text}" if title else text)
+            return {"text": "\n\n".join(written), "mode": mode, "elapsed_s": round(time.perf_counter() - start, 3)}
+
+        if mode != "tiered":
+            raise ValueError(f"Unknown generation mode '{mode}' for content type '{content_type}'")
+
+        written = []
+        stats = []
+        for title, instruction in tier.get("sections") or [(None, None)]:
+            text, section_stats = await self._section(prompt, title, instruction, written, max_tokens, persona)
+            written.append(f"{title}\n\n{text}" if title else text)
+            stats.append(section_stats)
+
+        accepted = sum(s["accepted"] for s in stats)
+        return {
+            "text": "\n\n".join(written),
+            "mode": mode,
+            "elapsed_s": round(time.perf_counter() - start, 3),
+            "sections": stats,
+            "accepted": accepted,
+            "rewritten": len(stats) - accepted
+        }
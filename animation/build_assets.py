@@ -0,0 +1,198 @@
+"""Precompose a character's layers for the scene template.
+
+    python -m animation.build_assets coffee
+
+Static layers (background + body) are flattened into one bitmap, and the switchable
+states (mouth open/closed, eyes open/closed) are packed into one sprite atlas with
+their on-screen position precomputed. The page then paints a single background and
+changes a state by moving one small element's background-position, instead of
+toggling full-frame <img> layers that Chromium has to recomposite every frame.
+Outputs are cached in ASSET_CACHE_DIR under a hash of the source files and layout.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+from PIL import Image
+
+# Constants
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", os.path.join(os.path.dirname(__file__), 'asset_cache'))
+SCENE_SIZE = (1080, 1920)               # .scene-container
+BACK_LAYERS = ('background', 'body')    # Flattened, back to front
+FRONT_LAYERS = ('front_stage',)         # Drawn above the states, so flattened into their own overlay
+STATE_GROUPS = ('eyes', 'mouth')
+# Where each group's states sit in the scene, as the old .eye-state/.mouth-state CSS placed them:
+# centred on (x, y) and scaled to a height, all as fractions of the scene size
+STATE_LAYOUT = {
+    'eyes': {'center': (0.5, 0.38), 'height': 0.15},
+    'mouth': {'center': (0.5, 0.38), 'height': 0.15},
+}
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 2                       # Transparent gap between sprites, so filtering never bleeds
+BUILD_VERSION = 1                       # Bump when the output format changes, to invalidate old caches
+
+def content_hash(paths, layout=None):
+    """Short sha256 of the files' bytes (missing files count by name) and the layout they are built with."""
+    digest = hashlib.sha256(json.dumps([BUILD_VERSION, SCENE_SIZE, layout], sort_keys=True).encode())
+    for path in paths:
+        digest.update(path.encode())
+        if path and os.path.isfile(path):
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+def _open(path):
+    if not path or not os.path.isfile(path):
+        logging.warning(f"Scene asset not found, leaving it out: {path}")
+        return None
+    return Image.open(path).convert('RGBA')
+
+def _cover(image, size):
+    """Scale and centre-crop image to fill size, like CSS background-size: cover."""
+    scale = max(size[0] / image.width, size[1] / image.height)
+    resized = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    left, top = (resized.width - size[0]) // 2, (resized.height - size[1]) // 2
+    return resized.crop((left, top, left + size[0], top + size[1]))
+
+def flatten_layers(paths, output_dir=ASSET_CACHE_DIR, name='static', size=SCENE_SIZE, cover=None):
+    """Alpha-composite full-frame layers, back to front, into one PNG; returns its path or None.
+
+    The layer at path cover (the background) is scaled to fill the scene first.
+    """
+    paths = [p for p in paths if p]
+    if not paths:
+        return None
+    output_path = os.path.join(output_dir, f"{name}_{content_hash(paths, [size, cover])}.png")
+    if os.path.exists(output_path):
+        return output_path
+    layers = [(path, _open(path)) for path in paths]
+    layers = [(path, layer) for path, layer in layers if layer is not None]
+    if not layers:
+        return None
+    canvas = Image.new('RGBA', size, (0, 0, 0, 0))
+    for path, layer in layers:
+        if path == cover:
+            layer = _cover(layer, size)
+        canvas.alpha_composite(layer.crop((0, 0, size[0], size[1])))
+    os.makedirs(output_dir, exist_ok=True)
+    canvas.save(output_path, optimize=True)
+    return output_path
+
+def place_sprite(image, layout, size=SCENE_SIZE):
+    """Fit a state image into the scene; returns (image, left, top) in scene pixels.
+
+    A full-frame layer keeps its position and is cropped to its visible pixels. A
+    smaller image is scaled and centred as given by layout.
+    """
+    if image.size == tuple(size):
+        bbox = image.getbbox() or (0, 0, 1, 1)
+        return image.crop(bbox), bbox[0], bbox[1]
+    height = round(layout['height'] * size[1])
+    width = round(image.width * height / image.height)
+    image = image.resize((width, height), Image.LANCZOS)
+    left = round(layout['center'][0] * size[0] - width / 2)
+    top = round(layout['center'][1] * size[1] - height / 2)
+    return image, left, top
+
+def pack_shelves(sizes, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """Shelf-pack (width, height) boxes, tallest first.
+
+    Returns:
+        ([(x, y)] in the order of sizes, atlas width, atlas height)
+    """
+    width = max([max_width] + [w + padding for w, _ in sizes])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    used_width = max((x + w for (x, _), (w, _) in zip(positions, sizes)), default=0)
+    return positions, used_width, y + shelf_height
+
+def build_atlas(states, output_dir=ASSET_CACHE_DIR, name='atlas', layout=STATE_LAYOUT, size=SCENE_SIZE):
+    """Pack {group: {state: path}} into one atlas PNG.
+
+    A file used for several states of a group (the coffee character's eyes use one
+    image for both) is stored once.
+
+    Returns:
+        (atlas path or None, {"<group>-<state>": {x, y, w, h, left, top}})
+    """
+    items = [(group, state, path) for group, group_states in states.items()
+             for state, path in group_states.items() if path]
+    key = content_hash([path for _, _, path in items], [[g, s] for g, s, _ in items] + [layout])
+    output_path = os.path.join(output_dir, f"{name}_{key}.png")
+    manifest_path = output_path[:-len('.png')] + '.json'
+    if os.path.exists(output_path) and os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            return output_path, json.load(f)
+
+    sprites, images, placed = {}, [], {}
+    for group, state, path in items:
+        cache_key = (path, group)
+        if cache_key not in placed:
+            image = _open(path)
+            if image is None:
+                continue
+            image, left, top = place_sprite(image, layout[group], size)
+            placed[cache_key] = (len(images), left, top)
+            images.append(image)
+        index, left, top = placed[cache_key]
+        sprites[f"{group}-{state}"] = {'index': index, 'left': left, 'top': top}
+    if not images:
+        return None, {}
+
+    positions, width, height = pack_shelves([image.size for image in images])
+    atlas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for image, position in zip(images, positions):
+        atlas.paste(image, position)
+    for sprite in sprites.values():
+        index = sprite.pop('index')
+        sprite.update(x=positions[index][0], y=positions[index][1], w=images[index].width, h=images[index].height)
+
+    os.makedirs(output_dir, exist_ok=True)
+    atlas.save(output_path, optimize=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(sprites, f, indent=2)
+    return output_path, sprites
+
+def build_character_assets(character, assets, output_dir=None):
+    """Everything the scene template needs for a character (see CHARACTER_ASSETS in build_scene).
+
+    Returns:
+        dict with 'static' (flattened background + body), 'front' (overlay or None),
+        'atlas' (sprite sheet or None), 'sprites' and 'groups' (state groups present).
+    """
+    output_dir = output_dir or ASSET_CACHE_DIR
+    states = {group: assets[group] for group in STATE_GROUPS if isinstance(assets.get(group), dict)}
+    # A single-image group (nebbles' eyes) never changes, so it is part of the static layer
+    back = [assets[layer] for layer in BACK_LAYERS if isinstance(assets.get(layer), str)]
+    back += [assets[group] for group in STATE_GROUPS if isinstance(assets.get(group), str)]
+    front = [assets[layer] for layer in FRONT_LAYERS if isinstance(assets.get(layer), str)]
+    atlas, sprites = build_atlas(states, output_dir, name=f"{character}_atlas")
+    return {
+        'static': flatten_layers(back, output_dir, name=f"{character}_static", cover=assets.get('background')),
+        'front': flatten_layers(front, output_dir, name=f"{character}_front"),
+        'atlas': atlas,
+        'sprites': sprites,
+        'groups': sorted({name.split('-', 1)[0] for name in sprites}),
+    }
+
+def main():
+    from animation.build_scene import CHARACTER_ASSETS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('characters', nargs='*', help="Characters to build (default: all)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for character in args.characters or CHARACTER_ASSETS:
+        print(json.dumps({character: build_character_assets(character, CHARACTER_ASSETS[character])}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,29 @@
 import os
 import json
+import time
+import base64
 import asyncio
+import logging
 from jinja2 import Environment, FileSystemLoader
 from playwright.async_api import async_playwright
 
+from animation.build_assets import build_character_assets
+
 # Configuration
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'renders')
 
+# 'frames': pause the GSAP timeline, seek it to every frame and pipe screenshots into ffmpeg
+# (frame-exact, faster than real time); 'realtime': play it and record the page as it runs
+RENDER_MODE = os.getenv("RENDER_MODE", "frames")
+FPS = 30
+VIEWPORT = {'width': 1080, 'height': 1920}     # Size of .scene-container
+FRAME_FORMAT = 'jpeg'                          # 'png' is lossless but several times slower to encode per frame
+JPEG_QUALITY = 92
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+VIDEO_ARGS = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p']
+AUDIO_ARGS = ['-c:a', 'aac', '-b:a', '192k', '-shortest']
+
 # Asset paths
 CHARACTER_ASSETS = {
     'coffee': {
@@ -34,44 +50,141 @@ CHARACTER_ASSETS = {
     }
 }
 
+def frame_times(duration, fps=FPS):
+    """Timeline position (seconds) of each frame of a duration-second clip."""
+    count = max(1, round(duration * fps))
+    return [i / fps for i in range(count)]
+
+def ffmpeg_command(output_path, fps=FPS, frame_format=FRAME_FORMAT, audio_path=None, threads=None):
+    """ffmpeg reading encoded frames from stdin (image2pipe), muxed with audio_path if given.
+
+    threads caps the encoder's threads, for running several encoders side by side.
+    """
+    command = [FFMPEG, '-y', '-loglevel', 'error', '-f', 'image2pipe', '-framerate', str(fps),
+               '-c:v', 'mjpeg' if frame_format == 'jpeg' else 'png', '-i', '-']
+    if audio_path:
+        command += ['-i', audio_path]
+    command += VIDEO_ARGS
+    if audio_path:
+        command += AUDIO_ARGS
+    if threads:
+        command += ['-threads', str(threads)]
+    return command + [output_path]
+
 class AnimationRenderer:
-    def __init__(self, input_data):
+    def __init__(self, input_data, mode=RENDER_MODE, fps=FPS, frame_format=FRAME_FORMAT, ffmpeg_threads=None):
+        if mode not in ('frames', 'realtime'):
+            raise ValueError(f"Unknown render mode '{mode}', expected 'frames' or 'realtime'")
         self.input_data = input_data
+        self.mode = mode
+        self.fps = fps
+        self.frame_format = frame_format
+        self.ffmpeg_threads = ffmpeg_threads
+        self.stats = {}
         self.env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
-        
-    async def render_scene(self):
-        # Create output directory
+
+    @property
+    def name(self):
+        # Named per scene so concurrent renders (pipeline.horoscope_pipeline) don't overwrite each other
+        return self.input_data.get('name', 'output')
+
+    def write_html(self, mode=None):
+        """Render the scene template to OUTPUT_DIR and return the HTML file's path."""
         os.makedirs(OUTPUT_DIR, exist_ok=True)
-        
-        # Generate HTML
+        character = self.input_data['character']
         template = self.env.get_template('scene_template.html.j2')
         html_content = template.render(
-            character=self.input_data['character'],
-            assets=CHARACTER_ASSETS[self.input_data['character']],
+            character=character,
+            assets=CHARACTER_ASSETS[character],
+            # Flattened static layer + sprite atlas, rebuilt only when the source images change
+            scene=build_character_assets(character, CHARACTER_ASSETS[character]),
             timings=self.input_data['timings'],
-            audio_path=self.input_data['audio_path']
+            audio_path=self.input_data['audio_path'],
+            render_mode=mode or self.mode
         )
-        
-        html_path = os.path.join(OUTPUT_DIR, 'temp_scene.html')
+        html_path = os.path.join(OUTPUT_DIR, f'{self.name}_scene.html')
         with open(html_path, 'w') as f:
             f.write(html_content)
-            
-        # Render video
+        return html_path
+
+    async def render_scene(self):
+        html_path = self.write_html()
         async with async_playwright() as p:
             browser = await p.chromium.launch()
-            context = await browser.new_context()
-            page = await context.new_page()
-            
-            await page.goto(f'file:///{os.path.abspath(html_path)}')
-            video_path = os.path.join(OUTPUT_DIR, 'output.webm')
-            await page.video.start(path=video_path)
-            
-            # Wait for animation duration
-            await page.wait_for_timeout(self.input_data['duration'] * 1000)
-            
-            await page.video.save_as(path=video_path)
-            await browser.close()
-            
+            try:
+                if self.mode == 'realtime':
+                    return await self.record_realtime(browser, html_path)
+                page = await browser.new_page(viewport=VIEWPORT)
+                await self.open_scene(page, html_path)
+                video_path = os.path.join(OUTPUT_DIR, f'{self.name}.mp4')
+                times = frame_times(self.input_data['duration'], self.fps)
+                await self.render_frames(page, times, video_path, audio_path=self.input_data.get('audio_path'))
+                return video_path
+            finally:
+                await browser.close()
+
+    async def open_scene(self, page, html_path):
+        """Load a 'frames' mode scene and wait until its timeline can be seeked."""
+        await page.goto(f'file:///{os.path.abspath(html_path)}')
+        await page.wait_for_function("typeof window.seekFrame === 'function'")
+
+    async def render_frames(self, page, times, output_path, audio_path=None):
+        """Seek the paused timeline to each time in times and pipe a screenshot of each into ffmpeg.
+
+        Frames are captured with CDP Page.captureScreenshot, which waits for the page to
+        produce a new frame after the seek, so every timestamp yields exactly one frame
+        and nothing is dropped however long a frame takes. (HeadlessExperimental.beginFrame
+        would also skip the compositor's own frame scheduling, but needs a browser started
+        with --enable-begin-frame-control, which Playwright does not do.)
+
+        Returns:
+            The number of frames written.
+        """
+        cdp = await page.context.new_cdp_session(page)
+        params = {'format': self.frame_format, 'clip': {**VIEWPORT, 'x': 0, 'y': 0, 'scale': 1}}
+        if self.frame_format == 'jpeg':
+            params['quality'] = JPEG_QUALITY
+        audio_path = audio_path if audio_path and os.path.exists(audio_path) else None
+        ffmpeg = await asyncio.create_subprocess_exec(
+            *ffmpeg_command(output_path, self.fps, self.frame_format, audio_path, self.ffmpeg_threads),
+            stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        start = time.perf_counter()
+        frames = 0
+        try:
+            for t in times:
+                await page.evaluate("t => window.seekFrame(t)", t)
+                shot = await cdp.send('Page.captureScreenshot', params)
+                ffmpeg.stdin.write(base64.b64decode(shot['data']))
+                await ffmpeg.stdin.drain()      # ffmpeg encodes the previous frame while the next one is captured
+                frames += 1
+        finally:
+            ffmpeg.stdin.close()
+            _, stderr = await ffmpeg.communicate()
+            await cdp.detach()
+        if ffmpeg.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed writing {output_path}: {stderr.decode(errors='replace')[-2000:]}")
+
+        elapsed = time.perf_counter() - start
+        self.stats = {'frames': frames, 'render_s': elapsed, 'realtime_factor': frames / self.fps / max(elapsed, 1e-9)}
+        logging.info(f"Rendered {frames} frames to {output_path} in {elapsed:.1f}s "
+                     f"({self.stats['realtime_factor']:.2f}x real time)")
+        return frames
+
+    async def record_realtime(self, browser, html_path):
+        """Play the scene and record the page for its full duration (wall time = clip length)."""
+        context = await browser.new_context(viewport=VIEWPORT, record_video_dir=OUTPUT_DIR,
+                                            record_video_size=VIEWPORT)
+        page = await context.new_page()
+        await page.goto(f'file:///{os.path.abspath(html_path)}')
+
+        # Wait for animation duration
+        await page.wait_for_timeout(self.input_data['duration'] * 1000)
+
+        video_path = os.path.join(OUTPUT_DIR, f'{self.name}.webm')
+        await context.close()
+        await page.video.save_as(video_path)
+        await page.video.delete()
         return video_path
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+"""Mouth and blink timings for a scene, from its narration audio.
+
+    python -m animation.lipsync output/pipeline/2025-05-06/Aries.wav
+
+The audio is cut into one window per video frame and the RMS level of each window is
+compared with a decaying peak of the recent level. The mouth opens when a frame is within
+OPEN_DB of that peak and closes only when it drops below CLOSE_DB. The gap between the
+two thresholds (hysteresis) plus minimum hold times stops the mouth flickering on
+syllable edges. Blinks are spaced at random intervals drawn from a seeded generator, so
+the same audio and seed always give the same video.
+
+extract_timings() returns the {'mouth_events', 'blink_events'} structure that
+AnimationRenderer expects. LipSync takes audio in chunks as it arrives, for live use.
+"""
+import argparse
+import json
+import wave
+import zlib
+
+import numpy as np
+
+# Constants
+FPS = 30                    # Video frame rate the windows are aligned to (as animation.build_scene.FPS)
+OPEN_DB = -18.0             # Open when a frame is this close to the recent peak level
+CLOSE_DB = -26.0            # ...and close once it falls this far below it
+PEAK_DECAY_DB_PER_S = 6.0   # How fast the reference peak follows the voice down
+PEAK_FLOOR_DB = -50.0       # Below this, a frame counts as silence however quiet the clip is
+MIN_OPEN_FRAMES = 2
+MIN_CLOSED_FRAMES = 2
+BLINK_INTERVAL_S = (2.0, 6.0)   # Gap between blinks, uniformly distributed
+BLINK_SEED = 7
+
+def read_wav(path):
+    """Samples of a PCM wav file as float32 in [-1, 1] (channels mixed down), and its sample rate."""
+    with wave.open(path, 'rb') as f:
+        sample_rate, channels, width = f.getframerate(), f.getnchannels(), f.getsampwidth()
+        raw = f.readframes(f.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+    else:
+        raise ValueError(f"Unsupported sample width {width * 8} bits in {path}")
+    return samples.reshape(-1, channels).mean(axis=1), sample_rate
+
+def seed_for(name):
+    """A stable blink seed per scene name, so each sign blinks differently but reproducibly."""
+    return zlib.crc32(name.encode()) if name else BLINK_SEED
+
+class LipSync:
+    """Incremental frame-level lip-sync: feed() audio chunks, get the events they complete.
+
+    Events are state changes, {'type': 'open'|'closed', 'start': t} for the mouth and
+    {'timestamp': t} for blinks, in the same shapes the scene template plays.
+    """
+
+    def __init__(self, sample_rate, fps=FPS, seed=BLINK_SEED, open_db=OPEN_DB, close_db=CLOSE_DB,
+                 min_open_frames=MIN_OPEN_FRAMES, min_closed_frames=MIN_CLOSED_FRAMES):
+        if open_db <= close_db:
+            raise ValueError("open_db must be above close_db for the hysteresis to work")
+        self.sample_rate = sample_rate
+        self.fps = fps
+        self.open_db = open_db
+        self.close_db = close_db
+        self.min_open_frames = min_open_frames
+        self.min_closed_frames = min_closed_frames
+        self.frames = 0                 # Frames analysed so far
+        self.mouth_open = False
+        self._held = min_closed_frames  # Frames spent in the current mouth state (may open at once)
+        self._peak_db = PEAK_FLOOR_DB
+        self._decay = PEAK_DECAY_DB_PER_S / fps
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._samples_before = 0        # Samples consumed before _pending starts
+        self._rng = np.random.default_rng(seed)
+        self._next_blink = self._rng.uniform(*BLINK_INTERVAL_S)
+
+    def _boundaries(self, first, count):
+        """Index of the first sample of frames first..first+count-1 (a frame need not hold a whole
+        number of samples, e.g. 16 kHz at 30 fps)."""
+        return np.rint(np.arange(first, first + count) * self.sample_rate / self.fps).astype(np.int64)
+
+    def frame_levels(self, samples):
+        """RMS level in dBFS of every frame that samples completes, buffering the remainder."""
+        buffered = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        end = self._samples_before + len(buffered)
+        bounds = self._boundaries(self.frames, int(end * self.fps / self.sample_rate) - self.frames + 3)
+        count = int(np.searchsorted(bounds[1:], end, side='right'))
+        if count == 0:
+            self._pending = buffered
+            return np.zeros(0)
+        starts = bounds[:count + 1] - self._samples_before
+        energy = np.add.reduceat(buffered[:starts[-1]] ** 2, starts[:-1]) / np.diff(starts)
+        self._pending = buffered[starts[-1]:]
+        self._samples_before += int(starts[-1])
+        return 10 * np.log10(energy + 1e-12)
+
+    def feed(self, samples):
+        """Analyse a chunk of mono float samples.
+
+        Returns:
+            {'mouth_events': [...], 'blink_events': [...]} for the frames the chunk completed.
+        """
+        mouth_events, blink_events = [], []
+        for level in self.frame_levels(samples):
+            t = self.frames / self.fps
+            self._peak_db = max(level, self._peak_db - self._decay, PEAK_FLOOR_DB)
+            relative = level - self._peak_db
+            self._held += 1
+            if level > PEAK_FLOOR_DB and not self.mouth_open and relative >= self.open_db \
+                    and self._held >= self.min_closed_frames:
+                self.mouth_open, self._held = True, 0
+                mouth_events.append({'type': 'open', 'start': round(t, 4)})
+            elif self.mouth_open and (relative < self.close_db or level <= PEAK_FLOOR_DB) \
+                    and self._held >= self.min_open_frames:
+                self.mouth_open, self._held = False, 0
+                mouth_events.append({'type': 'closed', 'start': round(t, 4)})
+            if t >= self._next_blink:
+                blink_events.append({'timestamp': round(t, 4)})
+                self._next_blink = t + self._rng.uniform(*BLINK_INTERVAL_S)
+            self.frames += 1
+        return {'mouth_events': mouth_events, 'blink_events': blink_events}
+
+    def finish(self):
+        """Close the mouth at the end of the audio; returns the final events like feed()."""
+        mouth_events = []
+        if self.mouth_open:
+            self.mouth_open = False
+            mouth_events.append({'type': 'closed', 'start': round(self.frames / self.fps, 4)})
+        return {'mouth_events': mouth_events, 'blink_events': []}
+
+def pair_mouth_events(changes):
+    """Fold open/closed state changes into {'type': 'open', 'start', 'end'} events."""
+    events = []
+    for change in changes:
+        if change['type'] == 'open':
+            events.append({'type': 'open', 'start': change['start'], 'end': None})
+        elif events and events[-1]['end'] is None:
+            events[-1]['end'] = change['start']
+    return events
+
+def timings_from_samples(samples, sample_rate, fps=FPS, seed=BLINK_SEED):
+    """Timings for a whole clip already in memory (see LipSync for the parameters)."""
+    sync = LipSync(sample_rate, fps=fps, seed=seed)
+    timings = sync.feed(samples)
+    final = sync.finish()
+    return {'mouth_events': pair_mouth_events(timings['mouth_events'] + final['mouth_events']),
+            'blink_events': timings['blink_events']}
+
+def extract_timings(audio_path, fps=FPS, seed=BLINK_SEED):
+    """Mouth and blink timings for a wav file, in the shape AnimationRenderer takes."""
+    samples, sample_rate = read_wav(audio_path)
+    return timings_from_samples(samples, sample_rate, fps=fps, seed=seed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio_path', help="PCM wav file")
+    parser.add_argument('--fps', type=int, default=FPS)
+    parser.add_argument('--seed', type=int, default=BLINK_SEED)
+    args = parser.parse_args()
+    print(json.dumps(extract_timings(args.audio_path, args.fps, args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
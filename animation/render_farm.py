@@ -0,0 +1,232 @@
+"""Render many scenes, and long scenes in pieces, on a pool of warm headless browsers.
+
+    python -m animation.render_farm scenes.json --workers 6
+
+scenes.json holds a list of AnimationRenderer input dicts (name, character, audio_path,
+duration, timings). Each scene's timeline is cut into frame-exact segments. Every segment
+is rendered on whichever browser is free, and the segments are joined with ffmpeg's
+concat demuxer without re-encoding.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import shutil
+import time
+
+from playwright.async_api import async_playwright
+
+from animation.build_scene import AUDIO_ARGS, FFMPEG, FPS, OUTPUT_DIR, VIEWPORT, AnimationRenderer, frame_times
+
+# Constants
+# Each worker is one Chromium (its own renderer and GPU processes) plus an ffmpeg encoder,
+# which together keep about two cores busy
+RENDER_FARM_WORKERS = int(os.getenv("RENDER_FARM_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+SEGMENT_SECONDS = 10.0         # Timeline length per segment; shorter spreads one scene over more workers
+FFMPEG_THREADS = 2             # Encoder threads per segment
+
+def split_frames(total_frames, segment_frames):
+    """(start, end) frame ranges covering total_frames, each at most segment_frames long."""
+    segment_frames = max(1, segment_frames)
+    return [(start, min(start + segment_frames, total_frames)) for start in range(0, total_frames, segment_frames)]
+
+def concat_list(paths):
+    """Contents of an ffmpeg concat demuxer list for paths."""
+    return "".join("file '{}'\n".format(os.path.abspath(path).replace("'", "'\\''")) for path in paths)
+
+def concat_command(list_path, output_path, audio_path=None):
+    """Join the listed segments with stream copy, adding audio_path as the soundtrack if given."""
+    command = [FFMPEG, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+    if audio_path:
+        command += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+    command += ['-c:v', 'copy']
+    if audio_path:
+        command += AUDIO_ARGS
+    return command + [output_path]
+
+class RenderFarm:
+    """A pool of warm browser pages that renders scene segments concurrently.
+
+    Browsers are launched once by start() and reused for every segment, so the seconds
+    Playwright and Chromium take to start are paid once per farm, not per video. A scene
+    is cut into segments of segment_s; every segment seeks the paused timeline from the
+    start of its range, so the joined video is frame for frame what a single pass would
+    produce. All segments of all scenes share the pool, and throughput grows with workers
+    until the cores are used up.
+
+    Use as `async with RenderFarm(workers=4) as farm: paths = await farm.render_many(scenes)`.
+    """
+
+    def __init__(self, workers=RENDER_FARM_WORKERS, segment_s=SEGMENT_SECONDS, fps=FPS, ffmpeg_threads=FFMPEG_THREADS,
+                 new_page=None):
+        """
+        Args:
+            workers (int): Browsers rendering at once.
+            segment_s (float): Longest stretch of timeline rendered by one worker in one go.
+            fps (int): Output frame rate.
+            ffmpeg_threads (int): Encoder threads per segment.
+            new_page: Optional coroutine function returning a page to render on, replacing
+                      the Chromium launched for each worker (used by tests).
+        """
+        self.workers = workers
+        self.segment_s = segment_s
+        self.fps = fps
+        self.ffmpeg_threads = ffmpeg_threads
+        self.new_page = new_page
+        self.scenes = 0
+        self.segments = 0
+        self.frames = 0
+        self.busy_s = 0.0
+        self.elapsed_s = 0.0
+        self._playwright = None
+        self._browsers = []
+        self._idle = asyncio.Queue()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _open_page(self):
+        if self.new_page is not None:
+            return await self.new_page()
+        browser = await self._playwright.chromium.launch()
+        self._browsers.append(browser)
+        return await browser.new_page(viewport=VIEWPORT)
+
+    async def start(self):
+        """Launch the workers' browsers."""
+        if self.new_page is None and self._playwright is None:
+            self._playwright = await async_playwright().start()
+        pages = await asyncio.gather(*(self._open_page() for _ in range(self.workers)))
+        for page in pages:
+            self._idle.put_nowait(page)
+        logging.info(f"Render farm started with {self.workers} browsers")
+
+    async def close(self):
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _replace_page(self, page):
+        """Close a failed page together with its browser and open a fresh one.
+
+        Returns None if the new page cannot be opened either; the slot then retries on its next segment.
+        """
+        browser = getattr(page.context, 'browser', None)
+        with contextlib.suppress(Exception):
+            await page.close()
+        if browser is not None:
+            with contextlib.suppress(Exception):
+                await browser.close()
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+        try:
+            return await self._open_page()
+        except Exception as e:
+            logging.error(f"Could not open a replacement render page: {e}")
+            return None
+
+    async def _render_segment(self, renderer, html_path, times, output_path):
+        page = await self._idle.get()
+        start = time.perf_counter()
+        try:
+            if page is None:
+                page = await self._open_page()
+            await renderer.open_scene(page, html_path)
+            frames = await renderer.render_frames(page, times, output_path)
+        except Exception:
+            # The page may be wedged or crashed; give the next segment a fresh one
+            if page is not None:
+                page = await self._replace_page(page)
+            raise
+        finally:
+            self.busy_s += time.perf_counter() - start
+            self._idle.put_nowait(page)
+        self.segments += 1
+        self.frames += frames
+        return frames
+
+    async def render(self, input_data):
+        """Render one scene across the pool and return the path of its finished mp4."""
+        renderer = AnimationRenderer(input_data, mode='frames', fps=self.fps, ffmpeg_threads=self.ffmpeg_threads)
+        html_path = renderer.write_html()
+        times = frame_times(input_data['duration'], self.fps)
+        segment_dir = os.path.join(OUTPUT_DIR, f'{renderer.name}_segments')
+        os.makedirs(segment_dir, exist_ok=True)
+
+        ranges = split_frames(len(times), round(self.segment_s * self.fps))
+        paths = [os.path.join(segment_dir, f'{i:04d}.mp4') for i in range(len(ranges))]
+        await asyncio.gather(*(self._render_segment(renderer, html_path, times[start:end], path)
+                               for (start, end), path in zip(ranges, paths)))
+
+        list_path = os.path.join(segment_dir, 'segments.txt')
+        with open(list_path, 'w') as f:
+            f.write(concat_list(paths))
+        video_path = os.path.join(OUTPUT_DIR, f'{renderer.name}.mp4')
+        audio_path = input_data.get('audio_path')
+        audio_path = audio_path if audio_path and os.path.exists(audio_path) else None
+        ffmpeg = await asyncio.create_subprocess_exec(*concat_command(list_path, video_path, audio_path),
+                                                      stderr=asyncio.subprocess.PIPE)
+        _, stderr = await ffmpeg.communicate()
+        if ffmpeg.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat failed for {video_path}: {stderr.decode(errors='replace')[-2000:]}")
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        self.scenes += 1
+        return video_path
+
+    async def render_many(self, scenes):
+        """Render every scene concurrently; a scene that fails is logged and yields None."""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.render(scene) for scene in scenes), return_exceptions=True)
+        self.elapsed_s += time.perf_counter() - start
+        paths = []
+        for scene, result in zip(scenes, results):
+            if isinstance(result, Exception):
+                logging.error(f"Rendering {scene.get('name', 'output')} failed: {result}")
+                result = None
+            paths.append(result)
+        return paths
+
+    def stats(self):
+        """Work done so far, with throughput and how busy the workers were during render_many."""
+        video_s = self.frames / self.fps
+        return {
+            'workers': self.workers,
+            'scenes': self.scenes,
+            'segments': self.segments,
+            'frames': self.frames,
+            'frames_per_s': self.frames / self.elapsed_s if self.elapsed_s else None,
+            'realtime_factor': video_s / self.elapsed_s if self.elapsed_s else None,
+            'utilization': self.busy_s / (self.elapsed_s * self.workers) if self.elapsed_s else None,
+        }
+
+async def render_scenes(scenes, workers=RENDER_FARM_WORKERS, segment_s=SEGMENT_SECONDS):
+    async with RenderFarm(workers=workers, segment_s=segment_s) as farm:
+        paths = await farm.render_many(scenes)
+    return paths, farm.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenes', help="JSON file with a list of scene input dicts")
+    parser.add_argument('--workers', type=int, default=RENDER_FARM_WORKERS)
+    parser.add_argument('--segment-s', type=float, default=SEGMENT_SECONDS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with open(args.scenes, 'r') as f:
+        scenes = json.load(f)
+    paths, stats = asyncio.run(render_scenes(scenes, args.workers, args.segment_s))
+    for scene, path in zip(scenes, paths):
+        print(f"{scene.get('name', 'output')}: {path or 'FAILED'}")
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
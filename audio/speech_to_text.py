@@ -1,42 +1,53 @@
-import whisper
-import soundfile as sf
-import torch
-import os  # Add this import
+import argparse
+import os
 import warnings
 
-# Suppress the FutureWarning from torch.load
-warnings.filterwarnings("ignore", category=FutureWarning)
-
-
-# Check if GPU is available
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"Using device: {device}")
-
-# Load the Whisper model
-model_size = "base"
-model = whisper.load_model(model_size).to(device)
-
-# Path to your .wav file
-audio_file = r"D:\AI\horoscope_gen\audio_input\Liz-Training.wav"
-
-# Read the audio file
-audio, sample_rate = sf.read(audio_file)
-
-# Transcribe the audio
-result = model.transcribe(audio_file, language="en")
-
-# Output the transcribed text
-print("\nTranscribed Text:")
-print(result["text"])
-
-# Specify the directory and filename
-output_dir = r"D:\AI\horoscope_gen\audio_transcription"
-output_file = os.path.join(output_dir, "liz_transcription.txt")
-
-# Create the directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
-
-# Save the transcription to the file
-with open(output_file, "w") as f:
-    f.write(result["text"])
-print(f"Transcription saved to {output_file}")
\ No newline at end of file
+# Defaults (torch and whisper are imported in load_model, not when this module is imported)
+MODEL_SIZE = "base"
+AUDIO_FILE = r"D:\AI\horoscope_gen\audio_input\Liz-Training.wav"
+OUTPUT_DIR = r"D:\AI\horoscope_gen\audio_transcription"
+OUTPUT_FILE = "liz_transcription.txt"
+
+def load_model(model_size=MODEL_SIZE):
+    """Load a Whisper model on the GPU if one is available."""
+    import torch
+    import whisper
+
+    # Suppress the FutureWarning from torch.load
+    warnings.filterwarnings("ignore", category=FutureWarning)
+
+    # Check if GPU is available
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Using device: {device}")
+    return whisper.load_model(model_size).to(device)
+
+def transcribe(audio_file, model=None, language="en"):
+    """Transcribe an audio file and return the text."""
+    model = model or load_model()
+    result = model.transcribe(audio_file, language=language)
+    return result["text"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe an audio file with Whisper.")
+    parser.add_argument('audio_file', nargs='?', default=AUDIO_FILE)
+    parser.add_argument('--model', default=MODEL_SIZE)
+    parser.add_argument('--output', default=os.path.join(OUTPUT_DIR, OUTPUT_FILE))
+    args = parser.parse_args(argv)
+
+    # Transcribe the audio
+    text = transcribe(args.audio_file, load_model(args.model))
+
+    # Output the transcribed text
+    print("\nTranscribed Text:")
+    print(text)
+
+    # Create the directory if it doesn't exist
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    # Save the transcription to the file
+    with open(args.output, "w") as f:
+        f.write(text)
+    print(f"Transcription saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare the sorted-longitude aspect sweep against the original nested pair loop.
+
+Run from the project root:
+    python -m benchmarks.bench_aspects
+"""
+import time
+import numpy as np
+
+from data_ingestion.aspects import find_aspects
+from data_ingestion.solar_data import ASPECT_TYPES
+
+BODY_COUNTS = [17, 34, 100, 300, 1000]
+REPEATS = 5
+
+def legacy_aspects(longitudes):
+    """The pair x ASPECT_TYPES scan from get_planet_positions before the aspect engine."""
+    aspects = []
+    for i in range(len(longitudes)):
+        for j in range(i + 1, len(longitudes)):
+            angle = abs((longitudes[i] - longitudes[j]) % 360)
+            if angle > 180:
+                angle = 360 - angle
+            for aspect_name, (target, orb) in ASPECT_TYPES.items():
+                if abs(angle - target) <= orb:
+                    aspects.append({'body1': i, 'body2': j, 'aspect': aspect_name, 'angle': round(angle, 2)})
+    return aspects
+
+def best_of(func, *args):
+    """Best wall-clock time in milliseconds over REPEATS runs."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'bodies':>8} {'legacy ms':>12} {'pairwise ms':>12} {'sweep ms':>12} {'speedup':>9}")
+    for count in BODY_COUNTS:
+        longitudes = rng.uniform(0, 360, count)
+        legacy = best_of(legacy_aspects, longitudes.tolist())
+        pairwise = best_of(find_aspects, longitudes, ASPECT_TYPES, 'pairwise')
+        sweep = best_of(find_aspects, longitudes, ASPECT_TYPES, 'sweep')
+        print(f"{count:>8} {legacy:>12.3f} {pairwise:>12.3f} {sweep:>12.3f} {legacy / min(pairwise, sweep):>8.1f}x")
+
+if __name__ == "__main__":
+    main()
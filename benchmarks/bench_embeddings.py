@@ -0,0 +1,85 @@
+"""Throughput and latency of the in-process ONNX embedder against Ollama's HTTP endpoint.
+
+Two workloads per backend:
+  single - --clients threads each embedding one text per call (like create_embedding)
+  batch  - lists of --batch texts per call (like bulk ingestion)
+
+Run from the project root with Ollama serving all-minilm:l6-v2 (the local model is
+downloaded from the Hugging Face hub on first use):
+    python -m benchmarks.bench_embeddings --texts 2000 --clients 8 --threads 4
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from database.ingest import embed_batch
+from database.local_embedder import LocalEmbedder
+
+SUBJECTS = ['Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'The Moon', 'The Sun', 'Chiron']
+VERBS = ['stations direct in', 'enters', 'squares', 'trines', 'opposes', 'turns retrograde in']
+OBJECTS = ['Aries', 'Cancer', 'Libra', 'Capricorn', 'your tenth house', 'the North Node', 'Pluto']
+TAILS = ['', ' Expect surprises.', ' A week for slow, careful plans and honest conversations with old friends.',
+         ' Lumina says: hydrate, journal, and maybe do not text your ex tonight.']
+
+def sample_texts(count, seed=3):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}.{rng.choice(TAILS)} #{i}"
+            for i in range(count)]
+
+def measure_single(embed_one, texts, clients):
+    latencies = []
+
+    def timed(text):
+        start = time.perf_counter()
+        embed_one(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(timed, texts))
+    return len(texts) / (time.perf_counter() - start), latencies
+
+def measure_batch(embed_many, texts, batch):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch):
+        call_start = time.perf_counter()
+        embed_many(texts[i:i + batch])
+        latencies.append(time.perf_counter() - call_start)
+    return len(texts) / (time.perf_counter() - start), latencies
+
+def report(label, throughput, latencies):
+    latencies = np.array(latencies) * 1000
+    print(f"  {label:<14} {throughput:9.1f} texts/s   p50 {np.percentile(latencies, 50):8.2f} ms   "
+          f"p99 {np.percentile(latencies, 99):8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=0, help="ONNX Runtime intra-op threads (0 = all cores)")
+    parser.add_argument('--variant', choices=['int8', 'fp32'], default='int8')
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts)
+    local = LocalEmbedder(variant=args.variant, threads=args.threads, max_batch_size=args.batch)
+    session = requests.Session()
+
+    # Warm both paths (model load, first-call allocations)
+    local.embed(texts[:args.batch])
+    embed_batch(texts[:args.batch], session=session)
+
+    print(f"{args.texts} texts, {args.clients} clients, batch {args.batch}, local {args.variant} "
+          f"with {args.threads or 'default'} threads")
+    report('ollama single', *measure_single(lambda t: embed_batch([t], session=session), texts, args.clients))
+    report('local single', *measure_single(local.embed_one, texts, args.clients))
+    report('ollama batch', *measure_batch(lambda b: embed_batch(b, session=session), texts, args.batch))
+    report('local batch', *measure_batch(local.embed, texts, args.batch))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Time-to-first-token for the 12 sign prompts with and without shared-prefix reuse.
+
+"cold" puts a unique nonce in front of every prompt, so the server cannot reuse any
+cached prefix. "warm" sends the prompts as laid out by ai_brain.prompts, after a
+warm-up call, so only the sign-specific suffix needs prefilling.
+
+Run from the project root with Ollama (or LM Studio) serving the model:
+    python -m benchmarks.bench_prompt_prefix --backend ollama --model mistral-small:latest
+    python -m benchmarks.bench_prompt_prefix --backend lmstudio --model <loaded model id>
+"""
+import argparse
+import datetime
+import statistics
+import time
+import uuid
+
+from ai_brain.prompts import LM_STUDIO_TTL_SECONDS, OLLAMA_KEEP_ALIVE, build_horoscope_prompt
+from data_ingestion.solar_data import Sky
+
+def ttft_ollama(model, prompt):
+    """Seconds until the first streamed token, and prompt tokens evaluated by the server."""
+    import ollama
+    start = time.perf_counter()
+    first = None
+    prompt_tokens = None
+    for chunk in ollama.generate(model=model, prompt=prompt, stream=True, keep_alive=OLLAMA_KEEP_ALIVE,
+                                 options={'num_predict': 8, 'temperature': 0}):
+        if first is None and chunk['response']:
+            first = time.perf_counter() - start
+        if chunk.get('done'):
+            prompt_tokens = chunk.get('prompt_eval_count')
+    return first, prompt_tokens
+
+def ttft_lmstudio(model, prompt):
+    from config.settings import get_settings
+    from openai import OpenAI
+    llm = get_settings().llm
+    client = OpenAI(base_url=llm.lm_studio_url, api_key=llm.lm_studio_api_key)
+    start = time.perf_counter()
+    stream = client.chat.completions.create(model=model, messages=[{"role": "user", "content": prompt}],
+                                            max_tokens=8, temperature=0, stream=True,
+                                            extra_body={"ttl": LM_STUDIO_TTL_SECONDS})
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            return time.perf_counter() - start, None
+    return None, None
+
+def run(measure, model, prompts, label):
+    timings = []
+    for sign, prompt in prompts:
+        ttft, prompt_tokens = measure(model, prompt)
+        timings.append(ttft)
+        print(f"  {label:<5} {sign:<12} ttft {ttft * 1000:8.1f} ms  prompt tokens evaluated: {prompt_tokens}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['ollama', 'lmstudio'], default='ollama')
+    parser.add_argument('--model', required=True)
+    args = parser.parse_args()
+
+    measure = ttft_ollama if args.backend == 'ollama' else ttft_lmstudio
+    sky = Sky.compute(datetime.datetime.now())
+    prompts = [(view.sign, build_horoscope_prompt(view)) for view in sky.views()]
+
+    # Load the model first so neither run pays the load time
+    measure(args.model, "Hello")
+
+    cold = run(measure, args.model, [(sign, f"[{uuid.uuid4()}]\n{prompt}") for sign, prompt in prompts], 'cold')
+    measure(args.model, prompts[0][1])
+    warm = run(measure, args.model, prompts, 'warm')
+
+    print(f"\nmedian ttft  cold {statistics.median(cold) * 1000:.1f} ms   "
+          f"warm {statistics.median(warm) * 1000:.1f} ms   "
+          f"speedup {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+if __name__ == "__main__":
+    main()
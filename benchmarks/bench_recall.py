@@ -0,0 +1,129 @@
+"""Recall@k against query latency for the memories ANN index, on a synthetic dataset.
+
+Loads --rows clustered, normalized 384-d vectors into a scratch table (default 1M rows),
+builds the chosen index, then runs a fixed query set at each search breadth (ef_search
+for HNSW, probes for IVFFlat). Exact top-k neighbours are computed in numpy, chunk by
+chunk from the same seeded generator, so the dataset never has to fit in memory twice.
+
+Run from the project root against a database with pgvector (DB_* env vars as usual):
+    python -m benchmarks.bench_recall --method hnsw --m 16 --ef-construction 64
+    python -m benchmarks.bench_recall --method ivfflat --lists 1000 --reuse
+"""
+import argparse
+import datetime
+import statistics
+import time
+
+import numpy as np
+from psycopg import sql
+
+from database.connection import connection
+from database.ingest import EMBEDDING_DIMENSION, register_vector
+from database.recall import ensure_index, search
+
+CHUNK_ROWS = 50_000
+CLUSTERS = 2000
+SOURCES = ['news', 'post', 'persona', 'comment']
+SEED = 7
+NOISE = 0.035     # Per-dimension spread around a cluster centre (about 0.7 in norm at 384-d)
+
+def centers(dim):
+    rng = np.random.default_rng(SEED)
+    c = rng.standard_normal((CLUSTERS, dim)).astype(np.float32)
+    return c / np.linalg.norm(c, axis=1, keepdims=True)
+
+def chunk(index, rows, dim, cluster_centers):
+    """Rows [index * CHUNK_ROWS, ...) of the dataset; deterministic per chunk."""
+    rng = np.random.default_rng((SEED, index))
+    n = min(CHUNK_ROWS, rows - index * CHUNK_ROWS)
+    points = cluster_centers[rng.integers(0, CLUSTERS, n)] + NOISE * rng.standard_normal((n, dim)).astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+def chunk_count(rows):
+    return (rows + CHUNK_ROWS - 1) // CHUNK_ROWS
+
+def load(table, rows, dim, cluster_centers):
+    start = time.perf_counter()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    with connection() as conn:
+        conn.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+        conn.execute(sql.SQL("CREATE TABLE {} (id bigint PRIMARY KEY, content text, embedding vector({}), "
+                             "source text, timestamp timestamptz)").format(sql.Identifier(table), sql.Literal(dim)))
+        register_vector(conn)
+        copy_sql = sql.SQL("COPY {} (id, content, embedding, source, timestamp) FROM STDIN (FORMAT BINARY)").format(
+            sql.Identifier(table))
+        for index in range(chunk_count(rows)):
+            vectors = chunk(index, rows, dim, cluster_centers)
+            with conn.cursor().copy(copy_sql) as copy:
+                copy.set_types(['int8', 'text', 'vector', 'text', 'timestamptz'])
+                for offset, vector in enumerate(vectors):
+                    row_id = index * CHUNK_ROWS + offset
+                    copy.write_row((row_id, f"synthetic memory {row_id}", vector, SOURCES[row_id % len(SOURCES)], timestamp))
+            conn.commit()
+        conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+    elapsed = time.perf_counter() - start
+    print(f"loaded {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+
+def ground_truth(queries, rows, dim, k, cluster_centers):
+    """Exact cosine top-k ids for each query, merged chunk by chunk."""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    for index in range(chunk_count(rows)):
+        scores = queries @ chunk(index, rows, dim, cluster_centers).T
+        ids = np.arange(scores.shape[1]) + index * CHUNK_ROWS
+        all_scores = np.concatenate([best_scores, scores], axis=1)
+        all_ids = np.concatenate([best_ids, np.broadcast_to(ids, scores.shape)], axis=1)
+        top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(all_scores, top, axis=1)
+        best_ids = np.take_along_axis(all_ids, top, axis=1)
+    return [set(ids.tolist()) for ids in best_ids]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--method', choices=['hnsw', 'ivfflat'], default='hnsw')
+    parser.add_argument('--m', type=int, default=16)
+    parser.add_argument('--ef-construction', type=int, default=64)
+    parser.add_argument('--lists', type=int, default=None)
+    parser.add_argument('--breadth', default=None,
+                        help="comma-separated ef_search (hnsw) or probes (ivfflat) values to sweep")
+    parser.add_argument('--table', default='bench_memories')
+    parser.add_argument('--reuse', action='store_true', help="skip loading; reuse an existing table")
+    args = parser.parse_args()
+
+    dim = EMBEDDING_DIMENSION
+    cluster_centers = centers(dim)
+    if not args.reuse:
+        load(args.table, args.rows, dim, cluster_centers)
+
+    start = time.perf_counter()
+    ensure_index(args.method, m=args.m, ef_construction=args.ef_construction, lists=args.lists,
+                 table=args.table, concurrently=False)
+    print(f"built {args.method} index in {time.perf_counter() - start:.1f}s")
+
+    rng = np.random.default_rng(SEED + 1)
+    queries = cluster_centers[rng.integers(0, CLUSTERS, args.queries)]
+    queries = queries + NOISE * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = ground_truth(queries, args.rows, dim, args.k, cluster_centers)
+
+    default_breadth = '10,20,40,80,160,320' if args.method == 'hnsw' else '1,5,10,20,50,100'
+    print(f"\n{'ef_search' if args.method == 'hnsw' else 'probes':>10} {'recall@' + str(args.k):>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'qps':>8}")
+    with connection() as conn:
+        for breadth in (int(b) for b in (args.breadth or default_breadth).split(',')):
+            timings = []
+            hits = 0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                rows = search(conn, query, args.k, ef_search=breadth, probes=breadth, table=args.table)
+                timings.append(time.perf_counter() - start)
+                hits += len(expected & {row['id'] for row in rows})
+            timings.sort()
+            print(f"{breadth:>10} {hits / (args.k * len(queries)):>10.3f} {statistics.median(timings) * 1000:>8.2f} "
+                  f"{timings[int(0.95 * (len(timings) - 1))] * 1000:>8.2f} {len(timings) / sum(timings):>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Render fps and per-page memory of the layered scene versus the atlas scene.
+
+"before" is the original template: stacked <img> layers for body, eyes and mouth over a
+CSS background, with states switched by toggling display. "after" is the current
+template, which uses the flattened static bitmap and sprite atlas from animation.build_assets.
+Both render the same synthetic character and the same mouth/blink timeline, frame
+stepped through AnimationRenderer.render_frames. Memory is the JS heap reported by CDP
+plus the resident size of Chromium's renderer and GPU processes (Linux only), with the
+decoded bitmap bytes each page holds for comparison.
+
+Run from the project root (needs Playwright's Chromium and ffmpeg):
+    python -m benchmarks.bench_scene_assets --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from jinja2 import Template
+from PIL import Image, ImageDraw
+from playwright.async_api import async_playwright
+
+import animation.build_scene as build_scene
+from animation.build_assets import build_character_assets
+from animation.build_scene import FPS, VIEWPORT, AnimationRenderer, frame_times
+
+CHARACTER = 'bench'
+
+# The layered markup the scene template used before the atlas, reduced to the parts that render
+LAYERED_TEMPLATE = Template("""<!DOCTYPE html>
+<html><head>
+<script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/gsap.min.js"></script>
+<style>
+body { margin: 0; }
+.scene-container { position: relative; width: 1080px; height: 1920px; overflow: hidden;
+                   background-image: url('{{ assets.background }}'); background-size: cover; }
+.character-layer { position: absolute; top: 0; left: 0; width: 100%; height: 100%; }
+.state { display: none; position: absolute; top: 38%; left: 50%; transform: translate(-50%, -50%);
+         width: auto; height: 15%; }
+.active-state { display: block; }
+</style></head>
+<body><div class="scene-container">
+  <div class="character-layer"><img src="{{ assets.body }}"></div>
+  <div class="character-layer">
+    <img src="{{ assets.eyes.open }}" class="state eye-state active-state" id="eyes-open">
+    <img src="{{ assets.eyes.closed }}" class="state eye-state" id="eyes-closed">
+  </div>
+  <div class="character-layer">
+    <img src="{{ assets.mouth.closed }}" class="state mouth-state active-state" id="mouth-closed">
+    <img src="{{ assets.mouth.open }}" class="state mouth-state" id="mouth-open">
+  </div>
+</div>
+<script>
+const animationData = {{ timings|tojson }};
+const tl = gsap.timeline({ paused: true });
+function showState(selector, id) {
+    document.querySelectorAll(selector).forEach(el => el.classList.toggle('active-state', el.id === id));
+}
+animationData.mouth_events.forEach(event => {
+    tl.call(showState, ['.mouth-state', `mouth-${event.type}`], event.start);
+    tl.call(showState, ['.mouth-state', 'mouth-closed'], event.end);
+});
+animationData.blink_events.forEach(blink => {
+    tl.call(showState, ['.eye-state', 'eyes-closed'], blink.timestamp);
+    tl.call(showState, ['.eye-state', 'eyes-open'], blink.timestamp + 0.1);
+});
+window.seekFrame = t => { tl.seek(t, false); };
+</script></body></html>""")
+
+def make_character(folder):
+    """PNGs shaped like the coffee character's: full-frame background and body, and state
+    images that the layered CSS scales to 15% of the scene height."""
+    full = (VIEWPORT['width'], VIEWPORT['height'])
+
+    def layer(name, size, box, color, background=(0, 0, 0, 0), shape='ellipse'):
+        image = Image.new('RGBA', size, background)
+        getattr(ImageDraw.Draw(image), shape)(box, fill=color)
+        path = os.path.join(folder, f'{name}.png')
+        image.save(path)
+        return path
+
+    return {
+        'background': layer('background', full, (0, 1400, 1080, 1920), (90, 60, 40, 255), (30, 20, 60, 255),
+                            'rectangle'),
+        'body': layer('body', full, (240, 300, 840, 1700), (200, 150, 110, 255)),
+        'eyes': {
+            'open': layer('eyes_open', (600, 400), (100, 100, 500, 300), (255, 255, 255, 255)),
+            'closed': layer('eyes_closed', (600, 400), (100, 190, 500, 210), (40, 20, 20, 255), shape='rectangle'),
+        },
+        'mouth': {
+            'closed': layer('mouth_mid', (600, 400), (150, 190, 450, 210), (120, 30, 30, 255), shape='rectangle'),
+            'open': layer('mouth_wide', (600, 400), (150, 100, 450, 300), (120, 30, 30, 255)),
+        },
+    }
+
+def talking_timings(seconds):
+    """A mouth flap every 0.2 s and a blink every 3 s: a state change on most frames."""
+    mouth = [{'type': 'open', 'start': t / 10, 'end': t / 10 + 0.1} for t in range(0, int(seconds * 10), 2)]
+    blinks = [{'timestamp': float(t)} for t in range(1, int(seconds), 3)]
+    return {'mouth_events': mouth, 'blink_events': blinks}
+
+def decoded_mb(paths):
+    """Bytes the page keeps as decoded RGBA bitmaps for these images, in MB."""
+    return sum(Image.open(p).width * Image.open(p).height * 4 for p in set(paths) if p) / 2 ** 20
+
+def chromium_rss_mb():
+    """Resident memory of Chromium renderer and GPU processes (Linux /proc), or None elsewhere."""
+    if not os.path.isdir('/proc'):
+        return None
+    total_kb = 0
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+            if b'--type=renderer' not in cmdline and b'--type=gpu-process' not in cmdline:
+                continue
+            with open(f'/proc/{pid}/status') as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            continue
+    return total_kb / 1024
+
+async def measure(browser, html_path, times, output_path):
+    renderer = AnimationRenderer({'name': 'bench'}, mode='frames')
+    page = await browser.new_page(viewport=VIEWPORT)
+    try:
+        await renderer.open_scene(page, html_path)
+        start = time.perf_counter()
+        await renderer.render_frames(page, times, output_path)
+        elapsed = time.perf_counter() - start
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send('Performance.enable')
+        metrics = {m['name']: m['value'] for m in (await cdp.send('Performance.getMetrics'))['metrics']}
+        return {'fps': len(times) / elapsed, 'js_heap_mb': metrics['JSHeapUsedSize'] / 2 ** 20,
+                'rss_mb': chromium_rss_mb()}
+    finally:
+        await page.close()
+
+async def run(seconds, fps):
+    with tempfile.TemporaryDirectory() as folder:
+        assets = make_character(folder)
+        timings = talking_timings(seconds)
+        times = frame_times(seconds, fps)
+
+        before_html = os.path.join(folder, 'layered.html')
+        with open(before_html, 'w') as f:
+            f.write(LAYERED_TEMPLATE.render(assets=assets, timings=timings))
+        build_scene.CHARACTER_ASSETS[CHARACTER] = assets
+        after_html = AnimationRenderer({'name': 'bench_atlas', 'character': CHARACTER, 'timings': timings,
+                                        'audio_path': '', 'duration': seconds}, mode='frames').write_html()
+        scene = build_character_assets(CHARACTER, assets)
+        layer_files = [assets['background'], assets['body'], *assets['eyes'].values(), *assets['mouth'].values()]
+
+        results = {}
+        async with async_playwright() as p:
+            for label, html_path, images in (('before (layers)', before_html, layer_files),
+                                             ('after (atlas)', after_html, [scene['static'], scene['atlas']])):
+                browser = await p.chromium.launch()
+                try:
+                    results[label] = await measure(browser, html_path, times, os.path.join(folder, 'out.mp4'))
+                finally:
+                    await browser.close()
+                results[label]['bitmaps_mb'] = decoded_mb(images)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help="Timeline length rendered per variant")
+    parser.add_argument('--fps', type=int, default=FPS)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.seconds, args.fps))
+    print(f"{'variant':<18} {'render fps':>10} {'JS heap MB':>11} {'Chromium RSS MB':>16} {'bitmaps MB':>11}")
+    for label, r in results.items():
+        rss = f"{r['rss_mb']:.0f}" if r['rss_mb'] is not None else '-'
+        print(f"{label:<18} {r['fps']:>10.1f} {r['js_heap_mb']:>11.1f} {rss:>16} {r['bitmaps_mb']:>11.1f}")
+
+if __name__ == "__main__":
+    main()
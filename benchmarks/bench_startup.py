@@ -0,0 +1,111 @@
+"""Cold-start regression check for short CLI jobs, using `python -X importtime`.
+
+Each target module is imported in a fresh interpreter several times. The median
+cumulative import time is compared with its budget, and the slowest imports under it
+are listed. The "post one caption" job (social_media.post_caption) is also run end to
+end with --text/--dry-run, which loads config but makes no network calls, and its wall
+time is checked against COLD_START_BUDGET_MS. Modules that must stay out of the import
+path (HEAVY_MODULES) are reported if they appear. Exits with status 1 if any budget is
+exceeded, so it can gate CI.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --runs 7
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Budgets in milliseconds, measured on a warm disk cache
+IMPORT_BUDGETS_MS = {
+    'social_media.post_caption': 50,
+    'orchestrator': 150,
+    'config.settings': 20,
+    'audio.speech_to_text': 50,
+}
+COLD_START_BUDGET_MS = 400     # Interpreter start + imports + config for the caption job
+CAPTION_JOB = [sys.executable, '-m', 'social_media.post_caption', '--text', 'Mercury stations direct #astrology',
+               '--dry-run']
+
+# Imported only by the functions that need them
+HEAVY_MODULES = ['openai', 'httpx', 'psycopg', 'psycopg_pool', 'ollama', 'requests', 'numpy', 'onnxruntime',
+                 'googleapiclient', 'torch', 'whisper', 'playwright', 'yaml', 'dotenv']
+
+def parse_importtime(stderr):
+    """(name, self_us, cumulative_us, depth) for each line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def profile_import(module):
+    """Import module in a fresh interpreter; returns (importtime rows, heavy modules it loaded)."""
+    check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    heavy = [m for m in result.stdout.strip().split(',') if m]
+    return parse_importtime(result.stderr), heavy
+
+def module_cost_ms(rows, module):
+    for name, _, cumulative_us, depth in rows:
+        if name == module and depth == 0:
+            return cumulative_us / 1000
+    raise ValueError(f"{module} not found in the importtime output")
+
+def slowest(rows, module, top):
+    """The top slowest imports (by cumulative time) made while importing module."""
+    end = next(i for i, (name, _, _, depth) in enumerate(rows) if name == module and depth == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return sorted(rows[start:end], key=lambda row: row[2], reverse=True)[:top]
+
+def time_job(command, runs):
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        walls.append((time.perf_counter() - start) * 1000)
+    return statistics.median(walls)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help="Slowest imports listed per module")
+    parser.add_argument('modules', nargs='*', help="Modules to check (default: every module in IMPORT_BUDGETS_MS)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules or IMPORT_BUDGETS_MS:
+        budget = IMPORT_BUDGETS_MS.get(module)
+        samples = [profile_import(module) for _ in range(args.runs)]
+        cost = statistics.median(module_cost_ms(rows, module) for rows, _ in samples)
+        rows, heavy = samples[-1]
+        verdict = 'ok' if budget is None or cost <= budget else 'OVER BUDGET'
+        print(f"{module:<28} {cost:8.1f} ms  (budget {budget or '-'} ms)  {verdict}")
+        for name, self_us, cumulative_us, _ in slowest(rows, module, args.top):
+            print(f"    {cumulative_us / 1000:8.1f} ms cumulative  {self_us / 1000:7.1f} ms self  {name}")
+        if heavy:
+            print(f"    heavy modules imported: {', '.join(heavy)}")
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        if verdict != 'ok':
+            failures.append(f"{module} takes {cost:.1f} ms to import (budget {budget} ms)")
+
+    wall = time_job(CAPTION_JOB, args.runs)
+    verdict = 'ok' if wall <= COLD_START_BUDGET_MS else 'OVER BUDGET'
+    print(f"\npost one caption (--dry-run) {wall:8.1f} ms wall  (budget {COLD_START_BUDGET_MS} ms)  {verdict}")
+    if verdict != 'ok':
+        failures.append(f"caption job cold start {wall:.1f} ms (budget {COLD_START_BUDGET_MS} ms)")
+
+    if failures:
+        print("\nStartup regressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
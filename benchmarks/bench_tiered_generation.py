@@ -0,0 +1,67 @@
+"""Wall-clock time of tiered (draft + verify) generation against large-only generation.
+
+Uses a fixed prompt set: the horoscope prompts of three signs for a fixed date, plus two
+persona posts. Each prompt is generated once large-only and once tiered; the report shows
+both times, the saving, and how many drafted sections the large model accepted.
+
+Run from the project root with both models pulled in Ollama:
+    python -m benchmarks.bench_tiered_generation --draft mistral:7b --large wizard-vicuna-uncensored:30b
+"""
+import argparse
+import asyncio
+import datetime
+import os
+
+from ai_brain.prompts import OLLAMA_KEEP_ALIVE, build_horoscope_prompt
+from ai_brain.tiered_generation import DRAFT_MODEL, LARGE_MODEL, TieredGenerator
+from data_ingestion.solar_data import Sky
+
+FIXED_DATE = datetime.datetime(2025, 3, 20, 12, 0)
+SIGNS = ['Aries', 'Cancer', 'Capricorn']
+POST_PROMPTS = [
+    "Write a short social media post about today's Moon phase and what it means for the week ahead.",
+    "Write a short social media post reacting to Mercury stationing retrograde this week.",
+]
+PERSONA_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'lumina_person.txt')
+
+def prompt_set():
+    sky = Sky.compute(FIXED_DATE)
+    prompts = [('horoscope', build_horoscope_prompt(sky.view(sign))) for sign in SIGNS]
+    return prompts + [('post', prompt) for prompt in POST_PROMPTS]
+
+async def run(generator, prompts):
+    # Load both models first so neither mode pays the load time
+    await generator.generate('caption', "Hello")
+    await generator.generate('caption', "Hello", mode='large')
+
+    rows = []
+    for content_type, prompt in prompts:
+        baseline = await generator.generate(content_type, prompt, mode='large')
+        tiered = await generator.generate(content_type, prompt)
+        rows.append((content_type, baseline['elapsed_s'], tiered['elapsed_s'],
+                     tiered.get('accepted', 0), len(tiered.get('sections', []))))
+        print(f"  {content_type:<10} large {baseline['elapsed_s']:8.1f} s   tiered {tiered['elapsed_s']:8.1f} s   "
+              f"accepted {rows[-1][3]}/{rows[-1][4]}")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--draft', default=DRAFT_MODEL)
+    parser.add_argument('--large', default=LARGE_MODEL)
+    args = parser.parse_args()
+
+    with open(PERSONA_FILE, 'r', encoding='utf-8') as f:
+        persona = f.read()
+    generator = TieredGenerator(draft_model=args.draft, large_model=args.large, persona=persona,
+                                keep_alive=OLLAMA_KEEP_ALIVE)
+    rows = asyncio.run(run(generator, prompt_set()))
+    large_total = sum(row[1] for row in rows)
+    tiered_total = sum(row[2] for row in rows)
+    accepted = sum(row[3] for row in rows)
+    sections = sum(row[4] for row in rows)
+    print(f"\ntotal  large {large_total:.1f} s   tiered {tiered_total:.1f} s   "
+          f"saved {large_total - tiered_total:.1f} s ({(1 - tiered_total / large_total) * 100:.0f}%)   "
+          f"drafts accepted {accepted}/{sections}")
+
+if __name__ == "__main__":
+    main()
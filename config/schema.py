@@ -0,0 +1,102 @@
+"""Typed, frozen settings models; built by config.settings, which imports this module lazily."""
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+DEFAULT_PERSONA = "You are Lumina, a friendly AI astrologer."
+
+class FrozenModel(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+class DatabaseSettings(FrozenModel):
+    name: str = 'lumina'
+    user: Optional[str] = None
+    password: Optional[str] = Field(None, repr=False)
+    host: str = 'localhost'                     # host, or host:port
+    port: int = 5432                            # Used when host has no port
+    pool_min_size: int = Field(1, ge=0)
+    pool_max_size: int = Field(8, ge=1)
+    pool_timeout_s: float = Field(30.0, gt=0)   # Max wait for a free connection
+    max_idle_s: float = 600.0
+    max_lifetime_s: float = 3600.0
+    statement_timeout_ms: int = Field(30000, ge=0)
+
+class LLMSettings(FrozenModel):
+    # lm_studio_url and ollama_url may list several servers, comma separated
+    lm_studio_url: str = 'http://localhost:1234/v1'
+    lm_studio_api_key: str = 'lm-studio'        # LM Studio accepts any key
+    lm_studio_model: str = 'mistral-small-3.1-24b-instruct-2503'
+    ollama_url: str = 'http://localhost:11434'
+    ollama_chat_model: str = 'mistral-small:latest'
+    # Optional OpenAI-compatible fallback, only used when every local backend is down or failing
+    fallback_url: Optional[str] = None
+    fallback_model: str = 'gpt-4o-mini'
+    backend_concurrency: int = Field(2, ge=1)   # Parallel requests per server
+    cache_ttl_seconds: float = 7 * 24 * 3600
+    cache_max_entries: int = Field(5000, ge=1)
+    cache_max_bytes: int = Field(256 * 1024 * 1024, ge=1)
+
+class GenerationSettings(FrozenModel):
+    horoscope_concurrency: int = Field(3, ge=1)   # Signs generated at once
+
+class EmbeddingSettings(FrozenModel):
+    backend: Literal['ollama', 'local'] = 'ollama'
+    memory_entries: int = Field(10000, ge=0)       # In-process LRU tier of the embedding cache
+
+class XKeys(FrozenModel):
+    api_key: Optional[str] = None
+    api_key_secret: Optional[str] = None
+    bearer_token: Optional[str] = None
+    access_token: Optional[str] = None
+    access_token_secret: Optional[str] = None
+
+class MetaKeys(FrozenModel):
+    app_id: Optional[str] = None
+    app_secret: Optional[str] = None
+    access_token: Optional[str] = None
+    app_credentials: Optional[str] = None
+
+class TikTokKeys(FrozenModel):
+    client_key: Optional[str] = None
+    client_secret: Optional[str] = None
+
+class RedditKeys(FrozenModel):
+    client_id: Optional[str] = None
+    client_secret: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+
+class ApiKeys(FrozenModel):
+    primary_llm: Optional[str] = None   # MISTRAL_API_KEY, else OPENAI_API_KEY, else DEEPSEEK_API_KEY
+    hf_token: Optional[str] = None
+    searchapi: Optional[str] = None
+    google: Optional[str] = None
+    google_search_engine_id: Optional[str] = None
+    openai: Optional[str] = None
+    deepseek: Optional[str] = None
+    gemini: Optional[str] = None
+    llm_fallback: Optional[str] = None  # LLM_FALLBACK_API_KEY, else OPENAI_API_KEY
+    x: XKeys = XKeys()
+    meta: MetaKeys = MetaKeys()
+    tiktok: TikTokKeys = TikTokKeys()
+    reddit: RedditKeys = RedditKeys()
+
+class Settings(FrozenModel):
+    """Everything configurable, merged from defaults, config/settings.yml and the environment/.env."""
+    database: DatabaseSettings = DatabaseSettings()
+    llm: LLMSettings = LLMSettings()
+    generation: GenerationSettings = GenerationSettings()
+    embedding: EmbeddingSettings = EmbeddingSettings()
+    api_keys: ApiKeys = Field(ApiKeys(), repr=False)
+    persona: str = Field(DEFAULT_PERSONA, repr=False)
+    env: dict[str, str] = Field(default_factory=dict, repr=False)   # Raw environment, for values not modelled here
+
+    def get(self, name, default=None):
+        """Environment variable (process environment first, then .env), or default."""
+        value = self.env.get(name)
+        return default if value in (None, '') else value
+
+    def tuning(self):
+        """The hot-reloadable knobs (everything but keys, persona and raw environment)."""
+        return self.model_dump(include={'database', 'llm', 'generation', 'embedding'},
+                               exclude={'database': {'password'}})
@@ -0,0 +1,253 @@
+import logging
+import os
+import threading
+import time
+
+# Constants
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_DIR = os.path.join(PROJECT_ROOT, 'config')
+SETTINGS_FILE = os.path.join(CONFIG_DIR, 'settings.yml')
+ENV_FILE = os.path.join(PROJECT_ROOT, '.env')
+PERSONA_FILE = os.path.join(CONFIG_DIR, 'lumina_person.txt')
+POLL_INTERVAL_S = 2.0      # File check interval when watchdog (inotify) is unavailable
+DEBOUNCE_S = 0.25          # Editors write a file in several steps; reload once they are done
+
+# Environment variables that override a settings.yml value: name -> (section, field)
+ENV_OVERRIDES = {
+    **{f"DB_{field.upper()}": ('database', field) for field in (
+        'name', 'user', 'password', 'host', 'port',
+        'pool_min_size', 'pool_max_size', 'pool_timeout_s', 'max_idle_s', 'max_lifetime_s', 'statement_timeout_ms')},
+    'LM_STUDIO_URL': ('llm', 'lm_studio_url'),
+    'LM_STUDIO_API_KEY': ('llm', 'lm_studio_api_key'),
+    'LM_STUDIO_MODEL': ('llm', 'lm_studio_model'),
+    'OLLAMA_API_BASE_URL': ('llm', 'ollama_url'),
+    'OLLAMA_CHAT_MODEL': ('llm', 'ollama_chat_model'),
+    'LLM_FALLBACK_URL': ('llm', 'fallback_url'),
+    'LLM_FALLBACK_MODEL': ('llm', 'fallback_model'),
+    'LLM_BACKEND_CONCURRENCY': ('llm', 'backend_concurrency'),
+    'LLM_CACHE_TTL_SECONDS': ('llm', 'cache_ttl_seconds'),
+    'LLM_CACHE_MAX_ENTRIES': ('llm', 'cache_max_entries'),
+    'LLM_CACHE_MAX_BYTES': ('llm', 'cache_max_bytes'),
+    'HOROSCOPE_CONCURRENCY': ('generation', 'horoscope_concurrency'),
+    'EMBEDDING_BACKEND': ('embedding', 'backend'),
+    'EMBEDDING_CACHE_MEMORY_ENTRIES': ('embedding', 'memory_entries'),
+}
+
+_settings = None
+_callbacks = []
+_injected = {}             # .env values this module put into os.environ
+_lock = threading.RLock()
+_watcher = None
+
+def _read_environment(env_file):
+    """The process environment with env_file applied under it, mirrored into os.environ.
+
+    Real environment variables win over .env. Values that came from an earlier read of
+    env_file are updated (or removed) when the file changes, so os.getenv() callers agree
+    with the settings object.
+    """
+    from dotenv import dotenv_values
+
+    values = {}
+    if os.path.exists(env_file):
+        values = {key: value for key, value in dotenv_values(env_file).items() if value is not None}
+    for key in list(_injected):
+        if key not in values:
+            if os.environ.get(key) == _injected[key]:
+                del os.environ[key]
+            del _injected[key]
+    for key, value in values.items():
+        if key not in os.environ or os.environ[key] == _injected.get(key):
+            os.environ[key] = value
+            _injected[key] = value
+    return dict(os.environ)
+
+def _read_yaml(settings_file):
+    import yaml
+    if not os.path.exists(settings_file):
+        return {}
+    with open(settings_file, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+def _read_persona(persona_file):
+    from config.schema import DEFAULT_PERSONA
+    try:
+        with open(persona_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError as e:
+        logging.warning(f"Lumina persona file not readable at {persona_file} ({e}); using the default persona")
+        return DEFAULT_PERSONA
+
+def _api_keys(env):
+    get = env.get
+    return {
+        'primary_llm': get("MISTRAL_API_KEY") or get("OPENAI_API_KEY") or get("DEEPSEEK_API_KEY"),
+        'hf_token': get("HF_TOKEN"),
+        'searchapi': get("SEARCHAPI_API_KEY"),
+        'google': get("GOOGLE_API_KEY"),
+        'google_search_engine_id': get("GOOGLE_CUSTOM_SEARCH_ALPHA_ID"),
+        'openai': get("OPENAI_API_KEY"),
+        'deepseek': get("DEEPSEEK_API_KEY"),
+        'gemini': get("GOOGLEGEMINI_API_KEY"),
+        'llm_fallback': get("LLM_FALLBACK_API_KEY") or get("OPENAI_API_KEY"),
+        'x': {'api_key': get("X_API_KEY"), 'api_key_secret': get("X_API_KEY_SECRET"),
+              'bearer_token': get("X_BEARER_TOKEN"), 'access_token': get("X_ACCESS_TOKEN"),
+              'access_token_secret': get("X_ACCESS_SECRET")},
+        'meta': {'app_id': get("META_APP_ID"), 'app_secret': get("META_APP_SECRET"),
+                 'access_token': get("META_API_KEY"), 'app_credentials': get("META_APP_CREDENTIALS")},
+        'tiktok': {'client_key': get("TIKTOK_API_KEY"), 'client_secret': get("TIKTOK_SECRET_KEY")},
+        'reddit': {'client_id': get("REDDIT_CLIENT_ID"), 'client_secret': get("REDDIT_CLIENT_SECRET"),
+                   'username': get("REDDIT_USERNAME"), 'password': get("REDDIT_PASSWORD")},
+    }
+
+def load_settings(env_file=ENV_FILE, settings_file=SETTINGS_FILE, persona_file=PERSONA_FILE):
+    """Build a new Settings: model defaults, overridden by settings.yml, overridden by the environment/.env.
+
+    Raises pydantic.ValidationError (or a YAML error) if the files hold invalid values.
+    """
+    from config.schema import Settings
+
+    env = _read_environment(env_file)
+    data = {section: dict(values or {}) for section, values in _read_yaml(settings_file).items()
+            if section in Settings.model_fields and isinstance(values, dict)}
+    for name, (section, field) in ENV_OVERRIDES.items():
+        if env.get(name):
+            data.setdefault(section, {})[field] = env[name]
+    return Settings(**data, api_keys=_api_keys(env), persona=_read_persona(persona_file), env=env)
+
+def get_settings():
+    """The process-wide Settings, parsed on first use and replaced only by reload_settings()."""
+    global _settings
+    with _lock:
+        if _settings is None:
+            _settings = load_settings()
+    return _settings
+
+def on_reload(callback):
+    """Call callback(new, old) whenever reload_settings() swaps in changed settings."""
+    with _lock:
+        _callbacks.append(callback)
+    return callback
+
+def reload_settings(**paths):
+    """Re-read the files and swap in the new Settings if they changed.
+
+    Invalid files are logged and the current settings kept, so a typo made while the
+    stream is running does not take it down. Returns the settings in effect.
+    """
+    global _settings
+    with _lock:
+        old = _settings
+        try:
+            new = load_settings(**paths)
+        except Exception as e:
+            logging.error(f"Settings not reloaded, keeping the current ones: {e}")
+            return old
+        if new == old:
+            return old
+        _settings = new
+        callbacks = list(_callbacks)
+    if old is not None:
+        changed = [name for name in ('persona', 'database', 'llm', 'generation', 'embedding', 'api_keys')
+                   if getattr(new, name) != getattr(old, name)]
+        logging.info(f"Settings reloaded ({', '.join(changed) or 'environment'} changed)")
+        for callback in callbacks:
+            try:
+                callback(new, old)
+            except Exception as e:
+                logging.error(f"Settings reload callback {callback!r} failed: {e}", exc_info=True)
+    return new
+
+class SettingsWatcher:
+    """Reloads the settings when .env, settings.yml or the persona file changes.
+
+    Uses watchdog (inotify on Linux) when it is installed and falls back to polling
+    modification times every poll_interval_s otherwise. Changes are debounced and applied
+    by reload_settings() on the watcher's own thread.
+    """
+
+    def __init__(self, paths=(ENV_FILE, SETTINGS_FILE, PERSONA_FILE), poll_interval_s=POLL_INTERVAL_S,
+                 debounce_s=DEBOUNCE_S, use_watchdog=True, reload=reload_settings):
+        self.paths = {os.path.abspath(p) for p in paths}
+        self.poll_interval_s = poll_interval_s
+        self.debounce_s = debounce_s
+        self.use_watchdog = use_watchdog
+        self.reload = reload
+        self.reloads = 0
+        self.backend = None
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def _mtimes(self):
+        return {p: os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in self.paths}
+
+    def _start_watchdog(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Editors often save by writing a temp file and renaming it over the original
+                touched = {os.path.abspath(p) for p in (event.src_path, getattr(event, 'dest_path', None)) if p}
+                if touched & watcher.paths:
+                    watcher._changed.set()
+
+        observer = Observer()
+        for directory in {os.path.dirname(p) for p in self.paths}:
+            if os.path.isdir(directory):
+                observer.schedule(Handler(), directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def _run(self):
+        mtimes = self._mtimes()
+        while not self._stopping.is_set():
+            if self._observer is None:
+                # Polling fallback
+                self._stopping.wait(self.poll_interval_s)
+                current = self._mtimes()
+                if current != mtimes:
+                    mtimes = current
+                    self._changed.set()
+            else:
+                self._changed.wait(self.poll_interval_s)
+            if self._changed.is_set() and not self._stopping.is_set():
+                time.sleep(self.debounce_s)
+                self._changed.clear()
+                self.reload()
+                self.reloads += 1
+
+    def start(self):
+        if self.use_watchdog:
+            try:
+                self._observer = self._start_watchdog()
+                self.backend = 'watchdog'
+            except Exception as e:
+                logging.info(f"watchdog unavailable ({e}); polling settings files every {self.poll_interval_s}s")
+        self.backend = self.backend or 'polling'
+        self._thread = threading.Thread(target=self._run, name='settings-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+def watch_settings(**kwargs):
+    """Start the process-wide SettingsWatcher (once) for long-running processes."""
+    global _watcher
+    with _lock:
+        if _watcher is None:
+            get_settings()
+            _watcher = SettingsWatcher(**kwargs).start()
+    return _watcher
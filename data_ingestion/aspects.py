@@ -0,0 +1,142 @@
+import logging
+import numpy as np
+
+# Compact record for a single aspect hit; body indices refer to the input order
+ASPECT_DTYPE = np.dtype([
+    ('body1', np.int16),
+    ('body2', np.int16),
+    ('aspect', np.int8),    # index into the aspect_types keys
+    ('angle', np.float64),  # angular separation in degrees, 0-180
+    ('orb', np.float32)     # deviation from the exact aspect angle
+])
+
+# Aspect types and their properties (angle, orb)
+ASPECT_TYPES = {
+    'conjunction': (0, 10),
+    'semisextile': (30, 2),
+    'sextile': (60, 6),
+    'square': (90, 8),
+    'trine': (120, 8),
+    'quincunx': (150, 2),
+    'opposition': (180, 10)
+}
+
+# Below this many bodies the full pairwise matrix is cheaper than sorting and sweeping
+PAIRWISE_THRESHOLD = 100
+
+# Tolerance added to window edges before the exact orb test
+_EDGE_EPSILON = 1e-9
+
+def separation(lon1, lon2):
+    """Angular separation between two longitudes (or arrays of them), in 0-180 degrees."""
+    angle = np.abs((np.asarray(lon1) - np.asarray(lon2)) % 360)
+    return np.where(angle > 180, 360 - angle, angle)
+
+def _finish(body1, body2, aspect, angle, orb):
+    """Pack parallel arrays into a structured array ordered like the pair x aspect loop."""
+    result = np.empty(len(body1), dtype=ASPECT_DTYPE)
+    result['body1'] = body1
+    result['body2'] = body2
+    result['aspect'] = aspect
+    result['angle'] = angle
+    result['orb'] = orb
+    return result[np.lexsort((result['aspect'], result['body2'], result['body1']))]
+
+def _find_pairwise(longitudes, targets, orbs):
+    """Full pairwise separation matrix; best for small body counts."""
+    i, j = np.triu_indices(len(longitudes), 1)
+    angle = separation(longitudes[i], longitudes[j])
+    deviation = np.abs(angle[:, None] - targets[None, :])
+    pair, aspect = np.nonzero(deviation <= orbs[None, :])
+    return _finish(i[pair], j[pair], aspect, angle[pair], deviation[pair, aspect])
+
+def _find_sweep(longitudes, targets, orbs):
+    """Sort longitudes once and sweep each aspect window with binary searches.
+
+    Every unordered pair has a forward (counter-clockwise) separation of at most 180
+    degrees from one of its two members, so each aspect window only needs to be
+    searched forwards from every body, over the longitudes unrolled to 0-720.
+    Cost is O(n log n) per aspect type plus the number of hits.
+    """
+    n = len(longitudes)
+    order = np.argsort(longitudes, kind='stable')
+    ordered = longitudes[order]
+    unrolled = np.concatenate([ordered, ordered + 360])
+    index = np.arange(n)
+
+    hits = []
+    for k, (target, orb) in enumerate(zip(targets, orbs)):
+        low = max(target - orb, 0.0) - _EDGE_EPSILON
+        high = min(target + orb, 180.0) + _EDGE_EPSILON
+        left = np.maximum(np.searchsorted(unrolled, ordered + low, 'left'), index + 1)
+        right = np.minimum(np.searchsorted(unrolled, ordered + high, 'right'), index + n)
+        counts = np.clip(right - left, 0, None)
+        total = int(counts.sum())
+        if not total:
+            continue
+
+        first = np.repeat(index, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = np.repeat(left, counts) + offsets
+
+        body_a = order[first]
+        body_b = order[second % n]
+        body1 = np.minimum(body_a, body_b)
+        body2 = np.maximum(body_a, body_b)
+        angle = separation(longitudes[body1], longitudes[body2])
+        deviation = np.abs(angle - target)
+        # Exact-orb test, and drop the duplicate of pairs exactly 180° apart
+        keep = (deviation <= orb) & ((unrolled[second] - ordered[first] < 180) | (body_a < body_b))
+        hits.append((body1[keep], body2[keep], np.full(int(keep.sum()), k),
+                     angle[keep], deviation[keep]))
+
+    if not hits:
+        return np.empty(0, dtype=ASPECT_DTYPE)
+    return _finish(*(np.concatenate(column) for column in zip(*hits)))
+
+def find_aspects(longitudes, aspect_types, method=None):
+    """Find every pair of bodies within the orb of each aspect type.
+
+    Args:
+        longitudes: Ecliptic longitudes in degrees, one per body.
+        aspect_types: Mapping of aspect name to (angle, orb), e.g. ASPECT_TYPES.
+        method: 'sweep', 'pairwise', or None to choose by body count.
+
+    Returns:
+        A structured array of ASPECT_DTYPE, ordered by (body1, body2, aspect) like the
+        nested pair loop it replaces.
+    """
+    try:
+        longitudes = np.asarray(longitudes, dtype=np.float64) % 360
+        targets = np.array([angle for angle, _ in aspect_types.values()], dtype=np.float64)
+        orbs = np.array([orb for _, orb in aspect_types.values()], dtype=np.float64)
+
+        if method is None:
+            method = 'pairwise' if len(longitudes) <= PAIRWISE_THRESHOLD else 'sweep'
+        if method == 'pairwise':
+            return _find_pairwise(longitudes, targets, orbs)
+        if method == 'sweep':
+            return _find_sweep(longitudes, targets, orbs)
+        raise ValueError(f"Unknown aspect search method: {method}")
+
+    except Exception as e:
+        logging.error(f"Error finding aspects: {e}")
+        raise
+
+def aspects_to_dicts(aspects, body_names, aspect_types, planet_signs, keys=('body1', 'body2')):
+    """Expand a structured aspect array into the list-of-dicts layout used in the JSON output."""
+    aspect_names = list(aspect_types)
+    key1, key2 = keys
+    result = []
+    for body1, body2, aspect, angle, _ in aspects.tolist():
+        name1 = body_names[body1]
+        name2 = body_names[body2]
+        result.append({
+            key1: name1,
+            key2: name2,
+            'aspect': aspect_names[aspect],
+            'angle': round(angle, 2),
+            'sign1': planet_signs[name1],
+            'sign2': planet_signs[name2]
+        })
+    return result
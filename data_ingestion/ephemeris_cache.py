@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import sys
+import numpy as np
+import swisseph as swe
+
+from data_ingestion.solar_data import BODIES, LONGITUDE, SPEED, get_planet_positions_batch
+
+# Constants
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'ephemeris_cache')
+MANIFEST_FILE = 'manifest.json'
+CADENCE_HOURS = 12
+MAX_ERROR_ARCSEC = 1.0
+
+# Column layout of the cached per-body values
+CACHE_LONGITUDE, CACHE_SPEED = range(2)
+
+def _year_start(year):
+    return swe.julday(year, 1, 1, 0.0)
+
+def _chunk_path(cache_dir, year):
+    return os.path.join(cache_dir, f"ephemeris_{year}.npy")
+
+def _wrap180(angle):
+    return (angle + 180) % 360 - 180
+
+def hermite(samples, fraction, step_days):
+    """Cubic Hermite interpolation between two cached samples.
+
+    Args:
+        samples: (2, ..., 2) array of [longitude, speed] at both ends of the interval.
+        fraction: Position within the interval, 0-1 (scalar or broadcastable array).
+        step_days: Interval length in days; speeds are degrees per day.
+
+    Returns:
+        (..., 2) interpolated [longitude, speed].
+    """
+    u = np.asarray(fraction, dtype=np.float64)
+    p0 = samples[0][..., CACHE_LONGITUDE]
+    p1 = p0 + _wrap180(samples[1][..., CACHE_LONGITUDE] - p0)
+    m0 = samples[0][..., CACHE_SPEED] * step_days
+    m1 = samples[1][..., CACHE_SPEED] * step_days
+
+    u2 = u * u
+    u3 = u2 * u
+    longitude = (2 * u3 - 3 * u2 + 1) * p0 + (u3 - 2 * u2 + u) * m0 + (3 * u2 - 2 * u3) * p1 + (u3 - u2) * m1
+    speed = ((6 * u2 - 6 * u) * p0 + (3 * u2 - 4 * u + 1) * m0 + (6 * u - 6 * u2) * p1 + (3 * u2 - 2 * u) * m1) / step_days
+    return np.stack([longitude % 360, speed], axis=-1)
+
+def build_cache(years, cache_dir=CACHE_DIR, bodies=None, cadence_hours=CADENCE_HOURS,
+                max_error_arcsec=MAX_ERROR_ARCSEC):
+    """Precompute longitudes and speeds for whole years from the swisseph ephemeris files.
+
+    Each year is written to its own .npy file of shape (samples, body, 2), spanning
+    1 January 00:00 to the next 1 January inclusive so interpolation never needs two
+    files. Positions are also computed at every interval midpoint, where the Hermite
+    error peaks, and the build fails if any body exceeds max_error_arcsec there.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        body_names = tuple(bodies) if bodies is not None else tuple(BODIES)
+        step_days = cadence_hours / 24.0
+
+        manifest = {'cadence_hours': cadence_hours, 'bodies': list(body_names), 'years': {}}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                existing = json.load(f)
+            if existing['cadence_hours'] == cadence_hours and existing['bodies'] == list(body_names):
+                manifest = existing
+
+        for year in years:
+            start = _year_start(year)
+            intervals = int(round((_year_start(year + 1) - start) / step_days))
+
+            # Even rows are the cached samples, odd rows the midpoints used for validation
+            grid = get_planet_positions_batch(start + np.arange(2 * intervals + 1) * step_days / 2,
+                                              bodies=body_names).values[..., [LONGITUDE, SPEED]]
+            nodes = grid[0::2]
+            midpoints = grid[1::2]
+
+            estimate = hermite(np.stack([nodes[:-1], nodes[1:]]), 0.5, step_days)
+            error = np.abs(_wrap180(estimate[..., CACHE_LONGITUDE] - midpoints[..., CACHE_LONGITUDE])).max(axis=0) * 3600
+            worst = int(error.argmax())
+            if error[worst] > max_error_arcsec:
+                raise ValueError(f"Interpolation error for {body_names[worst]} in {year} is "
+                                 f"{error[worst]:.3f} arcsec, above the {max_error_arcsec} arcsec bound; "
+                                 f"use a shorter cadence than {cadence_hours} hours")
+
+            chunk = np.lib.format.open_memmap(_chunk_path(cache_dir, year), mode='w+',
+                                              dtype=np.float64, shape=nodes.shape)
+            chunk[:] = nodes
+            chunk.flush()
+            del chunk
+
+            manifest['years'][str(year)] = {
+                'start_jd': start,
+                'samples': int(nodes.shape[0]),
+                'max_error_arcsec': {body: round(float(e), 6) for body, e in zip(body_names, error)}
+            }
+            logging.info(f"Cached {year}: {nodes.shape[0]} samples, worst error {error[worst]:.4f} arcsec "
+                         f"({body_names[worst]})")
+
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=4)
+        return EphemerisCache(cache_dir)
+
+    except Exception as e:
+        logging.error(f"Error building ephemeris cache: {e}")
+        raise
+
+class EphemerisCache:
+    """Read-only view of a prebuilt ephemeris cache; chunks are memory-mapped on first use."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_error_arcsec=MAX_ERROR_ARCSEC):
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+        self.cache_dir = cache_dir
+        self.bodies = tuple(manifest['bodies'])
+        self.step_days = manifest['cadence_hours'] / 24.0
+        self.years = {int(year): info for year, info in manifest['years'].items()
+                      if max(info['max_error_arcsec'].values()) <= max_error_arcsec}
+        self._chunks = {}
+
+    def _chunk(self, year):
+        if year not in self._chunks:
+            self._chunks[year] = np.load(_chunk_path(self.cache_dir, year), mmap_mode='r')
+        return self._chunks[year]
+
+    def _locate(self, jd):
+        """Return (year, sample index, fraction) of the interval containing jd."""
+        year = swe.revjul(jd)[0]
+        info = self.years.get(year)
+        if info is None:
+            raise KeyError(f"JD {jd} (year {year}) is not in the ephemeris cache")
+        offset = (jd - info['start_jd']) / self.step_days
+        index = min(int(offset), info['samples'] - 2)
+        return year, index, offset - index
+
+    def covers(self, jd):
+        """True if jd falls in a cached year."""
+        return swe.revjul(jd)[0] in self.years
+
+    def samples(self, jd):
+        """Return the two cached samples bracketing jd, as a zero-copy (2, body, 2) memmap slice."""
+        year, index, _ = self._locate(jd)
+        return self._chunk(year)[index:index + 2]
+
+    def positions(self, jd):
+        """Interpolated (body, 2) [longitude, speed] at a Julian Day."""
+        year, index, fraction = self._locate(jd)
+        return hermite(self._chunk(year)[index:index + 2], fraction, self.step_days)
+
+    def positions_batch(self, jds):
+        """Interpolated (time, body, 2) [longitude, speed] for an array of Julian Days."""
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        result = np.empty((jds.size, len(self.bodies), 2), dtype=np.float64)
+        years = np.array([swe.revjul(jd)[0] for jd in jds.tolist()])
+        for year in np.unique(years).tolist():
+            info = self.years.get(year)
+            if info is None:
+                raise KeyError(f"Year {year} is not in the ephemeris cache")
+            mask = years == year
+            offset = (jds[mask] - info['start_jd']) / self.step_days
+            index = np.minimum(offset.astype(np.int64), info['samples'] - 2)
+            chunk = self._chunk(year)
+            samples = np.stack([chunk[index], chunk[index + 1]])
+            result[mask] = hermite(samples, (offset - index)[:, None], self.step_days)
+        return result
+
+if __name__ == "__main__":
+    # Build offline from the files under EPHEMERIS_PATH, e.g.:
+    #   python -m data_ingestion.ephemeris_cache 2020 2035
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    first_year, last_year = int(sys.argv[1]), int(sys.argv[2])
+    build_cache(range(first_year, last_year + 1))
@@ -0,0 +1,220 @@
+import logging
+import sys
+import numpy as np
+import swisseph as swe
+
+from data_ingestion.solar_data import (
+    ASPECT_TYPES, BODIES, EPHEMERIS_PATH, LONGITUDE, SPEED, ZODIAC_SIGNS,
+    datetime_from_julian_day, get_planet_positions_batch, get_zodiac_sign
+)
+
+# Coarse sampling step in days. Short enough that no body crosses two sign boundaries,
+# turns around twice, or passes through an aspect and back within one step.
+DEFAULT_STEP_DAYS = 1.0
+
+# Refinement tolerance in days (about one second)
+TIME_TOLERANCE = 1e-5
+
+# Bodies that never station, or whose "stations" are just the true node wobbling
+NO_STATION_BODIES = {'Sun', 'Moon', 'North Node', 'South Node'}
+
+def wrap180(angle):
+    """Wrap an angle (or array of angles) into the range [-180, 180)."""
+    return (np.asarray(angle) + 180) % 360 - 180
+
+def body_state(body_name, jd):
+    """Return (longitude, speed) of a single body at a Julian Day."""
+    if body_name == 'South Node':
+        longitude, speed = body_state('North Node', jd)
+        return (longitude + 180) % 360, speed
+    pos, _ = swe.calc_ut(jd, BODIES[body_name], swe.FLG_SWIEPH | swe.FLG_SPEED)
+    return pos[LONGITUDE], pos[SPEED]
+
+def _state_lookup():
+    """body_state with a per-search memo, so the root's final evaluation is reused."""
+    states = {}
+
+    def lookup(body_name, jd):
+        key = (body_name, jd)
+        if key not in states:
+            states[key] = body_state(body_name, jd)
+        return states[key]
+
+    return lookup
+
+def brent(f, a, b, fa, fb, tol=TIME_TOLERANCE, max_iter=60):
+    """Find a root of f bracketed by [a, b] with Brent's method."""
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol1 = 2 * sys.float_info.epsilon * abs(b) + 0.5 * tol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or fb == 0:
+            return b
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            # Inverse quadratic interpolation, or secant when only two points are distinct
+            s = fb / fa
+            if a == c:
+                p = 2 * xm * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * xm * q - abs(tol1 * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = e = xm
+        else:
+            d = e = xm
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else (tol1 if xm > 0 else -tol1)
+        fb = f(b)
+    return b
+
+def _crossings(values):
+    """Indices t where a continuous signed function changes sign between t and t + 1.
+
+    Jumps larger than 90 degrees are wrap-around discontinuities, not crossings.
+    """
+    before, after = values[:-1], values[1:]
+    changed = (np.signbit(before) != np.signbit(after)) & (np.abs(after - before) < 90)
+    return np.nonzero(changed)[0]
+
+def _event(kind, jd, **fields):
+    return {'event': kind, 'jd': float(jd), 'time_utc': datetime_from_julian_day(jd).isoformat() + 'Z', **fields}
+
+def _ingresses(grid, body_name):
+    """Sign ingresses of one body over the sampled grid."""
+    jds = grid.jd
+    longitudes = grid.column(body_name)[:, LONGITUDE]
+    sign_index = grid.sign_index[:, grid.bodies.index(body_name)]
+
+    events = []
+    for t in np.nonzero(sign_index[:-1] != sign_index[1:])[0]:
+        direct = wrap180(longitudes[t + 1] - longitudes[t]) > 0
+        boundary = 30.0 * (sign_index[t + 1] if direct else sign_index[t])
+        lookup = _state_lookup()
+
+        def offset(jd):
+            return float(wrap180(lookup(body_name, jd)[0] - boundary))
+
+        jd = brent(offset, jds[t], jds[t + 1],
+                   float(wrap180(longitudes[t] - boundary)), float(wrap180(longitudes[t + 1] - boundary)))
+        events.append(_event('ingress', jd,
+                             body=body_name,
+                             sign=ZODIAC_SIGNS[sign_index[t + 1]],
+                             from_sign=ZODIAC_SIGNS[sign_index[t]],
+                             retrograde=not direct))
+    return events
+
+def _stations(grid, body_name):
+    """Retrograde and direct stations (speed sign changes) of one body over the grid."""
+    jds = grid.jd
+    speeds = grid.column(body_name)[:, SPEED]
+
+    events = []
+    for t in np.nonzero(np.signbit(speeds[:-1]) != np.signbit(speeds[1:]))[0]:
+        lookup = _state_lookup()
+        jd = brent(lambda jd: lookup(body_name, jd)[1], jds[t], jds[t + 1], speeds[t], speeds[t + 1])
+        longitude = lookup(body_name, jd)[0]
+        events.append(_event('station', jd,
+                             body=body_name,
+                             direction='retrograde' if speeds[t] > 0 else 'direct',
+                             longitude=longitude,
+                             sign=get_zodiac_sign(longitude)))
+    return events
+
+def _exact_aspects(grid, body1, body2, aspect_types):
+    """Instants where the separation of two bodies equals an aspect angle exactly."""
+    jds = grid.jd
+    difference = grid.column(body1)[:, LONGITUDE] - grid.column(body2)[:, LONGITUDE]
+
+    events = []
+    for aspect_name, (angle, _) in aspect_types.items():
+        # Aspects other than the conjunction and opposition occur on either side
+        for target in {angle, -angle} if angle % 180 else {angle}:
+            offsets = wrap180(difference - target)
+            for t in _crossings(offsets):
+                lookup = _state_lookup()
+
+                def offset(jd):
+                    return float(wrap180(lookup(body1, jd)[0] - lookup(body2, jd)[0] - target))
+
+                jd = brent(offset, jds[t], jds[t + 1], float(offsets[t]), float(offsets[t + 1]))
+                events.append(_event('aspect', jd,
+                                     body1=body1,
+                                     body2=body2,
+                                     aspect=aspect_name,
+                                     sign1=get_zodiac_sign(lookup(body1, jd)[0]),
+                                     sign2=get_zodiac_sign(lookup(body2, jd)[0])))
+    return events
+
+def find_events(start_jd, end_jd, bodies=None, ingresses=True, stations=True,
+                aspect_types=ASPECT_TYPES, aspect_bodies=None, step_days=DEFAULT_STEP_DAYS):
+    """Find sign ingresses, retrograde stations and exact aspects between two Julian Days.
+
+    All bodies are sampled once on a coarse grid with get_planet_positions_batch; every
+    bracketed sign change of a boundary offset, speed or aspect offset is then refined
+    with Brent's method, so the cost grows with the number of events rather than with
+    the time resolution.
+
+    Args:
+        start_jd, end_jd: Julian Days (UT) bounding the search.
+        bodies: Body names to scan, defaults to all of BODIES.
+        ingresses, stations: Whether to search for those event types.
+        aspect_types: Mapping of aspect name to (angle, orb), or None to skip aspects.
+        aspect_bodies: Bodies to pair up for exact aspects, defaults to bodies.
+        step_days: Coarse sampling step.
+
+    Returns:
+        A list of event dicts sorted by 'jd' (empty when start_jd is not before end_jd).
+    """
+    if start_jd >= end_jd:
+        return []
+    try:
+        swe.set_ephe_path(EPHEMERIS_PATH)
+
+        body_names = list(bodies) if bodies is not None else list(BODIES)
+        pair_bodies = list(aspect_bodies) if aspect_bodies is not None else body_names
+        scanned = body_names + [body for body in pair_bodies if body not in body_names]
+
+        jds = np.arange(start_jd, end_jd, step_days)
+        jds = np.append(jds, end_jd) if jds[-1] < end_jd else jds
+        grid = get_planet_positions_batch(jds, bodies=scanned)
+
+        events = []
+        for body_name in body_names:
+            if ingresses:
+                events.extend(_ingresses(grid, body_name))
+            if stations and body_name not in NO_STATION_BODIES:
+                events.extend(_stations(grid, body_name))
+        if aspect_types:
+            for i, body1 in enumerate(pair_bodies):
+                for body2 in pair_bodies[i + 1:]:
+                    if {body1, body2} == {'North Node', 'South Node'}:
+                        continue
+                    events.extend(_exact_aspects(grid, body1, body2, aspect_types))
+
+        events.sort(key=lambda event: event['jd'])
+        logging.info(f"Found {len(events)} events between JD {start_jd} and {end_jd}")
+        return events
+
+    except Exception as e:
+        logging.error(f"Error finding events: {e}")
+        raise
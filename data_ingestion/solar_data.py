@@ -3,23 +3,15 @@ import json
 import os
 import logging
 from pathlib import Path
+from typing import NamedTuple
+import numpy as np
 import swisseph as swe
+from data_ingestion.aspects import ASPECT_TYPES, find_aspects, aspects_to_dicts
 
 # Constants
 OUTPUT_DIR = r"D:\AI\nebles\database\embedding_processor"
 EPHEMERIS_PATH = r"./ephemeris"  # Adjust to your ephemeris file directory
 
-# Aspect types and their properties (angle, orb)
-ASPECT_TYPES = {
-    'conjunction': (0, 10),
-    'semisextile': (30, 2),
-    'sextile': (60, 6),
-    'square': (90, 8),
-    'trine': (120, 8),
-    'quincunx': (150, 2),
-    'opposition': (180, 10)
-}
-
 # Zodiac signs and their corresponding rulers
 ZODIAC_SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 
                 'Leo', 'Virgo', 'Libra', 'Scorpio', 
@@ -62,6 +54,25 @@ BODIES = {
     'Vesta': swe.VESTA
 }
 
+# Column layout of the per-body values returned by get_planet_positions_batch
+LONGITUDE, LATITUDE, DISTANCE, SPEED = range(4)
+
+class EphemerisBatch(NamedTuple):
+    """Positions of several bodies over a series of instants, backed by NumPy arrays."""
+    jd: np.ndarray          # (time,) Julian days (UT)
+    bodies: tuple           # body names, in the order of the body axis
+    values: np.ndarray      # (time, body, 4) longitude, latitude, distance, speed
+    sign_index: np.ndarray  # (time, body) index into ZODIAC_SIGNS
+    retrograde: np.ndarray  # (time, body) True where the speed in longitude is negative
+
+    def signs(self):
+        """Return the zodiac sign names as a (time, body) array of strings."""
+        return np.asarray(ZODIAC_SIGNS)[self.sign_index]
+
+    def column(self, body_name):
+        """Return the (time, 4) values of a single body."""
+        return self.values[:, self.bodies.index(body_name)]
+
 def clear_folder(folder_path):
     """Clear all contents in the specified folder."""
     try:
@@ -103,14 +114,84 @@ def get_house(degree, house_cusps):
             return i + 1
     return 1  # Default to 1st house if calculation fails
 
-def get_planet_positions(now, longitude=None, latitude=None, time_provided=False):
-    """Calculate positions, signs, retrograde status, aspects, and houses (if applicable)."""
+def julian_day(now):
+    """Convert a datetime to a Julian Day (UT)."""
+    return swe.julday(now.year, now.month, now.day,
+                      now.hour + now.minute / 60.0 + now.second / 3600.0)
+
+def datetime_from_julian_day(jd):
+    """Convert a Julian Day (UT) back to a naive UTC datetime."""
+    year, month, day, hours = swe.revjul(jd)
+    return datetime.datetime(year, month, day) + datetime.timedelta(hours=hours)
+
+def julian_day_range(start, end, step_hours=1.0):
+    """Return evenly spaced Julian Days from start (inclusive) to end (exclusive)."""
+    return np.arange(julian_day(start), julian_day(end), step_hours / 24.0)
+
+def get_planet_positions_batch(jds, bodies=None):
+    """Calculate positions of many bodies over an array of Julian Days in a single call.
+
+    The result is written straight into a preallocated (time, body, 4) array, so the
+    cost is bounded by the swisseph calls themselves. Bodies are iterated in the outer
+    loop to keep swisseph's per-body file cache warm across consecutive instants.
+    """
+    try:
+        swe.set_ephe_path(EPHEMERIS_PATH)
+
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        body_names = tuple(bodies) if bodies is not None else tuple(BODIES)
+        values = np.empty((jds.size, len(body_names), 4), dtype=np.float64)
+
+        flags = swe.FLG_SWIEPH | swe.FLG_SPEED
+        calc_ut = swe.calc_ut
+        jd_list = jds.tolist()
+
+        def calc_body(body_id, out):
+            for t, jd in enumerate(jd_list):
+                out[t] = calc_ut(jd, body_id, flags)[0][:4]
+
+        north_node = None
+        if 'North Node' in body_names:
+            north_node = values[:, body_names.index('North Node')]
+            calc_body(BODIES['North Node'], north_node)
+
+        for b, body_name in enumerate(body_names):
+            if body_name == 'North Node':
+                continue
+            if body_name == 'South Node':
+                # South Node is 180° opposite North Node
+                if north_node is None:
+                    north_node = np.empty((jds.size, 4), dtype=np.float64)
+                    calc_body(BODIES['North Node'], north_node)
+                values[:, b] = north_node
+                values[:, b, LONGITUDE] = (north_node[:, LONGITUDE] + 180) % 360
+                values[:, b, LATITUDE] = -north_node[:, LATITUDE]
+                continue
+            calc_body(BODIES[body_name], values[:, b])
+
+        sign_index = (values[..., LONGITUDE] // 30).astype(np.int8) % 12
+        retrograde = values[..., SPEED] < 0
+
+        logging.info(f"Calculated {jds.size} instants for {len(body_names)} bodies")
+        return EphemerisBatch(jds, body_names, values, sign_index, retrograde)
+
+    except Exception as e:
+        logging.error(f"Error calculating batch positions: {e}")
+        raise
+
+def get_planet_positions(now, longitude=None, latitude=None, time_provided=False, cache=None):
+    """Calculate positions, signs, retrograde status, aspects, and houses (if applicable).
+
+    If an EphemerisCache covering `now` is given, longitudes and speeds are interpolated
+    from it instead of being computed through swisseph.
+    """
     try:
         # Set ephemeris path
         swe.set_ephe_path(EPHEMERIS_PATH)
         
         # Convert datetime to Julian Day
-        jd = swe.julday(now.year, now.month, now.day, now.hour + now.minute / 60.0)
+        jd = julian_day(now)
+        cached = cache.positions(jd) if cache is not None and cache.covers(jd) else None
         
         # Initialize data structures
         positions = {}
@@ -135,11 +216,15 @@ def get_planet_positions(now, longitude=None, latitude=None, time_provided=False
                 continue
                 
             # Calculate position
-            flags = swe.FLG_SWIEPH | swe.FLG_SPEED
-            ret, pos = swe.calc_ut(jd, body_id, flags)
-            
-            longitude_deg = pos[0]
-            speed = pos[3]  # Speed in longitude (degrees/day)
+            if cached is not None and body_name in cache.bodies:
+                # Built-in floats, so the results stay JSON serializable
+                longitude_deg, speed = (float(v) for v in cached[cache.bodies.index(body_name)])
+            else:
+                flags = swe.FLG_SWIEPH | swe.FLG_SPEED
+                pos, ret = swe.calc_ut(jd, body_id, flags)
+                
+                longitude_deg = pos[0]
+                speed = pos[3]  # Speed in longitude (degrees/day)
             
             positions[body_name] = {
                 'longitude': longitude_deg,
@@ -147,7 +232,7 @@ def get_planet_positions(now, longitude=None, latitude=None, time_provided=False
                 'minute': (longitude_deg % 1) * 60
             }
             planet_signs[body_name] = get_zodiac_sign(longitude_deg)
-            planet_retrograde[body_name] = speed < 0
+            planet_retrograde[body_name] = bool(speed < 0)
         
         # Calculate houses if time and location are provided
         if time_provided and longitude is not None and latitude is not None:
@@ -155,26 +240,11 @@ def get_planet_positions(now, longitude=None, latitude=None, time_provided=False
             houses = {body_name: get_house(pos['longitude'], house_cusps) for body_name, pos in positions.items()}
         
         # Calculate aspects
-        aspects = []
         body_names = list(positions.keys())
-        for i in range(len(body_names)):
-            for j in range(i + 1, len(body_names)):
-                body1 = body_names[i]
-                body2 = body_names[j]
-                angle = abs((positions[body1]['longitude'] - positions[body2]['longitude']) % 360)
-                if angle > 180:
-                    angle = 360 - angle
-                
-                for aspect_name, (target, orb) in ASPECT_TYPES.items():
-                    if abs(angle - target) <= orb:
-                        aspects.append({
-                            'body1': body1,
-                            'body2': body2,
-                            'aspect': aspect_name,
-                            'angle': round(angle, 2),
-                            'sign1': planet_signs[body1],
-                            'sign2': planet_signs[body2]
-                        })
+        aspects = aspects_to_dicts(
+            find_aspects([positions[body]['longitude'] for body in body_names], ASPECT_TYPES),
+            body_names, ASPECT_TYPES, planet_signs
+        )
         
         logging.info("Calculated positions, signs, retrograde status, aspects, and houses (if applicable)")
         return positions, planet_signs, planet_retrograde, aspects, houses, house_cusps
@@ -183,40 +253,111 @@ def get_planet_positions(now, longitude=None, latitude=None, time_provided=False
         logging.error(f"Error calculating positions: {e}")
         raise
 
-def save_planet_data(positions, planet_signs, planet_retrograde, aspects, houses, house_cusps, now, output_dir):
-    """Create and save a single JSON file with data for all zodiac signs."""
+class SignView:
+    """One zodiac sign's projection of a shared Sky: its focus planet and the aspects involving it."""
+    __slots__ = ('sky', 'sign', 'focus_planet')
+
+    def __init__(self, sky, sign):
+        self.sky = sky
+        self.sign = sign
+        self.focus_planet = ZODIAC_RULERS[sign]
+
+    @property
+    def focus_aspect_indices(self):
+        """Indices into sky.aspects of the aspects that involve the focus planet."""
+        return self.sky.aspect_index.get(self.focus_planet, [])
+
+    @property
+    def focus_aspects(self):
+        return [self.sky.aspects[i] for i in self.focus_aspect_indices]
+
+    @property
+    def focus_house(self):
+        return self.sky.houses.get(self.focus_planet) if self.sky.houses else None
+
+    def to_dict(self):
+        return {
+            "zodiac_sign": self.sign,
+            "focus_planet": self.focus_planet,
+            "focus_aspects": list(self.focus_aspect_indices),
+            "focus_house": self.focus_house
+        }
+
+class Sky:
+    """Positions, signs and aspects computed once for an instant and shared by all 12 sign views."""
+
+    def __init__(self, now, positions, planet_signs, planet_retrograde, aspects, houses=None, house_cusps=None):
+        self.now = now
+        self.positions = positions
+        self.planet_signs = planet_signs
+        self.planet_retrograde = planet_retrograde
+        self.aspects = aspects
+        self.houses = houses
+        self.house_cusps = house_cusps
+
+        # Body name -> indices of the aspects it takes part in
+        self.aspect_index = {}
+        for i, aspect in enumerate(aspects):
+            self.aspect_index.setdefault(aspect['body1'], []).append(i)
+            self.aspect_index.setdefault(aspect['body2'], []).append(i)
+
+    @classmethod
+    def compute(cls, now, longitude=None, latitude=None, time_provided=False, cache=None):
+        """Calculate the sky for `now` with get_planet_positions."""
+        return cls(now, *get_planet_positions(now, longitude, latitude, time_provided, cache=cache))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild the Sky from a to_dict() snapshot, such as a file written by save_planet_data."""
+        records = data['positions']
+        positions = {body: {'longitude': r['longitude'], 'degree': r['degree'], 'minute': r['minute']}
+                     for body, r in records.items()}
+        houses = {body: r['house'] for body, r in records.items()} if data.get('house_cusps') else None
+        return cls(datetime.datetime.fromisoformat(data['time_utc'].rstrip('Z')), positions,
+                   {body: r['zodiac'] for body, r in records.items()},
+                   {body: r['retrograde'] for body, r in records.items()},
+                   data['aspects'], houses, data.get('house_cusps'))
+
+    def view(self, sign):
+        return SignView(self, sign)
+
+    def views(self):
+        return [SignView(self, sign) for sign in ZODIAC_SIGNS]
+
+    def position_records(self):
+        """Rounded per-body records as written to the JSON output."""
+        return {
+            body: {
+                "longitude": round(pos['longitude'], 6),
+                "degree": round(pos['degree'], 6),
+                "minute": round(pos['minute'], 2),
+                "zodiac": self.planet_signs[body],
+                "retrograde": self.planet_retrograde[body],
+                "house": self.houses.get(body) if self.houses else None
+            } for body, pos in self.positions.items()
+        }
+
+    def to_dict(self):
+        """Shared positions and aspects once, plus a lightweight view per zodiac sign."""
+        return {
+            "time_utc": self.now.isoformat() + 'Z',
+            "positions": self.position_records(),
+            "aspects": self.aspects,
+            "house_cusps": [round(cusp, 6) for cusp in self.house_cusps] if self.house_cusps else None,
+            "zodiac_rulers": ZODIAC_RULERS,
+            "data": {view.sign: view.to_dict() for view in self.views()}
+        }
+
+def save_planet_data(sky, output_dir):
+    """Create and save a single JSON file with the shared sky and each zodiac sign's view."""
     try:
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        time_utc = now.isoformat() + 'Z'
-        data = {
-            "time_utc": time_utc,
-            "data": {},
-            "zodiac_rulers": ZODIAC_RULERS
-        }
-        
-        # Generate data for each zodiac sign
-        for sign in ZODIAC_SIGNS:
-            data["data"][sign] = {
-                "zodiac_sign": sign,
-                "focus_planet": ZODIAC_RULERS[sign],
-                "positions": {
-                    body: {
-                        "longitude": round(pos['longitude'], 6),
-                        "degree": round(pos['degree'], 6),
-                        "minute": round(pos['minute'], 2),
-                        "zodiac": planet_signs[body],
-                        "retrograde": planet_retrograde[body],
-                        "house": houses.get(body) if houses else None
-                    } for body, pos in positions.items()
-                },
-                "aspects": aspects,
-                "house_cusps": [round(cusp, 6) for cusp in house_cusps] if house_cusps else None
-            }
+        data = sky.to_dict()
         
         # Save to a single JSON file
-        date_time_str = now.strftime("%Y-%m-%d_%H-%M-%S")
+        date_time_str = sky.now.strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"planet_positions_{date_time_str}.json"
         filepath = os.path.join(output_dir, filename)
         
@@ -230,6 +371,14 @@ def save_planet_data(positions, planet_signs, planet_retrograde, aspects, houses
         logging.error(f"Error saving planetary data: {e}")
         raise
 
+def load_ephemeris_cache(cache_dir=None):
+    """Open the precomputed ephemeris cache if one has been built, otherwise return None."""
+    from data_ingestion.ephemeris_cache import CACHE_DIR, MANIFEST_FILE, EphemerisCache
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.exists(os.path.join(cache_dir, MANIFEST_FILE)):
+        return None
+    return EphemerisCache(cache_dir)
+
 def main(longitude=None, latitude=None, time_provided=False):
     """Main execution function to generate, save, and return planetary data."""
     try:
@@ -239,26 +388,13 @@ def main(longitude=None, latitude=None, time_provided=False):
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
         
-        # Clear output directory
-        clear_folder(OUTPUT_DIR)
-        
+        # Snapshots are timestamped, so earlier runs are left in place
         # Calculate planetary positions
         now = datetime.datetime.now()
-        positions, planet_signs, planet_retrograde, aspects, houses, house_cusps = get_planet_positions(
-            now, longitude, latitude, time_provided
-        )
+        sky = Sky.compute(now, longitude, latitude, time_provided, cache=load_ephemeris_cache())
         
         # Save and return data
-        result = save_planet_data(
-            positions,
-            planet_signs,
-            planet_retrograde,
-            aspects,
-            houses,
-            house_cusps,
-            now,
-            OUTPUT_DIR
-        )
+        result = save_planet_data(sky, OUTPUT_DIR)
         
         logging.info("Planetary data generation, saving, and JSON return completed successfully")
         return result
@@ -0,0 +1,180 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+# Constants
+# Pool sizes and timeouts: the database section of config/settings.yml (see config.schema.DatabaseSettings)
+LATENCY_WINDOW = 1000                  # Checkouts kept for latency percentiles
+
+# Prepared (server-side) statements: psycopg prepares them on the first execute with prepare=True
+# The INSERT skips exact duplicates of stored content (served by the md5(content) index)
+INSERT_MEMORY = ("INSERT INTO memories (content, embedding, source, timestamp) "
+                 "SELECT %s, %s::vector, %s, CURRENT_TIMESTAMP "
+                 "WHERE NOT EXISTS (SELECT 1 FROM memories WHERE md5(content) = md5(%s))")
+MEMORY_EXISTS = "SELECT EXISTS (SELECT 1 FROM memories WHERE md5(content) = md5(%s))"
+CONTENT_HASH_INDEX = "CREATE INDEX IF NOT EXISTS memories_content_md5_idx ON memories (md5(content))"
+SIMILAR_MEMORIES = ("SELECT id, content, source, timestamp, embedding <=> %s::vector AS distance "
+                    "FROM memories ORDER BY embedding <=> %s::vector LIMIT %s")
+
+_pool = None
+_async_pool = None
+_async_loop = None                     # Event loop the async pool runs on
+_lock = threading.Lock()
+_checkouts = deque(maxlen=LATENCY_WINDOW)
+
+def pool_settings():
+    """Pool settings: DatabaseSettings defaults, overridden by the database: section of
+    config/settings.yml, overridden by DB_POOL_MIN_SIZE-style environment variables
+    (merged and validated once by config.settings)."""
+    from config.settings import get_settings
+    return get_settings().database.model_dump()
+
+def conninfo():
+    """libpq connection string from the database settings (DB_NAME, DB_USER, DB_PASSWORD and
+    DB_HOST, as host or host:port, in the environment)."""
+    from config.settings import get_settings
+    db = get_settings().database
+    host, _, port = db.host.partition(':')
+    return (f"dbname={db.name} user={db.user} password={db.password} host={host} port={port or db.port}")
+
+def _pool_kwargs(settings):
+    return {
+        'min_size': settings['pool_min_size'],
+        'max_size': settings['pool_max_size'],
+        'timeout': settings['pool_timeout_s'],
+        'max_idle': settings['max_idle_s'],
+        'max_lifetime': settings['max_lifetime_s'],
+        # Every connection runs with a server-side statement timeout
+        'kwargs': {'options': f"-c statement_timeout={int(settings['statement_timeout_ms'])}"},
+    }
+
+def get_pool():
+    """Process-wide sync pool; connections are health-checked on checkout."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ConnectionPool(conninfo(), check=ConnectionPool.check_connection, open=True,
+                                   name='lumina', **_pool_kwargs(pool_settings()))
+    return _pool
+
+async def get_async_pool():
+    """Process-wide async pool, for code running on the event loop."""
+    global _async_pool, _async_loop
+    if _async_pool is None:
+        _async_loop = asyncio.get_running_loop()
+        _async_pool = AsyncConnectionPool(conninfo(), check=AsyncConnectionPool.check_connection, open=False,
+                                          name='lumina-async', **_pool_kwargs(pool_settings()))
+        await _async_pool.open()
+    return _async_pool
+
+def resize_pools(settings):
+    """Apply new pool sizes (a DatabaseSettings) to the open pools after a settings reload.
+
+    Timeouts, lifetimes and the statement timeout apply to pools created afterwards.
+    """
+    if _pool is not None:
+        _pool.resize(settings.pool_min_size, settings.pool_max_size)
+    if _async_pool is not None:
+        # Called from the settings watcher thread; the async pool is resized on its own loop
+        asyncio.run_coroutine_threadsafe(_async_pool.resize(settings.pool_min_size, settings.pool_max_size),
+                                         _async_loop)
+    logging.info(f"Database pools resized to {settings.pool_min_size}-{settings.pool_max_size} connections")
+
+@contextlib.contextmanager
+def connection():
+    """Borrow a connection from the sync pool, recording how long the checkout waited."""
+    start = time.perf_counter()
+    with get_pool().connection() as conn:
+        _checkouts.append(time.perf_counter() - start)
+        yield conn
+
+@contextlib.asynccontextmanager
+async def async_connection():
+    """Borrow a connection from the async pool, recording how long the checkout waited."""
+    start = time.perf_counter()
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        _checkouts.append(time.perf_counter() - start)
+        yield conn
+
+def insert_memory(conn, content, embedding, source):
+    """Insert one memory with the prepared INSERT; the caller's connection block commits it.
+
+    Returns:
+        False if identical content was already stored (nothing inserted), else True.
+    """
+    cur = conn.execute(INSERT_MEMORY, (content, list(map(float, embedding)), source, content), prepare=True)
+    return cur.rowcount == 1
+
+def memory_exists(conn, content):
+    """True if a memory with exactly this content is already stored."""
+    return conn.execute(MEMORY_EXISTS, (content,), prepare=True).fetchone()[0]
+
+def ensure_content_index():
+    """Create the md5(content) index used for duplicate checks."""
+    with connection() as conn:
+        conn.execute(CONTENT_HASH_INDEX)
+
+def similar_memories(conn, embedding, k=5):
+    """The k memories closest to embedding by cosine distance, via the prepared similarity query."""
+    vector = list(map(float, embedding))
+    return conn.execute(SIMILAR_MEMORIES, (vector, vector, k), prepare=True).fetchall()
+
+def health_check():
+    """Round-trip a SELECT 1 through the pool; returns (ok, latency in seconds)."""
+    start = time.perf_counter()
+    try:
+        with connection() as conn:
+            conn.execute("SELECT 1")
+        return True, time.perf_counter() - start
+    except Exception as e:
+        logging.error(f"Database health check failed: {e}")
+        return False, time.perf_counter() - start
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+def pool_metrics():
+    """Waiting clients, checkout latency and utilization for each open pool."""
+    latencies = sorted(_checkouts)
+    metrics = {
+        'checkout_ms_p50': round(_percentile(latencies, 0.5) * 1000, 3),
+        'checkout_ms_p95': round(_percentile(latencies, 0.95) * 1000, 3),
+        'checkout_ms_max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        'pools': {}
+    }
+    for pool in (_pool, _async_pool):
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+        metrics['pools'][pool.name] = {
+            'requests_waiting': stats.get('requests_waiting', 0),
+            'in_use': in_use,
+            'size': stats.get('pool_size', 0),
+            'max_size': pool.max_size,
+            'utilization': round(in_use / pool.max_size, 3),
+            'requests_num': stats.get('requests_num', 0),
+            'requests_wait_ms': stats.get('requests_wait_ms', 0),
+            'connections_errors': stats.get('connections_errors', 0),
+        }
+    return metrics
+
+def close_pools():
+    """Close the sync pool (the async pool is closed by close_async_pool)."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# Constants
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH",
+                                 os.path.join(os.path.dirname(__file__), 'embedding_cache.sqlite3'))
+MEMORY_ENTRIES = 10000   # Vectors kept in the in-process LRU tier (384-d float32: ~15 MB)
+
+_whitespace = re.compile(r'\s+')
+
+def normalize_text(text):
+    """Unicode NFC with whitespace collapsed, so trivially different copies share an entry."""
+    return _whitespace.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+def text_key(model, text):
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by (model, normalized-text hash).
+
+    An in-memory LRU sits in front of a SQLite table of float32 blobs. The SQLite tier
+    remembers the model and dimension it was filled with and empties itself when either
+    changes, so vectors from a previous model are never served.
+    """
+
+    def __init__(self, model, dimension, path=EMBEDDING_CACHE_PATH, memory_entries=MEMORY_ENTRIES):
+        self.model = model
+        self.dimension = dimension
+        self.memory_entries = memory_entries
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._invalidate_if_changed()
+
+    def _invalidate_if_changed(self):
+        stored = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+        current = {'model': self.model, 'dimension': str(self.dimension)}
+        if stored != current:
+            if stored:
+                logging.info(f"Embedding model changed from {stored} to {current}; clearing the embedding cache")
+            self._db.execute("DELETE FROM embeddings")
+            self._db.execute("DELETE FROM meta")
+            self._db.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", current.items())
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def resize(self, memory_entries):
+        """Change the size of the in-memory tier, dropping the least recently used vectors beyond it."""
+        with self._lock:
+            self.memory_entries = memory_entries
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, text):
+        """Cached float32 vector for text, or None."""
+        key = text_key(self.model, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vector)
+            self.hits_disk += 1
+            return vector
+
+    def put(self, text, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Expected an embedding of dimension {self.dimension}, got shape {vector.shape}")
+        key = text_key(self.model, text)
+        with self._lock:
+            self._remember(key, vector)
+            self._db.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, vector.tobytes()))
+
+    def embed(self, texts, embed_many):
+        """Embeddings for texts, calling embed_many (list of texts -> float32 array) only for
+        the texts not cached, each distinct normalized text once.
+
+        Returns:
+            (len(texts), dimension) float32 array.
+        """
+        result = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing = {}
+        for i, text in enumerate(texts):
+            vector = self.get(text)
+            if vector is None:
+                missing.setdefault(normalize_text(text), []).append(i)
+            else:
+                result[i] = vector
+        if missing:
+            unique = list(missing)
+            vectors = np.asarray(embed_many(unique), dtype=np.float32)
+            for text, vector in zip(unique, vectors):
+                self.put(text, vector)
+                result[missing[text]] = vector
+        return result
+
+    def stats(self):
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            'hits_memory': self.hits_memory,
+            'hits_disk': self.hits_disk,
+            'misses': self.misses,
+            'hit_rate': (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+    def close(self):
+        self._db.close()
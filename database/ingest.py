@@ -0,0 +1,199 @@
+import datetime
+import logging
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
+from psycopg.types import TypeInfo
+
+from database.connection import get_pool
+from database.embedding_cache import EmbeddingCache
+
+# Constants
+OLLAMA_EMBEDDING_MODEL = "all-minilm:l6-v2"
+EMBEDDING_DIMENSION = 384
+EMBED_BATCH_SIZE = 64        # Texts per /api/embed request and per COPY
+MAX_IN_FLIGHT_BATCHES = 4    # Batches embedded or waiting to be written at once
+EMBED_TIMEOUT = 120
+
+_embedding_caches = {}
+
+# Batches are COPYed into a session-local staging table, then merged into memories skipping
+# content already stored or repeated in the batch (md5(content), as insert_memory)
+CREATE_STAGING = ("CREATE TEMP TABLE IF NOT EXISTS memories_staging "
+                  "(content text, embedding vector, source text, timestamp timestamptz) ON COMMIT DELETE ROWS")
+COPY_MEMORIES = "COPY memories_staging (content, embedding, source, timestamp) FROM STDIN (FORMAT BINARY)"
+COPY_TYPES = ['text', 'vector', 'text', 'timestamptz']
+MERGE_STAGING = ("INSERT INTO memories (content, embedding, source, timestamp) "
+                 "SELECT DISTINCT ON (md5(s.content)) s.content, s.embedding, s.source, s.timestamp "
+                 "FROM memories_staging s "
+                 "WHERE NOT EXISTS (SELECT 1 FROM memories m WHERE md5(m.content) = md5(s.content))")
+
+class VectorBinaryDumper(Dumper):
+    """Binary pgvector encoding of a float32 array: dim (int16), unused (int16), big-endian float32s."""
+    format = Format.BINARY
+
+    def dump(self, obj):
+        values = np.asarray(obj, dtype='>f4')
+        return struct.pack('>HH', values.size, 0) + values.tobytes()
+
+def register_vector(conn):
+    """Let COPY ... FORMAT BINARY write numpy arrays into pgvector columns on this connection."""
+    info = TypeInfo.fetch(conn, 'vector')
+    if info is None:
+        raise RuntimeError("The pgvector extension is not installed in this database (CREATE EXTENSION vector)")
+    info.register(conn)
+    dumper = type('VectorDumper', (VectorBinaryDumper,), {'oid': info.oid})
+    conn.adapters.register_dumper(np.ndarray, dumper)
+
+def embed_batch(texts, model=OLLAMA_EMBEDDING_MODEL, base_url=None, session=None):
+    """Embed a list of texts with one call to Ollama's /api/embed; returns a (len(texts), dim) float32 array.
+
+    base_url defaults to llm.ollama_url (OLLAMA_API_BASE_URL) from the current settings.
+    """
+    if base_url is None:
+        from config.settings import get_settings
+        base_url = get_settings().llm.ollama_url
+    try:
+        response = (session or requests).post(f"{base_url}/api/embed", json={'model': model, 'input': list(texts)},
+                                              timeout=EMBED_TIMEOUT)
+        response.raise_for_status()
+        embeddings = np.asarray(response.json()['embeddings'], dtype=np.float32)
+        if embeddings.shape != (len(texts), EMBEDDING_DIMENSION):
+            raise ValueError(f"Expected {len(texts)} embeddings of dimension {EMBEDDING_DIMENSION}, "
+                             f"got shape {embeddings.shape}")
+        return embeddings
+    except Exception as e:
+        logging.error(f"Error embedding batch of {len(texts)} texts: {e}")
+        raise
+
+def embed_texts(texts, backend=None, session=None):
+    """Embed a list of texts with the selected backend; returns a float32 array.
+
+    backend is 'ollama' (HTTP /api/embed) or 'local' (in-process ONNX Runtime, see
+    database.local_embedder), defaulting to embedding.backend in the current settings.
+    """
+    if backend is None:
+        from config.settings import get_settings
+        backend = get_settings().embedding.backend
+    if backend == 'local':
+        from database.local_embedder import get_local_embedder
+        return get_local_embedder().embed(texts)
+    if backend == 'ollama':
+        return embed_batch(texts, session=session)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected 'ollama' or 'local'")
+
+def get_embedding_cache(model=OLLAMA_EMBEDDING_MODEL, dimension=EMBEDDING_DIMENSION):
+    """Shared embedding cache for a model; a new model or dimension starts from an empty cache."""
+    if (model, dimension) not in _embedding_caches:
+        from config.settings import get_settings
+        _embedding_caches[(model, dimension)] = EmbeddingCache(
+            model, dimension, memory_entries=get_settings().embedding.memory_entries)
+    return _embedding_caches[(model, dimension)]
+
+def _batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append((record, None) if isinstance(record, str) else tuple(record))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_batch(conn, batch, embeddings, timestamp):
+    """COPY one batch of (content, source) rows with their embeddings into staging, merge the
+    new ones into memories and commit.
+
+    Returns:
+        The number of rows inserted; content already stored is skipped.
+    """
+    with conn.cursor() as cur:
+        with cur.copy(COPY_MEMORIES) as copy:
+            copy.set_types(COPY_TYPES)
+            for (content, source), embedding in zip(batch, embeddings):
+                copy.write_row((content, embedding, source, timestamp))
+    inserted = conn.execute(MERGE_STAGING).rowcount
+    conn.commit()
+    return inserted
+
+def ingest_memories(records, source=None, pool=None, batch_size=EMBED_BATCH_SIZE,
+                    max_in_flight=MAX_IN_FLIGHT_BATCHES, embed=None):
+    """Embed and store many memories at once.
+
+    Texts are grouped into batches of batch_size, each embedded with one /api/embed call
+    on a worker thread, and written with a binary COPY on a single pooled connection as
+    soon as it is ready. Texts already stored, or repeated in a batch, are not inserted again. At most max_in_flight batches are embedded or waiting to be
+    written; reading further records blocks until the oldest batch is stored, so memory
+    stays bounded however large the input is.
+
+    Args:
+        records: Iterable of texts, or of (text, source) pairs.
+        source: Source recorded for plain-text records.
+        embed: Callable mapping a list of texts to a float32 array, e.g. a local embedder.
+               Defaults to the configured embedding.backend behind the shared embedding cache.
+
+    Returns:
+        Dict with rows (inserted), duplicates (skipped), batches, elapsed_s, embed_wait_s,
+        write_s and rows_per_sec.
+    """
+    pool = pool or get_pool()
+    stats = {'rows': 0, 'duplicates': 0, 'batches': 0, 'embed_wait_s': 0.0, 'write_s': 0.0}
+    start = time.perf_counter()
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+
+    try:
+        with pool.connection() as conn, requests.Session() as session, \
+                ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            register_vector(conn)
+            conn.execute(CREATE_STAGING)
+            if embed is None:
+                cache = get_embedding_cache()
+                embed = lambda texts: cache.embed(texts, lambda missing: embed_texts(missing, session=session))
+            pending = []
+
+            def drain_oldest():
+                batch, future = pending.pop(0)
+                wait_start = time.perf_counter()
+                embeddings = future.result()
+                write_start = time.perf_counter()
+                inserted = write_batch(conn, batch, embeddings, timestamp)
+                stats['embed_wait_s'] += write_start - wait_start
+                stats['write_s'] += time.perf_counter() - write_start
+                stats['rows'] += inserted
+                stats['duplicates'] += len(batch) - inserted
+                stats['batches'] += 1
+
+            for batch in _batches(records, batch_size):
+                batch = [(content, row_source if row_source is not None else source) for content, row_source in batch]
+                if len(pending) >= max_in_flight:
+                    drain_oldest()
+                pending.append((batch, executor.submit(embed, [content for content, _ in batch])))
+            while pending:
+                drain_oldest()
+
+    except Exception as e:
+        logging.error(f"Error ingesting memories after {stats['rows']} rows: {e}")
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats['elapsed_s'] = round(elapsed, 3)
+    stats['embed_wait_s'] = round(stats['embed_wait_s'], 3)
+    stats['write_s'] = round(stats['write_s'], 3)
+    stats['rows_per_sec'] = round((stats['rows'] + stats['duplicates']) / elapsed, 1) if elapsed else 0.0
+    logging.info(f"Ingested {stats['rows']} memories ({stats['duplicates']} duplicates skipped) in "
+                 f"{stats['batches']} batches, {stats['elapsed_s']}s ({stats['rows_per_sec']} rows/s)")
+    return stats
+
+if __name__ == "__main__":
+    # Ingest a text file, one memory per line:
+    #   python -m database.ingest notes.txt news
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        print(ingest_memories((line for line in lines if line), source=sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,171 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Constants
+LOCAL_EMBEDDING_REPO = "sentence-transformers/all-MiniLM-L6-v2"   # Same weights as Ollama's all-minilm:l6-v2
+LOCAL_EMBEDDING_FILES = {
+    'fp32': "onnx/model.onnx",
+    'int8': "onnx/model_quint8_avx2.onnx",                        # Dynamic uint8 quantization for AVX2 CPUs
+}
+LOCAL_EMBEDDING_VARIANT = os.getenv("LOCAL_EMBEDDING_VARIANT", "int8")
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "0"))   # 0 lets ONNX Runtime pick
+MAX_SEQ_LENGTH = 256                                              # all-MiniLM-L6-v2's max_seq_length
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0                                                 # How long the batcher holds a request for company
+
+def load_model(variant=LOCAL_EMBEDDING_VARIANT, threads=LOCAL_EMBEDDING_THREADS, model_dir=None):
+    """Load the ONNX session and tokenizer, downloading them from the Hugging Face hub on first use.
+
+    Args:
+        variant: 'int8' (quantized) or 'fp32'.
+        threads: Intra-op threads per inference; 0 uses ONNX Runtime's default (all cores).
+        model_dir: Local copy of the repo (with tokenizer.json and onnx/) instead of the hub.
+    """
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+
+    if model_dir is None:
+        from huggingface_hub import hf_hub_download
+        model_path = hf_hub_download(LOCAL_EMBEDDING_REPO, LOCAL_EMBEDDING_FILES[variant])
+        tokenizer_path = hf_hub_download(LOCAL_EMBEDDING_REPO, "tokenizer.json")
+    else:
+        model_path = os.path.join(model_dir, LOCAL_EMBEDDING_FILES[variant])
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+
+    tokenizer = Tokenizer.from_file(tokenizer_path)
+    tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+    tokenizer.enable_padding()
+    return session, tokenizer
+
+class LocalEmbedder:
+    """In-process all-MiniLM-L6-v2 embeddings on CPU with ONNX Runtime.
+
+    embed() encodes a list at once. embed_one() is for many concurrent single-text
+    callers: requests are queued and a worker thread runs them together, up to
+    max_batch_size texts or max_wait_ms after the first one arrived, so throughput
+    approaches that of batched calls without callers coordinating.
+
+    Vectors are mean-pooled and L2-normalized like sentence-transformers (and Ollama's
+    /api/embed), so they are cosine-equivalent to the HTTP path; see verify_against_ollama.
+    """
+
+    def __init__(self, session=None, tokenizer=None, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, **load_kwargs):
+        if session is None or tokenizer is None:
+            session, tokenizer = load_model(**load_kwargs)
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._input_names = {i.name for i in session.get_inputs()}
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _run(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {'input_ids': ids, 'attention_mask': mask}
+        if 'token_type_ids' in self._input_names:
+            feeds['token_type_ids'] = np.zeros_like(ids)
+        tokens = self.session.run(None, feeds)[0]
+        weights = mask[..., None].astype(np.float32)
+        pooled = (tokens * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return (pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+    def embed(self, texts):
+        """Embeddings for a list of texts as a (len(texts), 384) float32 array.
+
+        Texts are sorted by length and run in chunks of max_batch_size, so each chunk is
+        padded only to its own longest text."""
+        texts = list(texts)
+        result = np.empty((len(texts), 0), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(texts), self.max_batch_size):
+            indices = order[start:start + self.max_batch_size]
+            vectors = self._run([texts[i] for i in indices])
+            if result.shape[1] == 0:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[indices] = vectors
+        return result
+
+    def embed_one(self, text):
+        """Embedding of one text, batched with whatever other calls are in flight."""
+        return self.submit(text).result()
+
+    def submit(self, text):
+        """Queue a text for the batching worker; returns a Future of its vector."""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._batch_loop, name='local-embedder', daemon=True)
+                self._worker.start()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                vectors = self.embed([text for text, _ in batch])
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                logging.error(f"Error embedding batch of {len(batch)} texts locally: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+
+_embedder = None
+
+def get_local_embedder():
+    """Process-wide LocalEmbedder, loaded on first use."""
+    global _embedder
+    if _embedder is None:
+        _embedder = LocalEmbedder()
+    return _embedder
+
+def verify_against_ollama(texts, min_cosine=0.99, embedder=None):
+    """Embed texts locally and through Ollama and check the pairs point the same way.
+
+    Returns:
+        Per-text cosine similarities; raises ValueError if any is below min_cosine.
+    """
+    from database.ingest import embed_batch
+    local = (embedder or get_local_embedder()).embed(texts)
+    remote = embed_batch(texts)
+    remote = remote / np.linalg.norm(remote, axis=1, keepdims=True)
+    cosines = (local * remote).sum(axis=1)
+    worst = int(cosines.argmin())
+    if cosines[worst] < min_cosine:
+        raise ValueError(f"Local embedding diverges from Ollama for '{texts[worst][:50]}': cosine {cosines[worst]:.4f}")
+    return cosines
+
+if __name__ == "__main__":
+    # Check the local model against the running Ollama server:
+    #   python -m database.local_embedder
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    samples = ["Mercury stations direct in Capricorn.", "Today's Full Moon lights up your sense of home.",
+               "Lumina's cat Wiskerton5000 predicts a week of cosmic static.", "A short one."]
+    cosines = verify_against_ollama(samples)
+    print(f"cosine vs Ollama: min {cosines.min():.5f}, mean {cosines.mean():.5f}")
@@ -0,0 +1,150 @@
+import logging
+import math
+
+import numpy as np
+from psycopg import sql
+
+from database.connection import connection
+from database.ingest import embed_batch
+
+# Constants
+MEMORIES_TABLE = 'memories'
+# HNSW build parameters (pgvector defaults) and search breadth
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 40
+# IVFFlat alternative: probes searched out of lists built
+IVFFLAT_PROBES = 10
+DEFAULT_K = 5
+
+def index_name(table, method):
+    return f"{table}_embedding_{method}_idx"
+
+def recommended_lists(rows):
+    """pgvector's guidance for IVFFlat: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    return max(1, rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows)))
+
+def ensure_index(method='hnsw', m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, lists=None,
+                 table=MEMORIES_TABLE, concurrently=True):
+    """Create the cosine ANN index on embedding, plus a (source, timestamp) index for the filters.
+
+    Built CONCURRENTLY by default so ingestion keeps running. IVFFlat needs rows to
+    exist first (its lists are k-means centroids); lists defaults to recommended_lists.
+
+    Returns:
+        Name of the vector index.
+    """
+    name = index_name(table, method)
+    try:
+        with connection() as conn:
+            conn.autocommit = True   # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+            # Index builds on large tables outlast the pool's statement_timeout
+            conn.execute("SET statement_timeout = 0")
+            try:
+                if method == 'hnsw':
+                    params = sql.SQL("m = {}, ef_construction = {}").format(sql.Literal(m), sql.Literal(ef_construction))
+                elif method == 'ivfflat':
+                    if lists is None:
+                        rows = conn.execute(sql.SQL("SELECT count(*) FROM {}").format(sql.Identifier(table))).fetchone()[0]
+                        lists = recommended_lists(rows)
+                    params = sql.SQL("lists = {}").format(sql.Literal(lists))
+                else:
+                    raise ValueError(f"Unknown index method '{method}', expected 'hnsw' or 'ivfflat'")
+
+                create = sql.SQL("CREATE INDEX {concurrently} IF NOT EXISTS {name} ON {table} "
+                                 "USING {method} (embedding vector_cosine_ops) WITH ({params})").format(
+                    concurrently=sql.SQL("CONCURRENTLY" if concurrently else ""), name=sql.Identifier(name),
+                    table=sql.Identifier(table), method=sql.SQL(method), params=params)
+                conn.execute(create)
+                conn.execute(sql.SQL("CREATE INDEX {concurrently} IF NOT EXISTS {name} ON {table} (source, timestamp)").format(
+                    concurrently=sql.SQL("CONCURRENTLY" if concurrently else ""),
+                    name=sql.Identifier(f"{table}_source_timestamp_idx"), table=sql.Identifier(table)))
+            finally:
+                conn.execute("RESET statement_timeout")
+                conn.autocommit = False
+        logging.info(f"Index {name} ready on {table}")
+        return name
+    except Exception as e:
+        logging.error(f"Error creating {method} index on {table}: {e}")
+        raise
+
+def maintain_index(method='hnsw', table=MEMORIES_TABLE):
+    """Rebuild the vector index without blocking writes and refresh planner statistics.
+
+    Worth running after large bulk loads, especially for IVFFlat whose centroids were
+    computed from the rows present at build time."""
+    try:
+        with connection() as conn:
+            conn.autocommit = True
+            conn.execute("SET statement_timeout = 0")
+            try:
+                conn.execute(sql.SQL("REINDEX INDEX CONCURRENTLY {}").format(sql.Identifier(index_name(table, method))))
+                conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+            finally:
+                conn.execute("RESET statement_timeout")
+                conn.autocommit = False
+    except Exception as e:
+        logging.error(f"Error maintaining {method} index on {table}: {e}")
+        raise
+
+def drop_index(method='hnsw', table=MEMORIES_TABLE):
+    with connection() as conn:
+        conn.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(index_name(table, method))))
+
+def recall_query(source=None, since=None, table=MEMORIES_TABLE):
+    """Nearest-neighbour query with the metadata filters in its WHERE clause.
+
+    Returns:
+        (query, params) where params still lacks the leading vector and trailing k.
+    """
+    conditions = []
+    params = []
+    if source is not None:
+        if isinstance(source, (list, tuple, set)):
+            conditions.append(sql.SQL("source = ANY(%s)"))
+            params.append(list(source))
+        else:
+            conditions.append(sql.SQL("source = %s"))
+            params.append(source)
+    if since is not None:
+        conditions.append(sql.SQL("timestamp >= %s"))
+        params.append(since)
+    where = sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+    query = sql.SQL("SELECT id, content, source, timestamp, embedding <=> %s::vector AS distance "
+                    "FROM {table}{where} ORDER BY distance LIMIT %s").format(table=sql.Identifier(table), where=where)
+    return query, params
+
+def search(conn, vector, k=DEFAULT_K, source=None, since=None, ef_search=HNSW_EF_SEARCH, probes=IVFFLAT_PROBES,
+           iterative_scan=None, table=MEMORIES_TABLE):
+    """Run the recall query for an embedding on an open connection (inside its transaction).
+
+    ef_search/probes are set with set_config(..., is_local => true), the SET LOCAL
+    equivalent, so they only apply to this transaction and never leak to other pool users.
+    iterative_scan ('relaxed_order', pgvector >= 0.8) keeps scanning the index when
+    filters discard candidates, so filtered queries still return k rows.
+    """
+    conn.execute("SELECT set_config('hnsw.ef_search', %s, true), set_config('ivfflat.probes', %s, true)",
+                 (str(max(ef_search, k)), str(probes)))
+    if iterative_scan:
+        conn.execute("SELECT set_config('hnsw.iterative_scan', %s, true), set_config('ivfflat.iterative_scan', %s, true)",
+                     (iterative_scan, iterative_scan))
+    query, params = recall_query(source, since, table)
+    vector = np.asarray(vector, dtype=np.float32).tolist()
+    rows = conn.execute(query, [vector, *params, k], prepare=True).fetchall()
+    return [{'id': row[0], 'content': row[1], 'source': row[2], 'timestamp': row[3], 'distance': float(row[4])}
+            for row in rows]
+
+def recall(text, k=DEFAULT_K, source=None, since=None, ef_search=HNSW_EF_SEARCH, embed=None, **kwargs):
+    """The k memories most similar to text, optionally limited to a source (or list of
+    sources) and to memories stored since a datetime.
+
+    Returns:
+        List of dicts with id, content, source, timestamp and cosine distance, nearest first.
+    """
+    try:
+        vector = embed(text) if embed is not None else embed_batch([text])[0]
+        with connection() as conn:
+            return search(conn, vector, k, source, since, ef_search, **kwargs)
+    except Exception as e:
+        logging.error(f"Error recalling memories for '{text[:50]}': {e}")
+        raise
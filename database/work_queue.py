@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+
+from database.connection import get_pool
+
+# Constants
+LEASE_SECONDS = 900            # A running item whose worker has been silent this long is handed out again
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_S = 30.0          # Retry delay after the first failure, doubled after each further one
+BACKOFF_MAX_S = 3600.0
+
+CREATE_WORK_ITEMS = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id BIGSERIAL PRIMARY KEY,
+    date DATE NOT NULL,
+    sign TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    payload JSONB NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 4,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    artifact TEXT,
+    content_hash TEXT,
+    error TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (date, sign, stage)
+)"""
+CREATE_READY_INDEX = ("CREATE INDEX IF NOT EXISTS work_items_ready_idx ON work_items (stage, run_after) "
+                      "WHERE status IN ('pending', 'running')")
+
+ENQUEUE = ("INSERT INTO work_items (date, sign, stage, payload, max_attempts) VALUES (%s, %s, %s, %s, %s) "
+           "ON CONFLICT (date, sign, stage) DO NOTHING RETURNING id")
+
+# Rows another worker is claiming right now are locked and skipped rather than waited on,
+# so any number of workers (on any machine) can poll the same table
+CLAIM = """
+UPDATE work_items SET status = 'running', attempts = attempts + 1, locked_by = %s, locked_at = now(), updated_at = now()
+WHERE id IN (
+    SELECT id FROM work_items
+    WHERE stage = ANY(%s)
+      AND ((status = 'pending' AND run_after <= now())
+           OR (status = 'running' AND locked_at < now() - make_interval(secs => %s)))
+    ORDER BY run_after, id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED)
+RETURNING id, date, sign, stage, payload, attempts, max_attempts"""
+
+COMPLETE = ("UPDATE work_items SET status = 'done', artifact = %s, content_hash = %s, error = NULL, "
+            "locked_by = NULL, locked_at = NULL, updated_at = now() WHERE id = %s AND locked_by = %s")
+RETRY = ("UPDATE work_items SET status = %s, error = %s, run_after = now() + make_interval(secs => %s), "
+         "locked_by = NULL, locked_at = NULL, updated_at = now() WHERE id = %s AND locked_by = %s")
+RESET = ("UPDATE work_items SET status = 'pending', attempts = 0, run_after = now(), error = NULL, "
+         "updated_at = now() WHERE id = %s")
+RESET_FAILED = ("UPDATE work_items SET status = 'pending', attempts = 0, run_after = now(), error = NULL, "
+                "updated_at = now() WHERE date = %s AND status = 'failed'")
+DONE_ITEMS = "SELECT id, sign, stage, artifact, content_hash FROM work_items WHERE date = %s AND status = 'done'"
+STATUS_COUNTS = "SELECT stage, status, count(*) FROM work_items WHERE date = %s GROUP BY stage, status"
+
+def file_sha256(path):
+    """sha256 of a file's bytes, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def backoff_seconds(attempts, base=BACKOFF_BASE_S, maximum=BACKOFF_MAX_S):
+    """Delay before retrying an item that has failed `attempts` times."""
+    return min(base * 2 ** max(attempts - 1, 0), maximum)
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """Durable (date, sign, stage) work items in Postgres, shared by worker processes.
+
+    Each item is enqueued once; a rerun finds finished items already 'done' and skips
+    them. Workers claim items with FOR UPDATE SKIP LOCKED, so concurrent claims never
+    hand out the same row. The claim commits at once, and the row is not locked while
+    the work runs. An item whose worker died is reclaimed after lease_s. Failures are
+    retried with exponential backoff until max_attempts, then marked 'failed';
+    retry_failed() gives those a fresh set of attempts. Finished items record their
+    artifact path and its sha256; verify() requeues any whose file has gone missing or
+    changed.
+    """
+
+    def __init__(self, pool=None, worker_id=None, lease_s=LEASE_SECONDS, backoff_base_s=BACKOFF_BASE_S,
+                 backoff_max_s=BACKOFF_MAX_S):
+        self.pool = pool
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_s = lease_s
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+    def _connection(self):
+        return (self.pool or get_pool()).connection()
+
+    def ensure_schema(self):
+        with self._connection() as conn:
+            conn.execute(CREATE_WORK_ITEMS)
+            conn.execute(CREATE_READY_INDEX)
+
+    def enqueue(self, date, sign, stage, payload=None, max_attempts=MAX_ATTEMPTS):
+        """Add an item unless (date, sign, stage) is already queued or done.
+
+        Returns:
+            True if a new item was created.
+        """
+        with self._connection() as conn:
+            cur = conn.execute(ENQUEUE, (date, sign, stage, json.dumps(payload or {}), max_attempts), prepare=True)
+            return cur.fetchone() is not None
+
+    def claim(self, stages, limit=1):
+        """Claim up to limit ready items of the given stages for this worker.
+
+        Returns:
+            A list of dicts with id, date, sign, stage, payload, attempts and max_attempts.
+        """
+        with self._connection() as conn:
+            rows = conn.execute(CLAIM, (self.worker_id, list(stages), float(self.lease_s), limit),
+                                prepare=True).fetchall()
+        keys = ('id', 'date', 'sign', 'stage', 'payload', 'attempts', 'max_attempts')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def complete(self, item, artifact=None, content_hash=None):
+        """Mark a claimed item done, hashing the artifact file unless a hash is given."""
+        if content_hash is None and artifact and os.path.isfile(artifact):
+            content_hash = file_sha256(artifact)
+        with self._connection() as conn:
+            cur = conn.execute(COMPLETE, (artifact, content_hash, item['id'], self.worker_id), prepare=True)
+        if cur.rowcount == 0:
+            logging.warning(f"Work item {item['id']} ({item['sign']} {item['stage']}) was reclaimed by another worker")
+
+    def fail(self, item, error):
+        """Schedule a claimed item for another attempt after a backoff, or give up on it."""
+        exhausted = item['attempts'] >= item['max_attempts']
+        delay = 0.0 if exhausted else backoff_seconds(item['attempts'], self.backoff_base_s, self.backoff_max_s)
+        with self._connection() as conn:
+            conn.execute(RETRY, ('failed' if exhausted else 'pending', str(error), delay, item['id'], self.worker_id),
+                         prepare=True)
+        if exhausted:
+            logging.error(f"Giving up on {item['sign']} {item['stage']} after {item['attempts']} attempts: {error}")
+        else:
+            logging.warning(f"{item['sign']} {item['stage']} failed (attempt {item['attempts']}), "
+                            f"retrying in {delay:.0f}s: {error}")
+
+    def retry_failed(self, date):
+        """Requeue the items for date that used up their attempts.
+
+        Returns:
+            The number of items requeued.
+        """
+        with self._connection() as conn:
+            return conn.execute(RESET_FAILED, (date,), prepare=True).rowcount
+
+    def verify(self, date):
+        """Requeue done items for date whose artifact file is missing or no longer matches its hash.
+
+        A changed file is moved aside to <artifact>.stale, so the worker regenerates it
+        instead of finding it in place and skipping it.
+
+        Returns:
+            The number of items requeued.
+        """
+        with self._connection() as conn:
+            requeued = 0
+            for item_id, sign, stage, artifact, content_hash in conn.execute(DONE_ITEMS, (date,)).fetchall():
+                if artifact is None:
+                    continue
+                if not os.path.isfile(artifact):
+                    logging.info(f"Artifact for {sign} {stage} is missing, requeueing: {artifact}")
+                elif content_hash and file_sha256(artifact) != content_hash:
+                    logging.info(f"Artifact for {sign} {stage} has changed, requeueing and moving it to "
+                                 f"{artifact}.stale")
+                    os.replace(artifact, artifact + '.stale')
+                else:
+                    continue
+                conn.execute(RESET, (item_id,))
+                requeued += 1
+        return requeued
+
+    def status(self, date):
+        """Item counts for date as {stage: {status: count}}."""
+        with self._connection() as conn:
+            rows = conn.execute(STATUS_COUNTS, (date,)).fetchall()
+        counts = {}
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return counts
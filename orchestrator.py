@@ -2,19 +2,19 @@
 
 import os
 import asyncio
+import datetime
+import functools
 import logging
-import time
-from dotenv import load_dotenv
-import psycopg # Or psycopg2 for database interaction
-import ollama # Import the ollama library
-import time # To potentially manage timing
-import requests
+# Heavy clients (openai/httpx, psycopg, ollama, requests, numpy, ONNX Runtime) are imported
+# inside the functions that use them, and .env is read by config.settings.get_settings() on first
+# use, so importing this module is cheap and side-effect free (see benchmarks/bench_startup.py).
+from config.settings import get_settings, on_reload, watch_settings
+
 # --- Project-Specific Imports (from our defined file structure) ---
 # These will be developed in separate files as per the roadmap.
-# We'll import them and use placeholder classes/functions for now.
-from googleapiclient.discovery import build # For Google API (if needed)
-# For AI Brain (Mistral API)
-from ai_brain.mistral_api_interface import MistralAPIInterface # Assuming you create this module
+# For AI Brain: ai_brain.async_llm_client.AsyncLLMClient (non-blocking, routes across LM Studio / Ollama / fallbacks)
+# For the memory DB: database.connection (shared psycopg_pool pool + prepared statements),
+#   database.ingest (bulk loads + embedding cache), database.local_embedder (EMBEDDING_BACKEND=local)
 
 # For Data Ingestion (News, Trends)
 #from data_ingestion.news_fetcher import NewsFetcher # Assuming you create this module
@@ -22,73 +22,78 @@ from ai_brain.mistral_api_interface import MistralAPIInterface # Assuming you cr
 
 # For Social Media Posting
 #from social_media.post_manager import PostManager # Assuming you create this module
-#rom social_media.content_scheduler import ContentScheduler # Assuming you create this module
+# social_media.content_scheduler.ContentScheduler: heap-based cron + astronomy scheduler
 
 
 
 
 # --- Configuration ---
-# Load environment variables from .env file (for API keys, etc.)
-load_dotenv()
-
-# Configuration file paths (relative to this script in the project root)
-CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
-SETTINGS_FILE = os.path.join(CONFIG_DIR, 'settings.yaml') # Placeholder, use if needed
-LUMINA_PERSONA_FILE = os.path.join(CONFIG_DIR, 'lumina_persona.txt')
+# .env, config/settings.yml and config/lumina_person.txt are merged into one frozen Settings
+# object by config.settings.get_settings(); see config/schema.py for the fields.
 
 # --- Logging Setup ---
 LOGS_DIR = os.path.join(os.path.dirname(__file__), 'logs')
-os.makedirs(LOGS_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOGS_DIR, 'lumina.log')
 
-
-# --- Configuration (Get values from environment variables) ---
-# Get your Google API Key from your .env file
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # Make sure you have GOOGLE_API_KEY in your .env
-# Get your Custom Search Engine ID from your .env file
-CUSTOM_SEARCH_ENGINE_ID = os.getenv("GOOGLE_CUSTOM_SEARCH_ALPHA_ID") # The variable you added
-
-
-DB_NAME = os.getenv("DB_NAME", "lumina")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-
-OLLAMA_API_BASE_URL = os.getenv("OLLAMA_API_BASE_URL", "http://localhost:11434") # Default to localhost if not set
 # --- Ollama Embedding Model Configuration ---
-OLLAMA_EMBEDDING_MODEL = "all-minilm:l6-v2" # The embedding model pulled in Ollama
-# This model outputs 384-dimensional vectors
-EMBEDDING_DIMENSION = 384
-
-
+# OLLAMA_EMBEDDING_MODEL ("all-minilm:l6-v2", 384-dimensional vectors) and EMBEDDING_DIMENSION
+# come from database.ingest, so the embedding cache is invalidated when either changes there
+
+
+def setup_logging():
+    """Log to logs/lumina.log and the console; called by entry points, not on import."""
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE),
+            logging.StreamHandler() # Also print to console
+        ]
+    )
 
 # --- Database Connection Function ---
 def get_db_connection():
-    """Establishes and returns a database connection."""
-    # Use connection details from environment variables
-    if not DB_USER or not DB_PASSWORD or not DB_HOST or not DB_NAME:
-         print("Database credentials (DB_USER, DB_PASSWORD, DB_HOST, DB_NAME) not fully configured in environment variables.")
-         # In a real application, you'd handle this more robustly
-         return None
-    try:
-        # Ensure host is just the address, not address:port for psycopg
-        db_host_address = DB_HOST.split(':')[0]
-        db_port = DB_HOST.split(':')[1] if ':' in DB_HOST else 5432 # Default port
+    """Borrows a connection from the shared pool (database.connection).
 
-        conn = psycopg.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=db_host_address, port=db_port)
-        return conn
-    except Exception as e:
-        print(f"Error connecting to the database: {e}")
-        return None
+    Use as `with get_db_connection() as conn:`; the transaction is committed when the
+    block exits cleanly, rolled back on error, and the connection returned to the pool."""
+    from database.connection import connection
+    return connection()
 
 # --- Embedding Function using direct requests.post ---
-def create_embedding(text):
-    """Generates a vector embedding for the given text using Ollama via requests.post."""
-    if not OLLAMA_EMBEDDING_MODEL or not OLLAMA_API_BASE_URL:
+def create_embedding(text, backend=None):
+    """Generates a vector embedding for the given text using Ollama via requests.post,
+    or in-process with ONNX Runtime when backend is 'local' (EMBEDDING_BACKEND=local).
+
+    Texts embedded before (after whitespace/Unicode normalization) are answered from the
+    embedding cache; see get_embedding_cache().stats() for the hit rate."""
+    import requests
+    from database.ingest import EMBEDDING_DIMENSION, OLLAMA_EMBEDDING_MODEL, get_embedding_cache
+
+    backend = backend or get_settings().embedding.backend
+    ollama_base_url = get_settings().llm.ollama_url
+    if not OLLAMA_EMBEDDING_MODEL or not ollama_base_url:
         print("Ollama configuration (model name or base URL) is missing.")
         return None
 
-    embeddings_url = f"{OLLAMA_API_BASE_URL}/api/embeddings"
+    cache = get_embedding_cache()
+    cached = cache.get(text)
+    if cached is not None:
+        return cached.tolist()
+
+    if backend == 'local':
+        # Same all-MiniLM-L6-v2 weights, cosine-equivalent to Ollama's vectors (database.local_embedder)
+        try:
+            from database.local_embedder import get_local_embedder
+            embedding = get_local_embedder().embed_one(text)
+        except Exception as e:
+            print(f"Error creating embedding with the local ONNX model: {e}")
+            return None
+        cache.put(text, embedding)
+        return embedding.tolist()
+
+    embeddings_url = f"{ollama_base_url}/api/embeddings"
     payload = {
         "model": OLLAMA_EMBEDDING_MODEL,
         "prompt": text
@@ -104,10 +109,11 @@ def create_embedding(text):
         if 'embedding' in embedding_result:
             embedding = embedding_result['embedding']
 
-            # Optional: Verify dimension here if you want an extra check
-            # if len(embedding) != EMBEDDING_DIMENSION:
-            #     print(f"Warning: Generated embedding dimension mismatch. Expected {EMBEDDING_DIMENSION}, got {len(embedding)}.")
+            if len(embedding) != EMBEDDING_DIMENSION:
+                print(f"Warning: Generated embedding dimension mismatch. Expected {EMBEDDING_DIMENSION}, got {len(embedding)}.")
+                return None
 
+            cache.put(text, embedding)
             return embedding
         else:
             print("Ollama API call successful, but 'embedding' key not found in response.")
@@ -125,42 +131,51 @@ def create_embedding(text):
 
 # --- Function to Add Content to the Vector Database ---
 def add_memory_to_db(content, source, metadata=None):
-    """Adds text content and its embedding to the memories table."""
-    conn = get_db_connection()
-    if conn is None:
-        print("Skipping adding memory due to database connection error.")
+    """Adds text content and its embedding to the memories table.
+
+    Content already stored verbatim is skipped before embedding (md5(content) lookup)."""
+    from database.connection import insert_memory, memory_exists
+    try:
+        with get_db_connection() as conn:
+            if memory_exists(conn, content):
+                print(f"Memory from source '{source}' is already stored, skipping.")
+                return True
+    except Exception as e:
+        print(f"Error checking the database for an existing memory: {e}")
+        return False
+
+    embedding = create_embedding(content)
+    if embedding is None:
+        print("Skipping adding memory due to embedding generation error.")
         return False
 
     try:
-        embedding = create_embedding(content)
-        if embedding is None:
-            print("Skipping adding memory due to embedding generation error.")
-            if conn: conn.close()
-            return False
-
-        # Insert into the memories table
-        with conn.cursor() as cur:
-            # Ensure your 'memories' table has a 'content' (TEXT),
-            # 'embedding' (VECTOR(EMBEDDING_DIMENSION)), 'source' (VARCHAR),
-            # and 'timestamp' (TIMESTAMP WITH TIME ZONE) column.
-            cur.execute(
-                "INSERT INTO memories (content, embedding, source, timestamp) VALUES (%s, %s, %s, CURRENT_TIMESTAMP)",
-                (content, embedding, source)
-            )
-            conn.commit()
-        print(f"Successfully added memory from source '{source}' to DB.")
-        conn.close()
+        # Ensure your 'memories' table has a 'content' (TEXT),
+        # 'embedding' (VECTOR(EMBEDDING_DIMENSION)), 'source' (VARCHAR),
+        # and 'timestamp' (TIMESTAMP WITH TIME ZONE) column.
+        with get_db_connection() as conn:
+            # The INSERT itself also skips duplicates stored since the check above
+            if insert_memory(conn, content, embedding, source):
+                print(f"Successfully added memory from source '{source}' to DB.")
+            else:
+                print(f"Memory from source '{source}' is already stored, skipping.")
         return True
     except Exception as e:
         print(f"Error adding memory to database: {e}")
-        # It's good practice to rollback in case of error
-        if conn:
-            conn.rollback()
-            conn.close()
         return False
 
 
 
+# --- Bulk version for a day's news and generated posts ---
+def add_memories_to_db(contents, source):
+    """Adds many memories at once: batched /api/embed calls and a binary COPY on a pooled connection.
+    Content already stored is skipped, as in add_memory_to_db.
+
+    Returns the ingestion stats (rows, rows_per_sec, ...)."""
+    from database.ingest import ingest_memories
+    return ingest_memories(contents, source=source)
+
+
 # --- Example of how to use this function within your orchestration logic ---
 # This would be part of your content generation loop
 
@@ -191,14 +206,6 @@ def add_memory_to_db(content, source, metadata=None):
 
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler() # Also print to console
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
@@ -209,145 +216,119 @@ class LuminaOrchestrator:
         logger.info("Initializing Lumina Orchestrator...")
         self.load_config()
 
+        from ai_brain.async_llm_client import AsyncLLMClient
+        from ai_brain.response_cache import ResponseCache
+        from social_media.content_scheduler import ContentScheduler
+
         # Initialize core components (these will be actual class instances later)
-        # Ensure the key used here for 'api_key' matches your primary LLM API key in self.settings
-        self.mistral_api = MistralAPIInterface(
-            api_key=self.settings.get('PRIMARY_LLM_API_KEY'), # Updated to use a generic primary key
-            persona_prompt=self.lumina_persona_prompt
-        )
-        self.news_fetcher = NewsFetcher(
-            search_api_key=self.settings.get('CUSTOM_SEARCH_ENGINE_ID '), # Using SEARCHAPI_API_KEY for news
-            google_api_key=self.settings.get('GOOGLE_API_KEY') # Alternative for news/search
-        )
-        self.post_manager = PostManager(
-            mistral_api_interface=self.mistral_api,
-            x_api_keys=self.settings.get('X_API_KEYS'),
-            meta_api_keys=self.settings.get('META_API_KEYS'),
-            tiktok_api_keys=self.settings.get('TIKTOK_API_KEYS'),
-            reddit_api_keys=self.settings.get('REDDIT_API_KEYS') # Added Reddit
-        )
+        # Awaitable get_completion, so LLM calls never block the event loop
+        # Identical requests are answered from the SQLite response cache, sized by the llm: settings
+        llm = self.settings.llm
+        self.mistral_api = AsyncLLMClient.from_env(cache=ResponseCache(
+            ttl_seconds=llm.cache_ttl_seconds, max_entries=llm.cache_max_entries, max_bytes=llm.cache_max_bytes))
+        # NewsFetcher and PostManager are not written yet (see the commented imports above);
+        # until they are, run_social_media_cycle runs the daily horoscope pipeline instead.
+        # keys = self.settings.api_keys
+        # self.news_fetcher = NewsFetcher(
+        #     search_api_key=keys.google_search_engine_id, # Custom Search Engine ID for news
+        #     google_api_key=keys.google # Alternative for news/search
+        # )
+        # self.post_manager = PostManager(
+        #     mistral_api_interface=self.mistral_api,
+        #     x_api_keys=keys.x.model_dump(),
+        #     meta_api_keys=keys.meta.model_dump(),
+        #     tiktok_api_keys=keys.tiktok.model_dump(),
+        #     reddit_api_keys=keys.reddit.model_dump() # Added Reddit
+        # )
+        self.news_fetcher = None
+        self.post_manager = None
         self.scheduler = ContentScheduler(post_manager=self.post_manager, news_fetcher=self.news_fetcher)
         logger.info("Lumina Orchestrator initialized.")
 
     def load_config(self):
-        """Loads configuration settings and Lumina's persona using provided .env variable names."""
-        logger.info("Loading configuration from .env file...")
-        
-        # Determine primary LLM API key.
-        # Prioritize specific keys if available, otherwise use a general one.
-        # You mentioned Mistral-small:latest, which might use a specific Mistral key,
-        # or be accessed via an OpenAI-compatible endpoint.
-        # For this example, let's assume OPENAI_API_KEY is the primary if others aren't specified for Mistral.
-        # Please adjust PRIMARY_LLM_API_KEY logic if your Mistral setup uses a different key from your list.
-        primary_llm_key = os.getenv("MISTRAL_API_KEY") # Check for a specific Mistral key first
-        if not primary_llm_key:
-            primary_llm_key = os.getenv("OPENAI_API_KEY") # Fallback or if Mistral uses OpenAI-compatible key
-        if not primary_llm_key:
-            primary_llm_key = os.getenv("DEEPSEEK_API_KEY") # Another fallback
-        # Add more fallbacks if needed, e.g., GOOGLEGEMINI_API_KEY
-
-        self.settings = {
-            "PRIMARY_LLM_API_KEY": primary_llm_key,
-            "HF_TOKEN": os.getenv("HF_TOKEN"),
-
-            # News/Search APIs
-            "SEARCHAPI_API_KEY": os.getenv("SEARCHAPI_API_KEY"),
-            "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"), # For general Google services, could include news
-
-            # Social Media APIs
-            "X_API_KEYS": {
-                "api_key": os.getenv("X_API_KEY"),
-                "api_key_secret": os.getenv("X_API_KEY_SECRET"),
-                "bearer_token": os.getenv("X_BEARER_TOKEN"),
-                "access_token": os.getenv("X_ACCESS_TOKEN"),
-                "access_token_secret": os.getenv("X_ACCESS_SECRET"), # Note: your list had X_ACCESS_SECRET
-            },
-            "META_API_KEYS": {
-                "app_id": os.getenv("META_APP_ID"),
-                "app_secret": os.getenv("META_APP_SECRET"),
-                "access_token": os.getenv("META_API_KEY"), # Using your META_API_KEY as the access token
-                "app_credentials": os.getenv("META_APP_CREDENTIALS"), # Storing this if needed later
-            },
-            "TIKTOK_API_KEYS": {
-                "client_key": os.getenv("TIKTOK_API_KEY"), # Using your TIKTOK_API_KEY as client_key
-                "client_secret": os.getenv("TIKTOK_SECRET_KEY"), # Using your TIKTOK_SECRET_KEY as client_secret
-            },
-            "REDDIT_API_KEYS": {
-                "client_id": os.getenv("REDDIT_CLIENT_ID"),
-                "client_secret": os.getenv("REDDIT_CLIENT_SECRET"),
-                "username": os.getenv("REDDIT_USERNAME"),
-                "password": os.getenv("REDDIT_PASSWORD"),
-            },
-
-            # Database Configuration (for future use)
-            "DB_SETTINGS": {
-                "name": os.getenv("DB_NAME"),
-                "role": os.getenv("DB_ROLE"),
-                "password": os.getenv("DB_PASSWORD"),
-                "host": os.getenv("DB_HOST"),
-                "port": os.getenv("DB_PORT"),
-            },
-
-            # Other API Keys (for future use)
-            "BINANCE_API_KEY": os.getenv("BINANCE_API_KEY"),
-            "BINANCE_SECRET_KEY": os.getenv("BINANCE_SECRET_KEY"),
-            "DEEPSEEK_API_KEY_SECONDARY": os.getenv("DEEPSEEK_API_KEY"), # If used as a secondary/coder
-            "OPENAI_API_KEY_SECONDARY": os.getenv("OPENAI_API_KEY"),   # If used as a secondary/coder
-            "GOOGLEGEMINI_API_KEY": os.getenv("GOOGLEGEMINI_API_KEY"),
-            "HYPERBROWSER_API_KEY": os.getenv("HYPERBROWSER_API_KEY"),
-            "GITHUB_API_KEY": os.getenv("GITHUB_API_KEY"),
-            
-            # Model Choices/Misc
-            "MODEL_CRAWL_CHOICE": os.getenv("MODEL_CRAWL_CHOICE"),
-        }
-
-        # Validate that essential API keys are present
-        if not self.settings["PRIMARY_LLM_API_KEY"]:
+        """Loads the shared settings (config.settings: .env + settings.yml) and checks the essential keys."""
+        logger.info("Loading configuration from .env and config/settings.yml...")
+        self.settings = get_settings()
+        keys = self.settings.api_keys
+
+        # Validate that essential API keys are present (primary = MISTRAL_API_KEY, else OPENAI_API_KEY, else DEEPSEEK_API_KEY)
+        if not keys.primary_llm:
             logger.error("PRIMARY_LLM_API_KEY (e.g., MISTRAL_API_KEY, OPENAI_API_KEY) not found in .env file. Exiting.")
             raise ValueError("PRIMARY_LLM_API_KEY is not set. Please ensure your main LLM key is defined in .env.")
         
         # Example validation for X API keys (can be expanded for others)
-        if not all(self.settings["X_API_KEYS"].get(k) for k in ["api_key", "api_key_secret", "access_token", "access_token_secret"]):
+        if not all([keys.x.api_key, keys.x.api_key_secret, keys.x.access_token, keys.x.access_token_secret]):
             logger.warning("One or more X_API_KEYS are missing in .env. X/Twitter functionality may be limited.")
 
-
-        try:
-            with open(LUMINA_PERSONA_FILE, 'r', encoding='utf-8') as f:
-                self.lumina_persona_prompt = f.read()
-            logger.info("Lumina's persona prompt loaded successfully.")
-        except FileNotFoundError:
-            logger.error(f"Lumina persona file not found at: {LUMINA_PERSONA_FILE}")
-            self.lumina_persona_prompt = "You are Lumina, a friendly AI astrologer."
-            logger.warning("Using a default fallback persona.")
-        except Exception as e:
-            logger.error(f"Error loading Lumina's persona: {e}")
-            self.lumina_persona_prompt = "You are Lumina, a friendly AI astrologer."
-            logger.warning("Using a default fallback persona due to error.")
-
-
-    async def run_social_media_cycle(self):
+    @property
+    def lumina_persona_prompt(self):
+        """Lumina's persona (config/lumina_person.txt), current as of the last settings reload."""
+        return get_settings().persona
+
+    def apply_settings(self, new, old):
+        """Applies reloaded tuning knobs to the running components (registered with on_reload)."""
+        if new.llm != old.llm:
+            self.mistral_api.set_backend_concurrency(new.llm.backend_concurrency)
+            if self.mistral_api.cache is not None:
+                self.mistral_api.cache.resize(new.llm.cache_max_entries, new.llm.cache_max_bytes,
+                                              new.llm.cache_ttl_seconds)
+        if new.embedding.memory_entries != old.embedding.memory_entries:
+            from database.ingest import get_embedding_cache
+            get_embedding_cache().resize(new.embedding.memory_entries)
+        if new.database != old.database:
+            from database.connection import resize_pools
+            resize_pools(new.database)
+        if new.persona != old.persona:
+            logger.info("Lumina's persona prompt reloaded.")
+
+    async def run_social_media_cycle(self, reason="daily"):
         """
         Main cycle for generating and posting social media content.
-        This will be driven by the ContentScheduler.
+        Runs when the ContentScheduler fires one of the jobs from schedule_jobs().
         """
-        logger.info("Starting Lumina's social media content cycle...")
-        await self.scheduler.run_pending_tasks() # Example method
+        logger.info(f"Starting Lumina's social media content cycle ({reason})...")
+        if self.post_manager is not None:
+            await self.post_manager.run_cycle(reason)
+        elif reason == 'daily':
+            from pipeline.horoscope_pipeline import run_daily
+            pipeline, results = await run_daily()
+            logger.info(f"Daily horoscope pipeline finished: {len(results)} video(s), "
+                        f"{len(pipeline.errors)} error(s).")
+        else:
+            logger.warning(f"Skipping the '{reason}' content cycle: posting is not implemented yet "
+                           f"(social_media/post_manager.py is empty).")
+
+    async def schedule_jobs(self):
+        """Registers Lumina's recurring content with the scheduler (cron times are UTC)."""
+        from social_media.content_scheduler import AstroTrigger
+        await self.scheduler.add_job('daily_horoscopes', functools.partial(self.run_social_media_cycle, 'daily'),
+                                     cron="0 9 * * *", jitter_s=120, catch_up='once', priority=1)
+        # A new sign season starts when the Sun enters the sign; post an hour ahead of it
+        # (astronomy triggers find their first run in a worker thread, off the event loop)
+        await self.scheduler.add_job('sign_season',
+                                     functools.partial(self.run_social_media_cycle, 'sign_season'),
+                                     trigger=AstroTrigger('ingress', body='Sun', offset=datetime.timedelta(hours=-1)),
+                                     catch_up='skip', priority=2)
+        await self.scheduler.add_job('new_moon', functools.partial(self.run_social_media_cycle, 'new_moon'),
+                                     trigger=AstroTrigger('new_moon'), catch_up='skip', priority=2)
 
     async def start(self):
-        """Starts the main loop of the orchestrator."""
+        """Starts the orchestrator; the scheduler sleeps until the next job is due."""
         logger.info("Lumina Orchestrator starting...")
-        while True:
-            try:
-                await self.run_social_media_cycle()
-                logger.info("Social media cycle complete. Sleeping for 1 hour.") # Adjust as needed
-                await asyncio.sleep(3600) 
-            except KeyboardInterrupt:
-                logger.info("Lumina Orchestrator shutting down due to KeyboardInterrupt.")
-                break
-            except Exception as e:
-                logger.error(f"An error occurred in the main loop: {e}", exc_info=True)
-                logger.info("Attempting to recover or sleeping before retrying...")
-                await asyncio.sleep(60)
+        # Persona and tuning knobs follow edits to .env / settings.yml / lumina_person.txt without a restart
+        watch_settings()
+        on_reload(self.apply_settings)
+        await self.schedule_jobs()
+        try:
+            await self.scheduler.run_forever()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("Lumina Orchestrator shutting down.")
+            self.scheduler.stop()
+            await self.scheduler.drain()
+        finally:
+            # Close the LLM keep-alive pools
+            await self.mistral_api.aclose()
+            self.mistral_api.cache.close()
 
     # --- Future methods for Phase B (Live Streaming) would go here ---
     # async def start_live_stream_components(self):
@@ -357,6 +338,9 @@ class LuminaOrchestrator:
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
+    get_settings()
+    setup_logging()
+
     # Example usage of the functions
     # Ensure your database is set up and the 'memories' table exists with the correct schema (VECTOR(384))
 
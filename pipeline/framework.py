@@ -0,0 +1,236 @@
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Constants
+DEFAULT_QUEUE_SIZE = 4        # Items waiting in front of each stage; a full queue blocks the stage before it
+MONITOR_INTERVAL_S = 10.0
+
+_DONE = object()              # End-of-stream marker passed down the queues
+
+class Stage:
+    """One step of a Pipeline: a function applied to each item by a pool of workers.
+
+    Args:
+        name: Stage name, used in stats and logs.
+        func: Coroutine function, or plain function run on the stage's executor. Returns
+            the item for the next stage; None drops the item.
+        workers: Items processed at once (worker tasks, and executor size).
+        executor: 'thread' or 'process' for a pool owned by the stage, an Executor to
+            share, or None for coroutine functions (plain functions default to 'thread').
+            Functions run in a process pool must be module-level so they can be pickled.
+        queue_size: Capacity of the queue feeding this stage (Pipeline default if None).
+        fan_out: func returns an iterable, and each element goes on as its own item.
+        retries: Extra attempts for an item whose func raised, with retry_delay_s doubling.
+    """
+
+    def __init__(self, name, func, workers=1, executor=None, queue_size=None, fan_out=False,
+                 retries=0, retry_delay_s=1.0):
+        # Objects with an async __call__ (HoroscopeWriter, FarmRenderer) run on the loop too
+        is_async = inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, '__call__', None))
+        if executor is None and not is_async:
+            executor = 'thread'
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.executor = executor
+        self.queue_size = queue_size
+        self.fan_out = fan_out
+        self.retries = retries
+        self.retry_delay_s = retry_delay_s
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.processed = 0
+        self.failed = 0
+        self.emitted = 0
+        self.busy = 0
+        self.busy_s = 0.0
+        self.max_queue_depth = 0
+
+    def _make_executor(self):
+        if self.executor == 'thread':
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name), True
+        if self.executor == 'process':
+            return ProcessPoolExecutor(max_workers=self.workers), True
+        if isinstance(self.executor, Executor):
+            return self.executor, False
+        if self.executor is None:
+            return None, False
+        raise ValueError(f"Stage '{self.name}': executor must be 'thread', 'process', an Executor or None")
+
+class Pipeline:
+    """Streams items through a chain of Stages connected by bounded asyncio queues.
+
+    Every stage runs its own worker pool, so an item moves on as soon as its stage is
+    done with it: the first sign can be rendering while later ones are still in the LLM
+    stage. Bounded queues apply backpressure, so a slow stage holds back the ones before
+    it instead of letting finished work pile up in memory. stats() reports per-stage queue
+    depth, utilization and failures plus end-to-end throughput.
+
+    A failing item is logged, counted and dropped (after its stage's retries); the other
+    items carry on. Failures are kept in self.errors as (stage, item, exception).
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.errors = []
+        self._queues = []
+        self._start = None
+        self._first_output_s = None
+        self._finished = None
+        self.items_in = 0
+        self.items_out = 0
+
+    async def _call(self, stage, executor, item):
+        if executor is None:
+            return await stage.func(item)
+        return await asyncio.get_running_loop().run_in_executor(executor, stage.func, item)
+
+    async def _put(self, queue, stage, item):
+        await queue.put(item)
+        if stage is not None:
+            stage.max_queue_depth = max(stage.max_queue_depth, queue.qsize())
+
+    async def _worker(self, stage, executor, inbox, outbox, next_stage):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Leave the marker for this stage's other workers
+                inbox.put_nowait(_DONE)
+                return
+            stage.busy += 1
+            start = time.perf_counter()
+            try:
+                for attempt in range(stage.retries + 1):
+                    try:
+                        result = await self._call(stage, executor, item)
+                        break
+                    except Exception as e:
+                        if attempt == stage.retries:
+                            raise
+                        logging.warning(f"Stage '{stage.name}' failed on {item!r} (attempt {attempt + 1}): {e}")
+                        await asyncio.sleep(stage.retry_delay_s * 2 ** attempt)
+            except Exception as e:
+                stage.failed += 1
+                self.errors.append((stage.name, item, e))
+                logging.error(f"Stage '{stage.name}' dropped {item!r}: {e}")
+                continue
+            finally:
+                stage.busy -= 1
+                stage.busy_s += time.perf_counter() - start
+            stage.processed += 1
+            for output in (result if stage.fan_out else [result]):
+                if output is not None:
+                    stage.emitted += 1
+                    await self._put(outbox, next_stage, output)
+
+    async def _run_stage(self, stage, inbox, outbox, next_stage):
+        executor, owned = stage._make_executor()
+        try:
+            await asyncio.gather(*(self._worker(stage, executor, inbox, outbox, next_stage)
+                                   for _ in range(stage.workers)))
+        finally:
+            if owned:
+                executor.shutdown(wait=False, cancel_futures=True)
+        await outbox.put(_DONE)
+
+    async def _feed(self, items):
+        first = self.stages[0]
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                self.items_in += 1
+                await self._put(self._queues[0], first, item)
+        else:
+            for item in items:
+                self.items_in += 1
+                await self._put(self._queues[0], first, item)
+        await self._queues[0].put(_DONE)
+
+    async def stream(self, items):
+        """Run items (iterable or async iterable) through the pipeline, yielding final
+        outputs as they come out (not in input order)."""
+        for stage in self.stages:
+            stage.reset_stats()
+        self.errors = []
+        self.items_in = self.items_out = 0
+        self._first_output_s = self._finished = None
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size or self.queue_size) for stage in self.stages]
+        self._queues.append(asyncio.Queue(maxsize=self.queue_size))
+        self._start = time.perf_counter()
+
+        tasks = [asyncio.create_task(self._feed(items), name='pipeline:feed')]
+        for i, stage in enumerate(self.stages):
+            next_stage = self.stages[i + 1] if i + 1 < len(self.stages) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, self._queues[i], self._queues[i + 1], next_stage),
+                                             name=f"pipeline:{stage.name}"))
+        try:
+            while True:
+                output = await self._queues[-1].get()
+                if output is _DONE:
+                    break
+                self.items_out += 1
+                if self._first_output_s is None:
+                    self._first_output_s = time.perf_counter() - self._start
+                yield output
+            await asyncio.gather(*tasks)
+        finally:
+            self._finished = time.perf_counter()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, items):
+        """Run items through the pipeline and return the final outputs in completion order."""
+        return [output async for output in self.stream(items)]
+
+    def stats(self):
+        """End-to-end throughput plus queue depth, utilization and counts for each stage."""
+        if self._start is None:
+            return {'elapsed_s': 0.0, 'stages': {}}
+        elapsed = (self._finished or time.perf_counter()) - self._start
+        stages = {}
+        for i, stage in enumerate(self.stages):
+            stages[stage.name] = {
+                'queue_depth': self._queues[i].qsize(),
+                'max_queue_depth': stage.max_queue_depth,
+                'busy': stage.busy,
+                'workers': stage.workers,
+                'processed': stage.processed,
+                'failed': stage.failed,
+                'emitted': stage.emitted,
+                'mean_service_s': round(stage.busy_s / stage.processed, 3) if stage.processed else 0.0,
+                'utilization': round(stage.busy_s / (stage.workers * elapsed), 3) if elapsed else 0.0,
+            }
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'throughput_per_s': round(self.items_out / elapsed, 3) if elapsed else 0.0,
+            'first_output_s': round(self._first_output_s, 3) if self._first_output_s is not None else None,
+            'stages': stages,
+        }
+
+    async def monitor(self, interval_s=MONITOR_INTERVAL_S):
+        """Log queue depths and throughput every interval_s; run as a task beside stream()/run()."""
+        while True:
+            await asyncio.sleep(interval_s)
+            stats = self.stats()
+            depths = ", ".join(f"{name} {s['queue_depth']}q/{s['busy']}busy" for name, s in stats['stages'].items())
+            logging.info(f"Pipeline {stats['items_out']} out in {stats['elapsed_s']}s "
+                         f"({stats['throughput_per_s']}/s): {depths}")
+
+def format_stats(stats):
+    """Render Pipeline.stats() as a plain-text table."""
+    lines = [f"{stats['items_out']} items out of {stats['items_in']} in {stats['elapsed_s']}s "
+             f"({stats['throughput_per_s']}/s), first after {stats['first_output_s']}s",
+             f"{'stage':<12} {'workers':>7} {'done':>6} {'failed':>6} {'max q':>6} {'mean s':>8} {'util':>6}"]
+    for name, s in stats['stages'].items():
+        lines.append(f"{name:<12} {s['workers']:>7} {s['processed']:>6} {s['failed']:>6} "
+                     f"{s['max_queue_depth']:>6} {s['mean_service_s']:>8} {s['utilization']:>6}")
+    return "\n".join(lines)
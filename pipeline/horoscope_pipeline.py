@@ -0,0 +1,169 @@
+import asyncio
+import datetime
+import logging
+import os
+import threading
+
+import ollama
+
+from ai_brain.prompts import OLLAMA_KEEP_ALIVE, build_horoscope_prompt
+from pipeline.framework import Pipeline, Stage, format_stats
+from planets.horoscope_batch import HOROSCOPE_MODEL, HOROSCOPE_OPTIONS
+
+# Constants
+PIPELINE_OUTPUT_DIR = os.getenv("PIPELINE_OUTPUT_DIR",
+                                os.path.join(os.path.dirname(__file__), '..', 'output', 'pipeline'))
+TTS_MODEL = os.getenv("TTS_MODEL", "tts_models/en/ljspeech/vits")
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "1"))          # One model per worker thread; keep at 1 on a single GPU
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))    # Headless browsers rendering at once
+RENDER_CHARACTER = "coffee"
+FARM_SCENES_IN_FLIGHT = 12    # Every sign's video queued on the render farm at once; its browsers bound the real work
+
+# positions -> meaning -> audio -> animation -> upload, as sketched in main.py
+#   ephemeris  one date in, 12 signs out (thread)
+#   prompt     sign view -> prompt text (event loop)
+#   llm        prompt -> horoscope text via Ollama (event loop, generation.horoscope_concurrency requests)
+#   tts        text -> wav (thread pool)
+#   render     wav + timings -> video (RenderFarm: warm browsers shared by every sign's segments,
+#              or a process pool where each worker launches its own Playwright browser)
+#   post       video -> socials (event loop)
+
+def artifact_path(item, suffix):
+    """Per-day, per-sign output path, e.g. output/pipeline/2025-05-06/Aries.wav."""
+    folder = os.path.join(PIPELINE_OUTPUT_DIR, item['date'])
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{item['sign']}{suffix}")
+
+def compute_views(now):
+    """Ephemeris stage: calculate the sky once and fan out one item per sign."""
+    from data_ingestion.solar_data import Sky, load_ephemeris_cache
+    sky = Sky.compute(now, cache=load_ephemeris_cache())
+    return [{'date': now.strftime("%Y-%m-%d"), 'sign': view.sign, 'view': view} for view in sky.views()]
+
+async def build_prompt(item):
+    """Prompt stage: shared sky prefix plus the sign's focus (see ai_brain.prompts)."""
+    view = item.pop('view')
+    return {**item, 'prompt': build_horoscope_prompt(view)}
+
+class HoroscopeWriter:
+    """LLM stage: one horoscope per item from Ollama, saved next to the other artifacts."""
+
+    def __init__(self, model=HOROSCOPE_MODEL, options=None, host=None, keep_alive=OLLAMA_KEEP_ALIVE):
+        self.model = model
+        self.options = options or HOROSCOPE_OPTIONS
+        self.keep_alive = keep_alive
+        self.client = ollama.AsyncClient(host=host)
+
+    async def __call__(self, item):
+        response = await self.client.generate(model=self.model, prompt=item['prompt'], options=self.options,
+                                              keep_alive=self.keep_alive)
+        text = response['response'].strip()
+        path = artifact_path(item, '.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return {**item, 'text': text, 'text_path': path}
+
+_tts = threading.local()
+
+def synthesize(item):
+    """TTS stage: speak the horoscope into a wav, with one Coqui model loaded per worker thread."""
+    if getattr(_tts, 'model', None) is None:
+        from TTS.api import TTS
+        _tts.model = TTS(model_name=TTS_MODEL)
+    path = artifact_path(item, '.wav')
+    _tts.model.tts_to_file(text=item['text'], file_path=path)
+    return {**item, 'audio_path': path}
+
+def scene_for(item):
+    """AnimationRenderer input for a sign's video, lip-synced to its narration."""
+    from animation.lipsync import read_wav, seed_for, timings_from_samples
+    name = f"{item['date']}_{item['sign']}"
+    samples, sample_rate = read_wav(item['audio_path'])
+    return {
+        'name': name,
+        'character': RENDER_CHARACTER,
+        'audio_path': os.path.abspath(item['audio_path']),
+        'duration': len(samples) / sample_rate,
+        'timings': timings_from_samples(samples, sample_rate, seed=seed_for(name)),
+    }
+
+def render(item):
+    """Render stage (runs in a worker process): animate the character over the audio."""
+    from animation.build_scene import AnimationRenderer
+    renderer = AnimationRenderer(scene_for(item))
+    return {**item, 'video_path': asyncio.run(renderer.render_scene())}
+
+class FarmRenderer:
+    """Render stage on a shared animation.render_farm.RenderFarm (warm browsers, segments in parallel).
+
+    The farm is started on first use, on the pipeline's event loop; close() shuts it down.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS):
+        self.workers = workers
+        self.farm = None
+        self._starting = None
+
+    async def __call__(self, item):
+        if self._starting is None:
+            from animation.render_farm import RenderFarm
+            self.farm = RenderFarm(workers=self.workers)
+            self._starting = asyncio.ensure_future(self.farm.start())
+        await self._starting
+        return {**item, 'video_path': await self.farm.render(scene_for(item))}
+
+    async def close(self):
+        if self.farm is not None:
+            await self.farm.close()
+
+async def log_post(item):
+    """Default post stage until the social posters are wired in: record what would be uploaded."""
+    logging.info(f"Ready to post {item['sign']} for {item['date']}: {item['video_path']}")
+    return item
+
+def build_pipeline(post=log_post, llm_workers=None, tts_workers=TTS_WORKERS,
+                   render_workers=RENDER_WORKERS, renderer=None):
+    """The daily horoscope video pipeline; feed it datetimes (usually just now).
+
+    Args:
+        post: Coroutine function taking the finished item (with video_path).
+        llm_workers, tts_workers, render_workers: Pool sizes for the expensive stages
+            (llm_workers defaults to generation.horoscope_concurrency in the settings).
+        renderer: A FarmRenderer to render on warm browsers; by default each render
+                  worker process launches its own browser per video.
+    """
+    if llm_workers is None:
+        from config.settings import get_settings
+        llm_workers = get_settings().generation.horoscope_concurrency
+    return Pipeline([
+        Stage('ephemeris', compute_views, executor='thread', fan_out=True),
+        Stage('prompt', build_prompt),
+        Stage('llm', HoroscopeWriter(), workers=llm_workers, retries=2),
+        Stage('tts', synthesize, workers=tts_workers, executor='thread'),
+        Stage('render', renderer, workers=FARM_SCENES_IN_FLIGHT) if renderer is not None
+        else Stage('render', render, workers=render_workers, executor='process'),
+        Stage('post', post, retries=2),
+    ])
+
+async def run_daily(now=None, use_farm=True):
+    renderer = FarmRenderer() if use_farm else None
+    pipeline = build_pipeline(renderer=renderer)
+    monitor = asyncio.create_task(pipeline.monitor())
+    try:
+        results = await pipeline.run([now or datetime.datetime.now()])
+    finally:
+        monitor.cancel()
+        if renderer is not None:
+            await renderer.close()
+    return pipeline, results
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    pipeline, results = asyncio.run(run_daily())
+    print(format_stats(pipeline.stats()))
+    for stage, item, error in pipeline.errors:
+        print(f"  {stage}: {item.get('sign') if isinstance(item, dict) else item} failed: {error}")
+
+if __name__ == "__main__":
+    # From the project root: python -m pipeline.horoscope_pipeline
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import time
+import ollama
+
+# Model and sampling options shared with generate_horoscope
+HOROSCOPE_MODEL = 'wizard-vicuna-uncensored:30b'
+HOROSCOPE_OPTIONS = {
+    'temperature': 0.7,
+    'num_predict': 500
+}
+
+HOROSCOPE_RETRIES = 2
+HOROSCOPE_BACKOFF_S = 1.0      # Wait before retry n is HOROSCOPE_BACKOFF_S * 2 ** n
+
+async def generate_sign(client, semaphore, sign, prompt, output_path,
+                        model=HOROSCOPE_MODEL, options=None, retries=HOROSCOPE_RETRIES, keep_alive=None):
+    """Stream one sign's horoscope into output_path and return its timing stats.
+
+    Tokens are appended to output_path + '.part' as they arrive; the file is renamed
+    into place only once the response is complete, so a finished output_path always
+    holds a whole horoscope and a rerun skips it.
+    """
+    if os.path.exists(output_path):
+        logging.info(f"Horoscope for {sign} already exists at {output_path}, skipping")
+        return {'sign': sign, 'status': 'skipped'}
+
+    partial_path = output_path + '.part'
+    for attempt in range(1, retries + 2):
+        async with semaphore:
+            start = time.perf_counter()
+            first_token = None
+            chunks = 0
+            final = None
+            try:
+                stream = await client.generate(model=model, prompt=prompt, options=options or HOROSCOPE_OPTIONS,
+                                               stream=True, keep_alive=keep_alive)
+                with open(partial_path, 'w', encoding='utf-8') as f:
+                    async for chunk in stream:
+                        if chunk['response']:
+                            if first_token is None:
+                                first_token = time.perf_counter() - start
+                            f.write(chunk['response'])
+                            f.flush()
+                            chunks += 1
+                        if chunk.get('done'):
+                            final = chunk
+                os.replace(partial_path, output_path)
+                break
+            except Exception as e:
+                logging.error(f"Error generating horoscope for {sign} (attempt {attempt}): {e}")
+                if os.path.exists(partial_path):
+                    os.unlink(partial_path)
+                if attempt > retries:
+                    return {'sign': sign, 'status': 'failed', 'error': str(e)}
+        # Back off without holding a slot, so the other signs keep generating meanwhile
+        await asyncio.sleep(HOROSCOPE_BACKOFF_S * 2 ** attempt)
+
+    elapsed = time.perf_counter() - start
+    # Prefer Ollama's own decode counters; fall back to streamed chunks over wall time
+    if final is not None and final.get('eval_count') and final.get('eval_duration'):
+        tokens = final['eval_count']
+        tokens_per_sec = tokens / (final['eval_duration'] / 1e9)
+    else:
+        tokens = chunks
+        tokens_per_sec = chunks / elapsed if elapsed else 0.0
+
+    stats = {
+        'sign': sign,
+        'status': 'generated',
+        'latency_s': round(elapsed, 3),
+        'first_token_s': round(first_token, 3) if first_token is not None else None,
+        'tokens': tokens,
+        'tokens_per_sec': round(tokens_per_sec, 2)
+    }
+    logging.info(f"Generated horoscope for {sign} in {stats['latency_s']}s "
+                 f"({stats['tokens']} tokens, {stats['tokens_per_sec']} tok/s) -> {output_path}")
+    return stats
+
+async def generate_batch(jobs, concurrency=None, model=HOROSCOPE_MODEL, options=None,
+                         host=None, keep_alive=None):
+    """Fan a batch of (sign, prompt, output_path) jobs out to Ollama with bounded concurrency.
+
+    concurrency defaults to generation.horoscope_concurrency in the current settings.
+    Ollama only decodes that many in parallel if the server allows it
+    (OLLAMA_NUM_PARALLEL), otherwise extra requests queue server-side.
+
+    Returns the per-sign stats in job order. A sign that fails does not stop the
+    others; it is reported with status 'failed' and picked up on the next run.
+    """
+    if concurrency is None:
+        from config.settings import get_settings
+        concurrency = get_settings().generation.horoscope_concurrency
+    client = ollama.AsyncClient(host=host)
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        generate_sign(client, semaphore, sign, prompt, output_path, model, options, keep_alive=keep_alive)
+        for sign, prompt, output_path in jobs
+    ))
+    elapsed = time.perf_counter() - start
+
+    generated = [r for r in results if r['status'] == 'generated']
+    failed = [r['sign'] for r in results if r['status'] == 'failed']
+    logging.info(f"Batch finished in {elapsed:.1f}s: {len(generated)} generated, "
+                 f"{len(results) - len(generated) - len(failed)} skipped, {len(failed)} failed {failed or ''}")
+    return results
+
+def format_report(results):
+    """Render per-sign batch stats as a plain-text table."""
+    lines = [f"{'sign':<12} {'status':<10} {'latency s':>10} {'ttft s':>8} {'tokens':>7} {'tok/s':>8}"]
+    for r in results:
+        lines.append(f"{r['sign']:<12} {r['status']:<10} {r.get('latency_s', ''):>10} "
+                     f"{r.get('first_token_s') or '':>8} {r.get('tokens', ''):>7} {r.get('tokens_per_sec', ''):>8}")
+    return "\n".join(lines)
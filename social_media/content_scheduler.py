@@ -1,8 +1,453 @@
-import os
 import asyncio
+import datetime
+import heapq
+import inspect
+import itertools
+import json
 import logging
-import time
-from dotenv import load_dotenv
+import os
+import random
+
+# Constants
+SCHEDULE_STATE_FILE = os.getenv("SCHEDULE_STATE_FILE",
+                                os.path.join(os.path.dirname(__file__), 'schedule_state.json'))
+CATCH_UP_POLICIES = ('skip', 'once', 'all')   # What to do with runs missed while the process was down
+MAX_CATCH_UP_RUNS = 24                        # Cap for catch_up='all'
+MAX_CONCURRENT_JOBS = 4                       # Across all jobs
+ASTRO_LOOKAHEAD_DAYS = 35                     # Window searched per find_events call (> one lunar month)
+ASTRO_MAX_WINDOWS = 26                        # Give up after about two and a half years without a match
+CRON_SEARCH_YEARS = 5                         # An expression with no match within this is rejected
+
+# Astronomy triggers map onto find_events output: new/full moons are exact Sun-Moon aspects
+LUNATIONS = {'new_moon': 'conjunction', 'full_moon': 'opposition'}
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def _parse_field(field, low, high, names=None):
+    """Set of values matched by one cron field: *, a-b, */n, a-b/n and comma lists."""
+    values = set()
+    for part in field.lower().split(','):
+        spec, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if spec == '*':
+            start, end = low, high
+        else:
+            bounds = [names.index(b) + low if names and b in names else int(b) for b in spec.split('-')]
+            start, end = bounds[0], bounds[-1] if len(bounds) > 1 or step == 1 else high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field '{field}' is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """Standard five-field cron expression (minute hour day-of-month month day-of-week), in UTC.
+
+    Day-of-week is 0-6 from Sunday (7 is also Sunday) or sun-sat. As in cron, when both
+    day fields are restricted a day matching either one matches.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields")
+        self.expression = expression
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                                                      'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])
+        weekdays = _parse_field(fields[4], 0, 7, ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after):
+        """First matching minute strictly after the datetime `after` (aware, UTC)."""
+        dt = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = after + datetime.timedelta(days=366 * CRON_SEARCH_YEARS)
+        # Skip whole months, days and hours that cannot match instead of stepping minute by minute
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + datetime.timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += datetime.timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+    def __repr__(self):
+        return f"cron({self.expression})"
+
+class AstroTrigger:
+    """Fires at astronomical events found by data_ingestion.events.find_events.
+
+    Args:
+        kind: 'ingress', 'station', 'new_moon' or 'full_moon'.
+        body: Body for ingresses and stations (e.g. 'Sun' for the start of each sign season).
+        sign: Only ingresses into this sign, or stations in it.
+        offset: timedelta added to the event time (negative to post ahead of it).
+        find: Event search function, find_events by default.
+    """
+
+    # next_after runs an ephemeris search, so the scheduler calls it off the event loop
+    blocking = True
+
+    def __init__(self, kind, body=None, sign=None, offset=datetime.timedelta(0), find=None):
+        if kind not in ('ingress', 'station') + tuple(LUNATIONS):
+            raise ValueError(f"Unknown astronomy trigger '{kind}'")
+        if kind in ('ingress', 'station') and body is None:
+            raise ValueError(f"An '{kind}' trigger needs a body")
+        self.kind = kind
+        self.body = body
+        self.sign = sign
+        self.offset = offset
+        self._find = find
+
+    def _search(self, start, end):
+        from data_ingestion.solar_data import ASPECT_TYPES, julian_day
+        find = self._find
+        if find is None:
+            from data_ingestion.events import find_events as find
+        start_jd = julian_day(start.astimezone(datetime.timezone.utc).replace(tzinfo=None))
+        end_jd = julian_day(end.astimezone(datetime.timezone.utc).replace(tzinfo=None))
+        if self.kind in LUNATIONS:
+            aspect = LUNATIONS[self.kind]
+            events = find(start_jd, end_jd, bodies=['Sun', 'Moon'], ingresses=False, stations=False,
+                          aspect_types={aspect: ASPECT_TYPES[aspect]})
+            return [e for e in events if e['event'] == 'aspect' and e['aspect'] == aspect]
+        events = find(start_jd, end_jd, bodies=[self.body], ingresses=self.kind == 'ingress',
+                      stations=self.kind == 'station', aspect_types=None)
+        return [e for e in events if e['event'] == self.kind and self.sign in (None, e['sign'])]
+
+    def next_after(self, after):
+        """Time of the first matching event (plus offset) strictly after `after`."""
+        start = after - self.offset
+        for _ in range(ASTRO_MAX_WINDOWS):
+            end = start + datetime.timedelta(days=ASTRO_LOOKAHEAD_DAYS)
+            for event in self._search(start, end):
+                when = datetime.datetime.fromisoformat(event['time_utc'].rstrip('Z')).replace(
+                    tzinfo=datetime.timezone.utc) + self.offset
+                if when > after:
+                    return when
+            start = end
+        raise ValueError(f"No {self!r} event within {ASTRO_MAX_WINDOWS * ASTRO_LOOKAHEAD_DAYS} days")
+
+    def __repr__(self):
+        return f"astro({self.kind}{' ' + self.body if self.body else ''}{' ' + self.sign if self.sign else ''})"
+
+class Job:
+    """A scheduled callable (coroutine function, or plain function run in a thread)."""
+
+    def __init__(self, name, func, trigger, max_concurrency=1, jitter_s=0.0, catch_up='once', priority=0):
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}, not '{catch_up}'")
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.max_concurrency = max_concurrency
+        self.jitter_s = jitter_s
+        self.catch_up = catch_up
+        self.priority = priority
+        self.next_run = None        # Scheduled time before jitter; what is persisted
+        self.last_run = None
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0            # Fires dropped because max_concurrency runs were still going
+        self.total_lag_s = 0.0      # Sum of (actual start - scheduled time)
+
+    def stats(self):
+        return {
+            'trigger': repr(self.trigger),
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'mean_lag_s': round(self.total_lag_s / self.runs, 3) if self.runs else 0.0,
+        }
+
+class ContentScheduler:
+    """Runs content jobs when they are due, sleeping until the earliest one instead of polling.
+
+    Due times sit in a min-heap of (time, -priority, seq, job name); the loop waits until
+    the head is due, or until add_job/remove_job wakes it, so a job added mid-sleep for an
+    earlier time is not missed. Each job's next scheduled time is saved to a JSON state
+    file, and on restart runs missed while the process was down are handled by the job's
+    catch_up policy: 'skip' them, run 'once', or run 'all' (up to MAX_CATCH_UP_RUNS).
+
+    Args:
+        post_manager, news_fetcher: Shared components, available to jobs as attributes.
+        state_path: JSON file for next-run times, or None to keep nothing on disk.
+        max_concurrent_jobs: Runs in flight across all jobs.
+        clock: Function returning the current aware UTC datetime.
+        rng: random.Random used for jitter.
+    """
+
+    def __init__(self, post_manager=None, news_fetcher=None, state_path=SCHEDULE_STATE_FILE,
+                 max_concurrent_jobs=MAX_CONCURRENT_JOBS, clock=utcnow, rng=None):
+        self.post_manager = post_manager
+        self.news_fetcher = news_fetcher
+        self.state_path = state_path
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._tokens = {}           # name -> seq of its live heap entry; older entries are stale
+        self._saved = self._load_state()
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks = set()
+        self._wakeup = None
+        self._stopping = False
+
+    # --- Persistence ---
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading schedule state from {self.state_path}: {e}")
+            return {}
+
+    def save_state(self):
+        """Write each job's next and last run times (atomically, via a temp file)."""
+        if not self.state_path:
+            return
+        state = dict(self._saved)
+        for name, job in self.jobs.items():
+            state[name] = {'next_run': job.next_run.isoformat() if job.next_run else None,
+                           'last_run': job.last_run.isoformat() if job.last_run else None}
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logging.error(f"Error saving schedule state to {self.state_path}: {e}")
+
+    # --- Jobs ---
+    async def add_job(self, name, func, cron=None, trigger=None, max_concurrency=1, jitter_s=0.0,
+                      catch_up='once', priority=0):
+        """Schedule func under name, on a cron expression or a trigger (e.g. AstroTrigger).
+
+        A blocking trigger's first run is found in a worker thread, so adding it does not
+        stall the event loop.
+
+        Args:
+            name: Unique job name; also the key its next-run time is saved under.
+            func: Coroutine function or plain function (run in a worker thread), called with no arguments.
+            cron: Five-field UTC cron expression.
+            trigger: Any object with next_after(datetime) -> datetime, instead of cron.
+            max_concurrency: Runs of this job allowed at once; further fires are skipped.
+            jitter_s: Each run starts up to this many seconds after its scheduled time.
+            catch_up: 'skip', 'once' or 'all' for runs missed while stopped.
+            priority: Higher runs first among jobs due at the same time.
+
+        Returns:
+            The Job.
+        """
+        if (cron is None) == (trigger is None):
+            raise ValueError("Give exactly one of cron or trigger")
+        job = Job(name, func, CronSchedule(cron) if cron else trigger, max_concurrency, jitter_s, catch_up, priority)
+        now = self.clock()
+        self.jobs[name] = job
+
+        saved = self._saved.get(name) or {}
+        if saved.get('last_run'):
+            job.last_run = datetime.datetime.fromisoformat(saved['last_run'])
+        next_run = datetime.datetime.fromisoformat(saved['next_run']) if saved.get('next_run') else None
+        if getattr(job.trigger, 'blocking', False):
+            missed, next_run = await asyncio.to_thread(self._first_runs, job, next_run, now)
+            if self.jobs.get(name) is not job:
+                return job          # Removed or replaced while its first run was being found
+        else:
+            missed, next_run = self._first_runs(job, next_run, now)
+        # Runs replayed under catch_up='all' are queued now; next_run is the live heap entry
+        for when in missed:
+            self._push(job, when, live=False)
+        self._schedule(job, next_run)
+        return job
+
+    def _first_runs(self, job, next_run, now):
+        """(missed runs to replay, next live run) for a job added with its saved next_run."""
+        if next_run is None:
+            return [], job.trigger.next_after(now)
+        if next_run > now:
+            return [], next_run
+        missed = self._missed_runs(job, next_run, now)
+        logging.info(f"Job '{job.name}' missed {len(missed)} run(s) since {next_run.isoformat()}; "
+                     f"catch_up='{job.catch_up}'")
+        if job.catch_up == 'skip':
+            return [], job.trigger.next_after(now)
+        if job.catch_up == 'once':
+            return [], missed[-1]
+        return missed[:-1], missed[-1]
+
+    def remove_job(self, name):
+        self.jobs.pop(name, None)
+        self._tokens.pop(name, None)
+        self._saved.pop(name, None)
+        self.save_state()
+        self._wake()
+
+    def _missed_runs(self, job, first, now):
+        missed = [first]
+        if job.catch_up == 'all':
+            while len(missed) < MAX_CATCH_UP_RUNS:
+                when = job.trigger.next_after(missed[-1])
+                if when > now:
+                    break
+                missed.append(when)
+        return missed
+
+    def _push(self, job, when, live=True):
+        seq = next(self._seq)
+        if live:
+            self._tokens[job.name] = seq
+        heapq.heappush(self._heap, (when, -job.priority, seq, job.name, live))
+
+    def _schedule(self, job, when):
+        job.next_run = when
+        self._push(job, when)
+        self.save_state()
+        self._wake()
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _discard_stale(self):
+        while self._heap:
+            _, _, seq, name, live = self._heap[0]
+            if name in self.jobs and (not live or self._tokens.get(name) == seq):
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Scheduled time of the earliest pending run, or None."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    # --- Running ---
+    async def _run(self, job, scheduled_times):
+        # Runs missed under catch_up='all' arrive together and go one after another
+        for scheduled in scheduled_times:
+            if job.jitter_s:
+                await asyncio.sleep(self.rng.uniform(0, job.jitter_s))
+            async with self._semaphore:
+                started = self.clock()
+                job.total_lag_s += max(0.0, (started - scheduled).total_seconds())
+                try:
+                    if inspect.iscoroutinefunction(job.func):
+                        await job.func()
+                    else:
+                        result = await asyncio.to_thread(job.func)
+                        if inspect.isawaitable(result):
+                            await result
+                except Exception as e:
+                    job.failures += 1
+                    logging.error(f"Scheduled job '{job.name}' failed: {e}", exc_info=True)
+                finally:
+                    job.runs += 1
+                    job.last_run = started
+        job.running -= 1
+
+    def _next_run(self, job, scheduled, now):
+        # Next occurrence after the scheduled time (not after now), so runs do not drift
+        next_run = job.trigger.next_after(scheduled)
+        while next_run <= now:
+            next_run = job.trigger.next_after(next_run)
+        return next_run
+
+    async def _reschedule(self, job, scheduled, now):
+        """Find a blocking trigger's next run in a worker thread, then queue it."""
+        try:
+            next_run = await asyncio.to_thread(self._next_run, job, scheduled, now)
+        except Exception as e:
+            logging.error(f"Could not schedule the next run of job '{job.name}': {e}", exc_info=True)
+            return
+        if self.jobs.get(job.name) is job:
+            self._schedule(job, next_run)
+
+    def _track(self, task):
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _start(self, job, scheduled_times):
+        if job.running >= job.max_concurrency:
+            job.skipped += len(scheduled_times)
+            logging.warning(f"Job '{job.name}' still has {job.running} run(s) going; skipping the "
+                            f"{scheduled_times[-1].isoformat()} run")
+            return None
+        job.running += 1
+        return self._track(asyncio.create_task(self._run(job, scheduled_times), name=f"job:{job.name}"))
+
+    def run_pending_tasks(self):
+        """Start every run that is due now and reschedule its job.
+
+        Returns:
+            The asyncio tasks started (runs skipped for concurrency are not included).
+        """
+        now = self.clock()
+        due = {}
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            scheduled, _, _, name, live = heapq.heappop(self._heap)
+            job = self.jobs[name]
+            due.setdefault(name, []).append(scheduled)
+            if live:
+                if getattr(job.trigger, 'blocking', False):
+                    self._track(asyncio.create_task(self._reschedule(job, scheduled, now),
+                                                    name=f"reschedule:{job.name}"))
+                else:
+                    job.next_run = self._next_run(job, scheduled, now)
+                    self._push(job, job.next_run)
+        # dicts keep insertion order, so jobs start in (time, priority) order
+        started = [task for task in (self._start(self.jobs[name], times) for name, times in due.items()) if task]
+        if due:
+            self.save_state()
+        return started
+
+    async def run_forever(self):
+        """Run jobs as they fall due until stop() is called."""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        logging.info(f"Content scheduler started with {len(self.jobs)} job(s)")
+        while not self._stopping:
+            self.run_pending_tasks()
+            self._wakeup.clear()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, (due - self.clock()).total_seconds())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        await self.drain()
+
+    def stop(self):
+        self._stopping = True
+        self._wake()
+
+    async def drain(self):
+        """Wait for the runs already started."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
-# For AI Brain (Mistral API)
-from ai_brain.mistral_api_interface import MistralAPIInterface # Assuming you create this module
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
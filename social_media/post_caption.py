@@ -0,0 +1,89 @@
+"""Write one caption in Lumina's voice and post it.
+
+    python -m social_media.post_caption "Mercury stations direct in Aries tomorrow" --platform x
+    python -m social_media.post_caption "Full Moon in Libra" --dry-run
+    python -m social_media.post_caption --text "Already written caption #astrology" --platform x
+
+Posting calls post(text) in social_media/<platform>_poster.py. None of the posters has one
+yet, so for now only --dry-run succeeds; without it the job logs an error and exits with 1.
+
+This is the short-lived job benchmarks/bench_startup.py holds to a cold-start budget, so only
+the standard library is imported up front; config, the LLM client and the platform poster
+are imported when the job reaches them.
+"""
+import argparse
+import importlib
+import logging
+
+# Constants
+PLATFORMS = ('x', 'instagram', 'meta', 'tik_tok')
+CAPTION_MAX_TOKENS = 120   # As GENERATION_TIERS['caption'] in ai_brain.tiered_generation
+CAPTION_TEMPERATURE = 0.8
+CAPTION_INSTRUCTIONS = ("Write one social media caption about the topic below: under 280 characters, "
+                        "at most two hashtags. Reply with the caption only.")
+
+def read_persona():
+    """Lumina's persona from the shared settings (config/lumina_person.txt, or a default)."""
+    from config.settings import get_settings
+    return get_settings().persona
+
+async def write_caption(topic, client=None):
+    """Caption text for topic from the LLM backends, or None if every backend failed."""
+    from ai_brain.async_llm_client import AsyncLLMClient
+    from ai_brain.prompts import build_chat_messages
+
+    messages = build_chat_messages(read_persona(), CAPTION_INSTRUCTIONS, topic)
+    owned = client is None
+    client = client or AsyncLLMClient.from_env()
+    try:
+        text = await client.get_completion(messages, temperature=CAPTION_TEMPERATURE, max_tokens=CAPTION_MAX_TOKENS)
+    finally:
+        if owned:
+            await client.aclose()
+    return text.strip().strip('"') if text else None
+
+def post_caption(text, platform):
+    """Hand the caption to social_media.<platform>_poster.post().
+
+    Returns:
+        True once posted, False if that platform has no post() yet (the error is logged).
+    """
+    module = importlib.import_module(f"social_media.{platform}_poster")
+    post = getattr(module, 'post', None)
+    if post is None:
+        logging.error(f"Posting to {platform} is not implemented yet (social_media/{platform}_poster.py has no "
+                      f"post()); use --dry-run to only print the caption")
+        return False
+    post(text)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('topic', nargs='?', help="What the caption is about")
+    parser.add_argument('--text', help="Post this caption as is instead of writing one")
+    parser.add_argument('--platform', choices=PLATFORMS, default='x')
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Print the caption without posting it (no platform can post yet)")
+    args = parser.parse_args(argv)
+    if not args.topic and not args.text:
+        parser.error("give a topic or --text")
+
+    from config.settings import get_settings
+    get_settings()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.text:
+        caption = args.text
+    else:
+        import asyncio
+        caption = asyncio.run(write_caption(args.topic))
+    if not caption:
+        logging.error("No caption was generated")
+        return 1
+    print(caption)
+    if not args.dry_run and not post_caption(caption, args.platform):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+"""Stream a browser page into ffmpeg straight from Chromium, without Xvfb or x11grab.
+
+    python -m streaming.screencast_capture web_frontend/lumina_stage.html out.flv --seconds 10
+    python -m streaming.screencast_capture scene.html rtmp://localhost/live/test --audio voice.wav
+    python -m streaming.screencast_capture animation/renders/Aries_scene.html out.mp4 --backend frames
+
+Two capture backends, both headless:
+  screencast  CDP Page.startScreencast: Chromium pushes a JPEG whenever the page repaints,
+              and the latest one is sent at every frame slot. Suits live, self-animating pages.
+  frames      A 'frames' mode scene from animation.build_scene is seeked to each slot's
+              time and captured, so the video is frame exact.
+JPEG frames go to ffmpeg's stdin (image2pipe) at a constant frame rate. Frame n is
+sent when the audio clock reaches n / fps. If capture falls behind, the previous frame
+is repeated instead of letting the video drift, so audio and video stay aligned.
+stats() reports CPU time per streamed frame for this process and for ffmpeg.
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import time
+
+# Constants
+CAPTURE_FPS = 30
+CAPTURE_SIZE = (1280, 720)       # As stream_manager.VIDEO_RESOLUTION
+JPEG_QUALITY = 80
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+LIVE_PREFIXES = ('rtmp://', 'rtmps://', 'srt://', 'udp://')
+# Same encoding as the x11grab pipeline in stream_manager
+ENCODE_ARGS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-b:v', '2500k',
+               '-maxrate', '3000k', '-bufsize', '5000k']
+AUDIO_ENCODE_ARGS = ['-c:a', 'aac', '-ar', '44100', '-b:a', '128k']
+
+def children_cpu_s():
+    """CPU seconds used by this process's finished child processes, or None where the
+    resource module is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def ffmpeg_command(target, fps=CAPTURE_FPS, audio_path=None, audio_args=None):
+    """ffmpeg reading JPEG frames from stdin and writing target (file path or stream URL).
+
+    Args:
+        audio_path: Soundtrack file. For a live target it is read at its native rate (-re),
+                    so it plays in step with the frames.
+        audio_args: ffmpeg input arguments for a live audio source instead,
+                    e.g. ['-f', 'pulse', '-i', 'default'].
+    """
+    live = target.startswith(LIVE_PREFIXES)
+    command = [FFMPEG, '-y', '-loglevel', 'error', '-f', 'image2pipe', '-framerate', str(fps), '-c:v', 'mjpeg',
+               '-i', '-']
+    if audio_path:
+        command += (['-re'] if live else []) + ['-i', audio_path]
+    elif audio_args:
+        command += list(audio_args)
+    command += ENCODE_ARGS + ['-g', str(fps * 2), '-r', str(fps)]
+    if audio_path or audio_args:
+        command += AUDIO_ENCODE_ARGS
+    if audio_path and not live:
+        command += ['-shortest']
+    if live or target.endswith('.flv'):
+        command += ['-f', 'flv']
+    return command + [target]
+
+class AudioClock:
+    """Seconds of audio played since start(); the streamer times every frame against it."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._start = None
+
+    def start(self):
+        self._start = self.clock()
+
+    def position(self):
+        return self.clock() - self._start
+
+class ScreencastSource:
+    """Frames pushed by Chromium through CDP Page.startScreencast; frame() returns the newest."""
+
+    def __init__(self, page, size=CAPTURE_SIZE, quality=JPEG_QUALITY):
+        self.page = page
+        self.size = size
+        self.quality = quality
+        self.received = 0
+        self.latest = None
+        self._first = asyncio.Event()
+        self._acks = set()
+        self._cdp = None
+
+    def _on_frame(self, params):
+        self.latest = base64.b64decode(params['data'])
+        self.received += 1
+        self._first.set()
+        # Chromium sends the next frame only once this one is acknowledged
+        ack = asyncio.ensure_future(self._cdp.send('Page.screencastFrameAck', {'sessionId': params['sessionId']}))
+        self._acks.add(ack)
+        ack.add_done_callback(self._acks.discard)
+
+    async def start(self):
+        self._cdp = await self.page.context.new_cdp_session(self.page)
+        self._cdp.on('Page.screencastFrame', self._on_frame)
+        await self._cdp.send('Page.startScreencast', {'format': 'jpeg', 'quality': self.quality,
+                                                      'maxWidth': self.size[0], 'maxHeight': self.size[1]})
+
+    async def frame(self, t):
+        await self._first.wait()
+        return self.latest
+
+    async def stop(self):
+        if self._cdp is not None:
+            await self._cdp.send('Page.stopScreencast')
+            await self._cdp.detach()
+
+class SteppedSource:
+    """Frame-exact capture of a 'frames' mode scene: seek its timeline to t, then screenshot."""
+
+    def __init__(self, page, size=CAPTURE_SIZE, quality=JPEG_QUALITY):
+        self.page = page
+        self.params = {'format': 'jpeg', 'quality': quality,
+                       'clip': {'x': 0, 'y': 0, 'width': size[0], 'height': size[1], 'scale': 1}}
+        self.received = 0
+        self._cdp = None
+
+    async def start(self):
+        await self.page.wait_for_function("typeof window.seekFrame === 'function'")
+        self._cdp = await self.page.context.new_cdp_session(self.page)
+
+    async def frame(self, t):
+        await self.page.evaluate("t => window.seekFrame(t)", t)
+        shot = await self._cdp.send('Page.captureScreenshot', self.params)
+        self.received += 1
+        return base64.b64decode(shot['data'])
+
+    async def stop(self):
+        if self._cdp is not None:
+            await self._cdp.detach()
+
+class ScreencastStreamer:
+    """Pipes a source's frames into ffmpeg at a constant rate, paced by an AudioClock."""
+
+    def __init__(self, source, target, fps=CAPTURE_FPS, audio_path=None, audio_args=None, clock=None,
+                 sleep=asyncio.sleep):
+        self.source = source
+        self.target = target
+        self.fps = fps
+        self.audio_path = audio_path
+        self.audio_args = audio_args
+        self.clock = clock or AudioClock()
+        self.sleep = sleep
+        self.frames = 0             # Frames sent to ffmpeg
+        self.repeated = 0           # Slots filled with the previous frame because capture was late
+        self.cpu_s = 0.0
+        self.ffmpeg_cpu_s = 0.0
+        self.elapsed_s = 0.0
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Finish after the current frame (safe to call from the event loop at any time)."""
+        self._stopping.set()
+
+    async def run(self, duration=None):
+        """Stream until stop() or until duration seconds of video have been sent.
+
+        Returns:
+            The number of frames sent.
+        """
+        children_before = children_cpu_s()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        ffmpeg = await asyncio.create_subprocess_exec(
+            *ffmpeg_command(self.target, self.fps, self.audio_path, self.audio_args),
+            stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        total = round(duration * self.fps) if duration is not None else None
+        last = None
+        try:
+            await self.source.start()
+            self.clock.start()
+            while not self._stopping.is_set() and (total is None or self.frames < total):
+                due = self.frames / self.fps
+                wait = due - self.clock.position()
+                if wait > 0:
+                    await self.sleep(wait)
+                if last is not None and self.clock.position() - due >= 1 / self.fps:
+                    # More than a frame behind the audio: repeat the last frame to catch up
+                    self.repeated += 1
+                    frame = last
+                else:
+                    frame = last = await self.source.frame(due)
+                ffmpeg.stdin.write(frame)
+                await ffmpeg.stdin.drain()
+                self.frames += 1
+        finally:
+            await self.source.stop()
+            ffmpeg.stdin.close()
+            _, stderr = await ffmpeg.communicate()
+            self.elapsed_s += time.perf_counter() - wall_before
+            self.cpu_s += time.process_time() - cpu_before
+            if children_before is not None:
+                self.ffmpeg_cpu_s += children_cpu_s() - children_before
+            else:
+                self.ffmpeg_cpu_s = None
+        if ffmpeg.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed streaming to {self.target}: {stderr.decode(errors='replace')[-2000:]}")
+        return self.frames
+
+    def stats(self):
+        """Frames sent, frames repeated to hold sync, and CPU milliseconds per streamed frame
+        (ffmpeg's is None where child CPU time cannot be measured)."""
+        frames = max(self.frames, 1)
+        ffmpeg_ms = 1000 * self.ffmpeg_cpu_s / frames if self.ffmpeg_cpu_s is not None else None
+        return {
+            'frames': self.frames,
+            'captured': self.source.received,
+            'repeated': self.repeated,
+            'elapsed_s': self.elapsed_s,
+            'capture_cpu_ms_per_frame': 1000 * self.cpu_s / frames,
+            'ffmpeg_cpu_ms_per_frame': ffmpeg_ms,
+        }
+
+async def stream_page(url, target, backend='screencast', duration=None, fps=CAPTURE_FPS, size=CAPTURE_SIZE,
+                      audio_path=None, audio_args=None):
+    """Open url in headless Chromium and stream it to target with the chosen capture backend.
+
+    Returns:
+        The finished ScreencastStreamer, for its stats().
+    """
+    from playwright.async_api import async_playwright
+
+    sources = {'screencast': ScreencastSource, 'frames': SteppedSource}
+    if backend not in sources:
+        raise ValueError(f"Unknown capture backend '{backend}', expected one of {', '.join(sources)}")
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        try:
+            page = await browser.new_page(viewport={'width': size[0], 'height': size[1]})
+            await page.goto(url, wait_until='load')
+            streamer = ScreencastStreamer(sources[backend](page, size), target, fps, audio_path, audio_args)
+            await streamer.run(duration)
+        finally:
+            await browser.close()
+    return streamer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('page', help="HTML file or URL to stream")
+    parser.add_argument('target', help="Output file (.mp4, .flv, ...) or rtmp:// URL")
+    parser.add_argument('--backend', choices=('screencast', 'frames'), default='screencast')
+    parser.add_argument('--seconds', type=float, help="Stop after this much video (default: until interrupted)")
+    parser.add_argument('--fps', type=int, default=CAPTURE_FPS)
+    parser.add_argument('--size', default=f"{CAPTURE_SIZE[0]}x{CAPTURE_SIZE[1]}")
+    parser.add_argument('--audio', help="Soundtrack file muxed in step with the frames")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    url = args.page if '://' in args.page else 'file://' + os.path.abspath(args.page)
+    size = tuple(int(v) for v in args.size.split('x'))
+    streamer = asyncio.run(stream_page(url, args.target, args.backend, args.seconds, args.fps, size, args.audio))
+    for name, value in streamer.stats().items():
+        print(f"{name:<26} {value:.2f}" if isinstance(value, float) else f"{name:<26} {value}")
+
+if __name__ == "__main__":
+    main()
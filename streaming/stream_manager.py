@@ -1,3 +1,4 @@
+import asyncio
 import subprocess
 import time
 import os
@@ -59,8 +60,24 @@ VIDEO_FRAMERATE = 30
 AUDIO_INPUT_FFMPEG = "pulse" # Example: "default" for PulseAudio default source
                               # Or path to a virtual audio loopback device
                               # Or "-i pipe:0" if piping audio bytes to FFmpeg's stdin
+# 'x11grab' records the Xvfb display. 'screencast' and 'frames' take frames from headless
+# Chromium over CDP and need no X server (see streaming/screencast_capture.py).
+CAPTURE_BACKEND = os.getenv("STREAM_CAPTURE", "screencast")
+
+def start_streaming_pipeline(youtube_rtmp_url, capture=CAPTURE_BACKEND):
+    if capture != 'x11grab':
+        from streaming.screencast_capture import stream_page
+        width, height = (int(v) for v in VIDEO_RESOLUTION.split('x'))
+        print(f"Streaming {BROWSER_URL} with {capture} capture (no Xvfb)...")
+        try:
+            streamer = asyncio.run(stream_page(BROWSER_URL, youtube_rtmp_url, backend=capture, fps=VIDEO_FRAMERATE,
+                                               size=(width, height),
+                                               audio_args=['-f', AUDIO_INPUT_FFMPEG, '-i', 'default']))
+            print(f"Streaming pipeline stopped: {streamer.stats()}")
+        except Exception as e:
+            print(f"An error occurred in the streaming pipeline: {e}")
+        return
 
-def start_streaming_pipeline(youtube_rtmp_url):
     xvfb_process = None
     playwright_context = None
     browser = None
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from data_ingestion.aspects import aspects_to_dicts, find_aspects
+from data_ingestion.solar_data import ASPECT_TYPES
+
+
+def legacy_aspects(longitudes):
+    """The nested pair x aspect loop that find_aspects replaces."""
+    hits = []
+    for i in range(len(longitudes)):
+        for j in range(i + 1, len(longitudes)):
+            angle = abs((longitudes[i] - longitudes[j]) % 360)
+            if angle > 180:
+                angle = 360 - angle
+            for k, (target, orb) in enumerate(ASPECT_TYPES.values()):
+                if abs(angle - target) <= orb:
+                    hits.append((i, j, k, round(angle, 6)))
+    return hits
+
+
+def as_tuples(aspects):
+    return [(int(a['body1']), int(a['body2']), int(a['aspect']), round(float(a['angle']), 6))
+            for a in aspects]
+
+
+@pytest.mark.parametrize('method', ['sweep', 'pairwise'])
+@pytest.mark.parametrize('count', [2, 17, 150])
+def test_matches_legacy_loop(method, count):
+    rng = np.random.default_rng(count)
+    longitudes = rng.uniform(0, 360, count)
+    assert as_tuples(find_aspects(longitudes, ASPECT_TYPES, method)) == legacy_aspects(longitudes)
+
+
+@pytest.mark.parametrize('method', ['sweep', 'pairwise'])
+def test_exact_and_duplicate_longitudes(method):
+    longitudes = [0.0, 180.0, 180.0, 90.0, 359.5, 30.0]
+    assert as_tuples(find_aspects(longitudes, ASPECT_TYPES, method)) == legacy_aspects(longitudes)
+
+
+def test_aspects_to_dicts():
+    aspects = find_aspects([10.0, 130.5], ASPECT_TYPES)
+    signs = {'Sun': 'Aries', 'Mars': 'Leo'}
+    assert aspects_to_dicts(aspects, ['Sun', 'Mars'], ASPECT_TYPES, signs) == [{
+        'body1': 'Sun', 'body2': 'Mars', 'aspect': 'trine', 'angle': 120.5,
+        'sign1': 'Aries', 'sign2': 'Leo'
+    }]
@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+import json
+
+import httpx
+
+from ai_brain.async_llm_client import AsyncLLMClient, Backend
+from ai_brain.response_cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def completion(model, content):
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 1, "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+    }
+
+
+def stream_body(model, words):
+    events = []
+    for word in words:
+        chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 1, "model": model,
+                 "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+        events.append(f"data: {json.dumps(chunk)}\n\n")
+    return "".join(events) + "data: [DONE]\n\n"
+
+
+class Server:
+    """Fake OpenAI-compatible server recording peak concurrency."""
+
+    def __init__(self, name, fail=False, delay=0.02):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def __call__(self, request):
+        if request.url.path.endswith("/models"):
+            return httpx.Response(503 if self.fail else 200, json={"data": []})
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                return httpx.Response(500, json={"error": {"message": "down"}})
+            body = json.loads(request.content)
+            if body.get("stream"):
+                return httpx.Response(200, text=stream_body(body["model"], ["Hi", " ", self.name]),
+                                      headers={"content-type": "text/event-stream"})
+            return httpx.Response(200, json=completion(body["model"], f"from {self.name}"))
+        finally:
+            self.active -= 1
+
+
+def backend(server, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return Backend(server.name, f"http://{server.name}/v1", "model", http_client=client, **kwargs)
+
+
+def test_spreads_load_within_concurrency_caps():
+    async def run():
+        a, b = Server("a"), Server("b")
+        llm = AsyncLLMClient([backend(a, max_concurrency=2), backend(b, max_concurrency=2)], health_check_interval=None)
+        answers = await asyncio.gather(*(llm.get_completion(MESSAGES) for _ in range(12)))
+        await llm.aclose()
+        return a, b, answers
+
+    a, b, answers = asyncio.run(run())
+    assert a.calls == b.calls == 6
+    assert a.peak <= 2 and b.peak <= 2
+    assert set(answers) == {"from a", "from b"}
+
+
+def test_weight_biases_routing():
+    async def run():
+        fast, slow = Server("fast"), Server("slow")
+        llm = AsyncLLMClient([backend(slow, max_concurrency=4, weight=1), backend(fast, max_concurrency=4, weight=3)],
+                             health_check_interval=None)
+        await asyncio.gather(*(llm.get_completion(MESSAGES) for _ in range(4)))
+        await llm.aclose()
+        return fast, slow
+
+    fast, slow = asyncio.run(run())
+    assert fast.calls == 3 and slow.calls == 1
+
+
+def test_fails_over_and_marks_unhealthy():
+    async def run():
+        down, fallback = Server("down", fail=True), Server("fallback")
+        llm = AsyncLLMClient([backend(down), backend(fallback, fallback=True)], health_check_interval=None)
+        answers = [await llm.get_completion(MESSAGES) for _ in range(5)]
+        health = await llm.check_health()
+        await llm.aclose()
+        return down, answers, health
+
+    down, answers, health = asyncio.run(run())
+    assert answers == ["from fallback"] * 5
+    assert down.calls == 3   # taken out of rotation after MAX_CONSECUTIVE_FAILURES
+    assert health == {"down": False, "fallback": True}
+
+
+def test_stream_and_cache_replay():
+    async def run():
+        server = Server("a")
+        llm = AsyncLLMClient([backend(server)], cache=ResponseCache(":memory:"), health_check_interval=None)
+        live = [chunk async for chunk in await llm.get_completion(MESSAGES, stream=True)]
+        replayed = [chunk async for chunk in await llm.get_completion(MESSAGES, stream=True)]
+        text = await llm.get_completion(MESSAGES)
+        in_flight = llm.backends[0].in_flight
+        await llm.aclose()
+        return server, live, replayed, text, in_flight
+
+    server, live, replayed, text, in_flight = asyncio.run(run())
+    assert server.calls == 1
+    assert replayed == live
+    assert text == "Hi a"
+    assert in_flight == 0
+
+
+def test_closing_a_stream_early_frees_its_slot():
+    async def run():
+        server = Server("a")
+        llm = AsyncLLMClient([backend(server, max_concurrency=1)], health_check_interval=None)
+        async with contextlib.aclosing(await llm.get_completion(MESSAGES, stream=True)) as stream:
+            async for chunk in stream:
+                break
+        in_flight = llm.backends[0].in_flight
+        # With a single slot this would wait forever if the abandoned stream still held it
+        text = await asyncio.wait_for(llm.get_completion(MESSAGES), timeout=5)
+        await llm.aclose()
+        return in_flight, text
+
+    in_flight, text = asyncio.run(run())
+    assert in_flight == 0
+    assert text == "from a"
@@ -0,0 +1,62 @@
+import os
+
+from PIL import Image
+
+from animation.build_assets import build_character_assets, pack_shelves
+
+
+def save(path, size, color):
+    Image.new('RGBA', size, color).save(path)
+    return str(path)
+
+
+def character(tmp_path):
+    blink = save(tmp_path / 'blinks.png', (200, 100), (0, 0, 255, 255))
+    return {
+        'background': save(tmp_path / 'back.png', (540, 960), (255, 0, 0, 255)),
+        'body': save(tmp_path / 'body.png', (1080, 1920), (0, 0, 0, 0)),
+        'eyes': {'open': blink, 'closed': blink},
+        'mouth': {'closed': save(tmp_path / 'mid.png', (100, 50), (0, 255, 0, 255)),
+                  'open': save(tmp_path / 'wide.png', (150, 100), (255, 255, 0, 255))},
+    }
+
+
+def test_static_layers_are_flattened_and_states_packed(tmp_path):
+    assets = character(tmp_path)
+    scene = build_character_assets('coffee', assets, output_dir=str(tmp_path / 'cache'))
+
+    static = Image.open(scene['static'])
+    assert static.size == (1080, 1920) and static.getpixel((1000, 1800)) == (255, 0, 0, 255)
+    assert scene['front'] is None and scene['groups'] == ['eyes', 'mouth']
+
+    sprites = scene['sprites']
+    assert (sprites['eyes-open']['x'], sprites['eyes-open']['y']) == (sprites['eyes-closed']['x'],
+                                                                      sprites['eyes-closed']['y'])
+    wide = sprites['mouth-open']
+    assert wide['h'] == 288 and wide['w'] == 432            # 15% of the scene height, aspect kept
+    assert wide['left'] == 540 - 216 and wide['top'] == round(0.38 * 1920 - 144)
+    atlas = Image.open(scene['atlas'])
+    assert atlas.getpixel((wide['x'] + 10, wide['y'] + 10)) == (255, 255, 0, 255)
+
+
+def test_outputs_are_cached_by_content(tmp_path):
+    assets = character(tmp_path)
+    cache = str(tmp_path / 'cache')
+    first = build_character_assets('coffee', assets, output_dir=cache)
+    mtime = os.stat(first['atlas']).st_mtime_ns
+    assert build_character_assets('coffee', assets, output_dir=cache) == first
+    assert os.stat(first['atlas']).st_mtime_ns == mtime
+
+    save(tmp_path / 'wide.png', (150, 100), (255, 0, 255, 255))
+    rebuilt = build_character_assets('coffee', assets, output_dir=cache)
+    assert rebuilt['atlas'] != first['atlas'] and rebuilt['static'] == first['static']
+
+
+def test_pack_shelves_never_overlaps():
+    sizes = [(300, 40), (900, 120), (1200, 80), (700, 120), (50, 10)]
+    positions, width, height = pack_shelves(sizes, max_width=1500, padding=2)
+    boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(positions, sizes)]
+    assert all(x1 <= width and y1 <= height for _, _, x1, y1 in boxes)
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
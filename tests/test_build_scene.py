@@ -0,0 +1,78 @@
+import asyncio
+import base64
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import animation.build_scene as build_scene
+from animation.build_scene import AnimationRenderer, ffmpeg_command, frame_times
+
+SCENE = {
+    'name': 'test_scene',
+    'character': 'coffee',
+    'audio_path': '/missing/audio.wav',
+    'duration': 0.2,
+    'timings': {'mouth_events': [{'type': 'open', 'start': 0.05, 'end': 0.1}], 'blink_events': [{'timestamp': 0.1}]},
+}
+
+
+def test_frame_times_and_ffmpeg_command():
+    assert frame_times(0.1, fps=30) == [0.0, 1 / 30, 2 / 30]
+    assert len(frame_times(60, fps=30)) == 1800
+    command = ffmpeg_command('out.mp4', fps=25, audio_path='voice.wav')
+    assert command[command.index('-framerate') + 1] == '25' and command[-1] == 'out.mp4'
+    assert ['-f', 'image2pipe'] == command[command.index('-f'):command.index('-f') + 2]
+    assert '-shortest' in command and '-shortest' not in ffmpeg_command('out.mp4')
+
+
+def test_frames_mode_template_pauses_the_timeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_scene, 'OUTPUT_DIR', str(tmp_path))
+    html = open(AnimationRenderer(SCENE).write_html()).read()
+    assert 'const renderMode = "frames"' in html and 'window.seekFrame' in html
+    assert 'gsap.to(' not in html      # Blinks are timeline calls, not free-running tweens
+    with pytest.raises(ValueError):
+        AnimationRenderer(SCENE, mode='screen')
+
+
+class FakeCDP:
+    def __init__(self, frame):
+        self.frame = frame
+
+    async def send(self, method, params):
+        assert method == 'Page.captureScreenshot' and params['format'] == 'jpeg'
+        return {'data': base64.b64encode(self.frame).decode()}
+
+    async def detach(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, frame):
+        self.seeks = []
+        self.context = self
+        self.cdp = FakeCDP(frame)
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+    async def evaluate(self, expression, t):
+        self.seeks.append(t)
+
+
+@pytest.mark.skipif(shutil.which(build_scene.FFMPEG) is None, reason="ffmpeg not installed")
+def test_render_frames_pipes_every_frame_into_ffmpeg(tmp_path):
+    frame = subprocess.run([build_scene.FFMPEG, '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=c=blue:s=64x64',
+                            '-frames:v', '1', '-f', 'mjpeg', '-'], capture_output=True, check=True).stdout
+    page = FakePage(frame)
+    renderer = AnimationRenderer(SCENE, fps=10)
+    output = str(tmp_path / 'clip.mp4')
+
+    frames = asyncio.run(renderer.render_frames(page, frame_times(0.5, fps=10), output))
+
+    assert frames == 5 and page.seeks == [0.0, 0.1, 0.2, 0.3, 0.4]
+    probe = subprocess.run([build_scene.FFMPEG, '-i', output, '-map', '0:v', '-f', 'null', '-'],
+                           capture_output=True, text=True)
+    assert re.findall(r'frame=\s*(\d+)', probe.stderr)[-1] == '5'
+    assert renderer.stats['frames'] == 5
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import database.connection as db
+from config.settings import reload_settings
+
+
+@pytest.fixture
+def unreachable_db(monkeypatch):
+    monkeypatch.setenv('DB_HOST', '127.0.0.1:1')
+    monkeypatch.setenv('DB_USER', 'lumina')
+    monkeypatch.setenv('DB_PASSWORD', 'secret')
+    monkeypatch.setenv('DB_POOL_MIN_SIZE', '0')
+    monkeypatch.setenv('DB_POOL_TIMEOUT_S', '0.2')
+    reload_settings()
+    yield
+    db.close_pools()
+    monkeypatch.undo()
+    reload_settings()
+
+
+def test_settings_layering(monkeypatch):
+    monkeypatch.setenv('DB_POOL_MAX_SIZE', '3')
+    reload_settings()
+    settings = db.pool_settings()
+    monkeypatch.undo()
+    reload_settings()
+    assert settings['pool_max_size'] == 3
+    assert settings['statement_timeout_ms'] == 30000
+    assert db._pool_kwargs(settings)['kwargs'] == {'options': '-c statement_timeout=30000'}
+
+
+def test_health_check_and_metrics_on_unreachable_server(unreachable_db):
+    assert 'host=127.0.0.1 port=1' in db.conninfo()
+    ok, latency = db.health_check()
+    assert not ok and latency < 5
+    pool = db.pool_metrics()['pools']['lumina']
+    assert pool['max_size'] == 8 and 'requests_waiting' in pool and 0 <= pool['utilization'] <= 1
+    assert pool['requests_num'] == 1
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, query, params, prepare=None):
+        self.calls.append((query, params, prepare))
+        return self
+
+    rowcount = 1
+
+    def fetchall(self):
+        return []
+
+
+def test_statements_are_prepared():
+    conn = RecordingConnection()
+    embedding = np.array([0.5, 0.25], dtype=np.float32)
+    assert db.insert_memory(conn, "text", embedding, "news")
+    db.similar_memories(conn, embedding, k=3)
+    assert [call[2] for call in conn.calls] == [True, True]
+    assert conn.calls[0][1] == ("text", [0.5, 0.25], "news", "text")
+    assert conn.calls[1][1] == ([0.5, 0.25], [0.5, 0.25], 3)
@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import threading
+
+import pytest
+
+from social_media.content_scheduler import AstroTrigger, ContentScheduler, CronSchedule
+
+UTC = datetime.timezone.utc
+
+
+def at(*args):
+    return datetime.datetime(*args, tzinfo=UTC)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Every:
+    def __init__(self, interval):
+        self.interval = interval
+
+    def next_after(self, after):
+        return after + self.interval
+
+
+def test_cron_next_after():
+    assert CronSchedule("0 9 * * *").next_after(at(2024, 3, 1, 9, 0)) == at(2024, 3, 2, 9, 0)
+    assert CronSchedule("*/15 * * * *").next_after(at(2024, 3, 1, 9, 7, 30)) == at(2024, 3, 1, 9, 15)
+    assert CronSchedule("30 18 * * mon-fri").next_after(at(2024, 3, 1, 19, 0)) == at(2024, 3, 4, 18, 30)
+    assert CronSchedule("0 0 29 feb *").next_after(at(2024, 3, 1)) == at(2028, 2, 29)
+    # Both day fields restricted: either matches (the 1st, or any Sunday)
+    assert CronSchedule("0 12 1 * 0").next_after(at(2024, 3, 1, 13, 0)) == at(2024, 3, 3, 12, 0)
+    with pytest.raises(ValueError):
+        CronSchedule("61 * * * *")
+
+
+def test_astro_trigger_picks_matching_event():
+    calls = []
+
+    def find(start_jd, end_jd, **kwargs):
+        calls.append(kwargs)
+        return [{'event': 'aspect', 'aspect': 'conjunction', 'time_utc': '2024-03-10T09:00:00Z'},
+                {'event': 'aspect', 'aspect': 'conjunction', 'time_utc': '2024-04-08T18:21:00Z'}]
+
+    trigger = AstroTrigger('new_moon', offset=datetime.timedelta(hours=-2), find=find)
+    assert trigger.next_after(at(2024, 3, 10, 8, 0)) == at(2024, 4, 8, 16, 21)
+    assert calls[0]['bodies'] == ['Sun', 'Moon'] and list(calls[0]['aspect_types']) == ['conjunction']
+
+
+def test_jobs_run_in_time_then_priority_order_without_drift():
+    clock = FakeClock(at(2024, 3, 1, 8, 59))
+    scheduler = ContentScheduler(state_path=None, clock=clock)
+    order = []
+
+    async def scenario():
+        await scheduler.add_job('low', lambda: order.append('low'), cron="0 9 * * *")
+        await scheduler.add_job('high', lambda: order.append('high'), cron="0 9 * * *", priority=5)
+        assert scheduler.next_due() == at(2024, 3, 1, 9, 0)
+        assert scheduler.run_pending_tasks() == []
+
+        # Woken late: the run still counts its lag, and the next one stays at 09:00
+        clock.now = at(2024, 3, 1, 9, 0, 30)
+        tasks = scheduler.run_pending_tasks()
+        await asyncio.gather(*tasks)
+        assert [t.get_name() for t in tasks] == ['job:high', 'job:low']
+        assert scheduler.jobs['low'].next_run == at(2024, 3, 2, 9, 0)
+        assert scheduler.stats()['low']['mean_lag_s'] == 30.0
+
+    asyncio.run(scenario())
+    assert sorted(order) == ['high', 'low']
+
+
+def test_concurrency_limit_skips_overlapping_runs():
+    clock = FakeClock(at(2024, 3, 1, 9, 0))
+    scheduler = ContentScheduler(state_path=None, clock=clock)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def slow():
+            await gate.wait()
+
+        await scheduler.add_job('slow', slow, cron="* * * * *")
+        clock.now = at(2024, 3, 1, 9, 1)
+        first = scheduler.run_pending_tasks()
+        await asyncio.sleep(0)
+        clock.now = at(2024, 3, 1, 9, 2)
+        assert scheduler.run_pending_tasks() == []
+        gate.set()
+        await asyncio.gather(*first)
+        return scheduler.stats()['slow']
+
+    stats = asyncio.run(scenario())
+    assert stats['runs'] == 1 and stats['skipped'] == 1 and stats['running'] == 0
+
+
+@pytest.mark.parametrize('policy, expected_runs', [('skip', 0), ('once', 1), ('all', 3)])
+def test_catch_up_after_restart(tmp_path, policy, expected_runs):
+    path = str(tmp_path / 'schedule.json')
+    clock = FakeClock(at(2024, 3, 1, 8, 0))
+    asyncio.run(ContentScheduler(state_path=path, clock=clock).add_job('daily', lambda: None, cron="0 9 * * *"))
+
+    # Down for three 09:00 runs
+    clock.now = at(2024, 3, 3, 12, 0)
+    runs = []
+    scheduler = ContentScheduler(state_path=path, clock=clock)
+
+    async def scenario():
+        await scheduler.add_job('daily', lambda: runs.append(1), cron="0 9 * * *", catch_up=policy)
+        await asyncio.gather(*scheduler.run_pending_tasks())
+
+    asyncio.run(scenario())
+    assert len(runs) == expected_runs
+    assert scheduler.jobs['daily'].next_run == at(2024, 3, 4, 9, 0)
+    assert ContentScheduler(state_path=path, clock=clock)._saved['daily']['next_run'] == '2024-03-04T09:00:00+00:00'
+
+
+def test_run_forever_wakes_for_newly_added_job():
+    scheduler = ContentScheduler(state_path=None)
+    ran = []
+
+    async def scenario():
+        loop = asyncio.create_task(scheduler.run_forever())
+        await asyncio.sleep(0.01)
+
+        async def job():
+            ran.append(scheduler.clock())
+            scheduler.stop()
+
+        # The loop is idle with nothing scheduled; adding a job due in 20 ms must wake it
+        await scheduler.add_job('soon', job, trigger=Every(datetime.timedelta(milliseconds=20)))
+        await asyncio.wait_for(loop, 2)
+
+    asyncio.run(scenario())
+    assert len(ran) == 1
+
+
+def test_blocking_triggers_are_scheduled_off_the_event_loop():
+    clock = FakeClock(at(2024, 3, 1, 9, 0))
+    scheduler = ContentScheduler(state_path=None, clock=clock)
+    threads = []
+
+    class Slow(Every):
+        blocking = True
+
+        def next_after(self, after):
+            threads.append(threading.get_ident())
+            return super().next_after(after)
+
+    async def scenario():
+        await scheduler.add_job('astro', lambda: None, trigger=Slow(datetime.timedelta(days=29)))
+        assert threads == [threads[0]] and threads[0] != threading.get_ident()    # First run found off the loop
+        clock.now = at(2024, 3, 30, 9, 0)
+        await asyncio.gather(*scheduler.run_pending_tasks())
+        await scheduler.drain()
+        assert threads[-1] != threading.get_ident()         # Worker thread, not the loop's
+        assert scheduler.next_due() == scheduler.jobs['astro'].next_run == at(2024, 4, 28, 9, 0)
+
+    asyncio.run(scenario())
+
+
+def test_astro_trigger_against_ephemeris():
+    # First new moon of April 2024 (the total solar eclipse, 18:21 UTC on 8 April)
+    when = AstroTrigger('new_moon').next_after(at(2024, 4, 1))
+    assert abs((when - at(2024, 4, 8, 18, 21)).total_seconds()) < 120
@@ -7,6 +7,7 @@ import psycopg # Or psycopg2 for database interaction
 import ollama # Import the ollama library
 import time # To potentially manage timing
 import requests
+from database.connection import connection, health_check, insert_memory, pool_metrics
 # --- Load environment variables ---
 load_dotenv()
 # GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # Keep if needed for Google API services
@@ -80,20 +81,11 @@ except Exception as e:
 
 # --- Database Connection Function ---
 def get_db_connection():
-    """Establishes and returns a database connection."""
-    # Use connection details from environment variables
-    if not DB_USER or not DB_PASSWORD or not DB_HOST:
-         print("Database credentials or host not fully configured in environment variables.")
-         # In a real application, you'd handle this more robustly
-         return None
-    try:
-        conn = psycopg.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST)
-        return conn
-    except Exception as e:
-        print(f"Error connecting to the database: {e}")
-        return None
+    """Borrows a connection from the shared pool (database.connection).
 
-    print("Database connection established successfully.")
+    Use as `with get_db_connection() as conn:`; the transaction is committed when the
+    block exits cleanly, rolled back on error, and the connection returned to the pool."""
+    return connection()
 
 # --- Embedding Function using Ollama ---
 def create_embedding(text):
@@ -129,37 +121,21 @@ def create_embedding(text):
 # --- Function to Add Content to the Vector Database ---
 def add_memory_to_db(content, source, metadata=None):
     """Adds text content and its embedding to the memories table."""
-    conn = get_db_connection()
-    if conn is None:
-        print("Skipping adding memory due to database connection error.")
+    embedding = create_embedding(content)
+    if embedding is None:
+        print("Skipping adding memory due to embedding generation error.")
         return False
 
     try:
-        embedding = create_embedding(content)
-        if embedding is None:
-            print("Skipping adding memory due to embedding generation error.")
-            conn.close()
-            return False
-
-        # Insert into the memories table
-        with conn.cursor() as cur:
-            # Ensure your 'memories' table has a 'content' (TEXT),
-            # 'embedding' (VECTOR(EMBEDDING_DIMENSION)), 'source' (VARCHAR),
-            # and 'timestamp' (TIMESTAMP WITH TIME ZONE) column.
-            cur.execute(
-                "INSERT INTO memories (content, embedding, source, timestamp) VALUES (%s, %s, %s, CURRENT_TIMESTAMP)",
-                (content, embedding, source)
-            )
-            conn.commit()
+        # Ensure your 'memories' table has a 'content' (TEXT),
+        # 'embedding' (VECTOR(EMBEDDING_DIMENSION)), 'source' (VARCHAR),
+        # and 'timestamp' (TIMESTAMP WITH TIME ZONE) column.
+        with get_db_connection() as conn:
+            insert_memory(conn, content, embedding, source)
         print(f"Successfully added memory from source '{source}' to DB.")
-        conn.close()
         return True
     except Exception as e:
         print(f"Error adding memory to database: {e}")
-        # It's good practice to rollback in case of error
-        if conn:
-            conn.rollback()
-            conn.close()
         return False
 
 
@@ -170,4 +146,5 @@ if __name__ == "__main__":
     test_content = "This is a test content for embedding."
     test_source = "Test Source"
     add_memory_to_db(test_content, test_source)
-    get_db_connection()
\ No newline at end of file
+    print(f"Pool health check (ok, latency s): {health_check()}")
+    print(f"Pool metrics: {pool_metrics()}")
@@ -0,0 +1,50 @@
+import numpy as np
+
+from database.embedding_cache import EmbeddingCache, normalize_text
+
+
+class CountingEmbedder:
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return np.array([[len(t)] * self.dimension for t in texts], dtype=np.float32)
+
+
+def test_normalization():
+    assert normalize_text("  Mercury\tstations\n direct ") == "Mercury stations direct"
+    assert normalize_text("Café") == normalize_text("Café")
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    embedder = CountingEmbedder(4)
+    cache = EmbeddingCache('all-minilm:l6-v2', 4, path=path, memory_entries=2)
+
+    texts = ["Full Moon in Libra", "Full Moon  in Libra", "Mars enters Aries", "Venus retrograde"]
+    vectors = cache.embed(texts, embedder)
+    assert embedder.texts == ["Full Moon in Libra", "Mars enters Aries", "Venus retrograde"]
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+    assert vectors.dtype == np.float32 and vectors.shape == (4, 4)
+
+    # Evicted from the 2-entry LRU, still on disk
+    assert cache.get("Full Moon in Libra") is not None
+    assert cache.stats()['hits_disk'] == 1
+
+    reopened = EmbeddingCache('all-minilm:l6-v2', 4, path=path)
+    np.testing.assert_array_equal(reopened.get("Venus retrograde"), vectors[3])
+    stats = reopened.stats()
+    assert stats['hits_disk'] == 1 and stats['hit_rate'] == 1.0
+
+
+def test_model_or_dimension_change_invalidates(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    EmbeddingCache('all-minilm:l6-v2', 4, path=path).put("Saturn return", np.ones(4))
+    assert EmbeddingCache('all-minilm:l6-v2', 4, path=path).get("Saturn return") is not None
+
+    assert EmbeddingCache('all-minilm:l6-v2', 8, path=path).get("Saturn return") is None
+    changed_model = EmbeddingCache('nomic-embed-text', 8, path=path)
+    changed_model.put("Saturn return", np.ones(8))
+    assert EmbeddingCache('all-minilm:l6-v2', 4, path=path).get("Saturn return") is None
@@ -0,0 +1,53 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from data_ingestion.ephemeris_cache import EphemerisCache, build_cache
+from data_ingestion import solar_data
+from data_ingestion.events import wrap180
+from data_ingestion.solar_data import LONGITUDE, SPEED, Sky, get_planet_positions_batch, save_planet_data
+
+BODIES = ['Sun', 'Moon', 'Mercury', 'North Node', 'South Node']
+
+
+@pytest.fixture(scope='module')
+def cache(tmp_path_factory):
+    return build_cache([2024], str(tmp_path_factory.mktemp('ephemeris')), bodies=BODIES)
+
+
+def test_interpolation_within_bound(cache):
+    jds = np.random.default_rng(1).uniform(2460310.5, 2460675.5, 200)
+    truth = get_planet_positions_batch(jds, bodies=BODIES).values
+    estimate = cache.positions_batch(jds)
+    assert np.abs(wrap180(estimate[..., 0] - truth[..., LONGITUDE])).max() * 3600 < 1.0
+    np.testing.assert_allclose(estimate[..., 1], truth[..., SPEED], atol=1e-3)
+    np.testing.assert_allclose(cache.positions(jds[7]), estimate[7])
+
+
+def test_samples_are_memmap_views(cache):
+    reopened = EphemerisCache(cache.cache_dir)
+    samples = reopened.samples(2460400.25)
+    assert isinstance(samples, np.memmap) and samples.shape == (2, len(BODIES), 2)
+    assert not reopened.covers(2461000.5)
+
+
+def test_build_rejects_error_above_bound(tmp_path):
+    with pytest.raises(ValueError, match='Moon'):
+        build_cache([2024], str(tmp_path), bodies=['Moon'], cadence_hours=96, max_error_arcsec=1.0)
+
+
+def test_cached_sky_round_trips_through_json(cache, tmp_path, monkeypatch):
+    # The asteroids need .se1 files, so compute only bodies the built-in ephemeris covers
+    monkeypatch.setattr(solar_data, 'BODIES', {name: solar_data.BODIES[name] for name in BODIES})
+    now = datetime(2024, 5, 17, 6, 30, 45)
+    sky = Sky.compute(now, cache=cache)
+    uncached = Sky.compute(now)
+    assert type(sky.positions['Moon']['longitude']) is float and type(sky.planet_retrograde['Moon']) is bool
+    assert abs(wrap180(sky.positions['Moon']['longitude'] - uncached.positions['Moon']['longitude'])) * 3600 < 1.0
+
+    save_planet_data(sky, str(tmp_path))
+    with open(tmp_path / 'planet_positions_2024-05-17_06-30-45.json') as f:
+        saved = json.load(f)
+    assert saved['positions']['North Node']['retrograde'] == sky.planet_retrograde['North Node']
@@ -0,0 +1,39 @@
+import datetime
+
+from data_ingestion.events import find_events
+from data_ingestion.solar_data import julian_day
+
+
+def minutes_between(event, expected):
+    actual = datetime.datetime.fromisoformat(event['time_utc'].rstrip('Z'))
+    return abs((actual - expected).total_seconds()) / 60
+
+
+def test_sun_enters_aries_at_march_equinox():
+    events = find_events(julian_day(datetime.datetime(2024, 3, 1)), julian_day(datetime.datetime(2024, 4, 1)),
+                         bodies=['Sun'], aspect_types=None)
+    assert [(e['event'], e['sign'], e['from_sign']) for e in events] == [('ingress', 'Aries', 'Pisces')]
+    assert minutes_between(events[0], datetime.datetime(2024, 3, 20, 3, 6)) < 2
+
+
+def test_mercury_retrograde_stations():
+    events = find_events(julian_day(datetime.datetime(2024, 3, 15)), julian_day(datetime.datetime(2024, 5, 15)),
+                         bodies=['Mercury'], ingresses=False, aspect_types=None)
+    assert [(e['event'], e['direction'], e['sign']) for e in events] == [
+        ('station', 'retrograde', 'Aries'), ('station', 'direct', 'Aries')]
+    assert minutes_between(events[0], datetime.datetime(2024, 4, 1, 22, 14)) < 2
+    assert minutes_between(events[1], datetime.datetime(2024, 4, 25, 12, 54)) < 2
+
+
+def test_exact_aspects_are_exact():
+    events = find_events(julian_day(datetime.datetime(2024, 1, 1)), julian_day(datetime.datetime(2024, 2, 1)),
+                         bodies=['Sun', 'Moon'], ingresses=False, stations=False)
+    aspects = {e['aspect'] for e in events}
+    assert {'conjunction', 'opposition', 'square', 'trine'} <= aspects
+    assert all(e['body1'] == 'Sun' and e['body2'] == 'Moon' for e in events)
+    assert [e['jd'] for e in events] == sorted(e['jd'] for e in events)
+
+
+def test_empty_range_has_no_events():
+    jd = julian_day(datetime.datetime(2024, 1, 1))
+    assert find_events(jd, jd) == [] and find_events(jd + 1, jd) == []
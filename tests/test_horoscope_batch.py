@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+import planets.horoscope_batch as horoscope_batch
+from planets.horoscope_batch import format_report, generate_batch
+
+
+class FakeAsyncClient:
+    """Streams canned responses per prompt; a response of None fails that attempt mid-stream."""
+
+    def __init__(self, responses, output_dir):
+        self.responses = responses
+        self.output_dir = output_dir
+        self.calls = []
+        self.seen_while_streaming = []
+
+    async def generate(self, model, prompt, options, stream, keep_alive):
+        self.calls.append(prompt)
+        text = self.responses[prompt].pop(0)
+        return self._stream(prompt, text)
+
+    async def _stream(self, prompt, text):
+        output_path = os.path.join(self.output_dir, f'{prompt}.txt')
+        yield {'response': 'Stars ', 'done': False}
+        await asyncio.sleep(0)
+        self.seen_while_streaming.append((os.path.exists(output_path + '.part'), os.path.exists(output_path)))
+        if text is None:
+            raise ConnectionError("connection reset")
+        yield {'response': text, 'done': False}
+        yield {'response': '', 'done': True, 'eval_count': 2, 'eval_duration': 1e9}
+
+
+def run(tmp_path, monkeypatch, responses, concurrency=3):
+    client = FakeAsyncClient(responses, str(tmp_path))
+    monkeypatch.setattr(horoscope_batch.ollama, 'AsyncClient', lambda host=None: client)
+    monkeypatch.setattr(horoscope_batch, 'HOROSCOPE_BACKOFF_S', 0.01)
+    jobs = [(sign, sign, str(tmp_path / f'{sign}.txt')) for sign in responses]
+    return asyncio.run(generate_batch(jobs, concurrency=concurrency)), client
+
+
+def test_tokens_stream_into_a_part_file_that_is_renamed_when_complete(tmp_path, monkeypatch):
+    results, client = run(tmp_path, monkeypatch, {'Aries': ['shine.'], 'Taurus': ['rest.']})
+    assert [r['status'] for r in results] == ['generated', 'generated']
+    assert client.seen_while_streaming == [(True, False), (True, False)]
+    assert (tmp_path / 'Aries.txt').read_text() == 'Stars shine.'
+    assert results[0]['tokens'] == 2 and results[0]['tokens_per_sec'] == 2.0
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_existing_horoscopes_are_skipped(tmp_path, monkeypatch):
+    (tmp_path / 'Aries.txt').write_text('Already written.')
+    results, client = run(tmp_path, monkeypatch, {'Aries': ['shine.'], 'Taurus': ['rest.']})
+    assert [r['status'] for r in results] == ['skipped', 'generated']
+    assert client.calls == ['Taurus'] and (tmp_path / 'Aries.txt').read_text() == 'Already written.'
+
+
+def test_retry_backs_off_without_holding_the_slot(tmp_path, monkeypatch):
+    results, client = run(tmp_path, monkeypatch, {'Aries': [None, 'shine.'], 'Taurus': ['rest.']}, concurrency=1)
+    assert [r['status'] for r in results] == ['generated', 'generated']
+    assert client.calls == ['Aries', 'Taurus', 'Aries']     # Taurus ran while Aries waited to retry
+    assert (tmp_path / 'Aries.txt').read_text() == 'Stars shine.'
+
+
+def test_failures_are_reported_and_leave_no_partial_file(tmp_path, monkeypatch):
+    results, client = run(tmp_path, monkeypatch, {'Aries': [None, None, None], 'Taurus': ['rest.']})
+    assert results[0] == {'sign': 'Aries', 'status': 'failed', 'error': 'connection reset'}
+    assert results[1]['status'] == 'generated' and client.calls.count('Aries') == horoscope_batch.HOROSCOPE_RETRIES + 1
+    assert not (tmp_path / 'Aries.txt').exists() and not list(tmp_path.glob('*.part'))
+    report = format_report(results).splitlines()
+    assert report[1].split() == ['Aries', 'failed'] and report[2].split()[:2] == ['Taurus', 'generated']
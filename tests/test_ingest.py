@@ -0,0 +1,122 @@
+import contextlib
+import struct
+import threading
+import time
+
+import numpy as np
+import psycopg
+from psycopg.adapt import AdaptersMap, Transformer
+from psycopg.pq import Format
+from psycopg.types import TypeInfo
+
+import database.ingest as ingest
+
+
+def test_vector_binary_format():
+    adapters = AdaptersMap(psycopg.adapters)
+    info = TypeInfo('vector', 90001, 90002)
+    info.register(adapters)
+    adapters.register_dumper(np.ndarray, type('VectorDumper', (ingest.VectorBinaryDumper,), {'oid': info.oid}))
+
+    tx = Transformer(adapters)
+    tx.set_dumper_types([info.oid], Format.BINARY)
+    (data,) = tx.dump_sequence([np.array([1.0, -2.5, 0.25], dtype=np.float32)], [Format.BINARY])
+    assert struct.unpack('>HH3f', bytes(data)) == (3, 0, 1.0, -2.5, 0.25)
+
+
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def set_types(self, types):
+        pass
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
+class StagingConnection:
+    """Runs the staging COPY and merge the way Postgres would, keyed on the content."""
+
+    def __init__(self):
+        self.staging = []
+        self.memories = {}
+        self.rowcount = 0
+
+    @contextlib.contextmanager
+    def cursor(self):
+        yield self
+
+    def copy(self, query):
+        assert query == ingest.COPY_MEMORIES
+        return FakeCopy(self.staging)
+
+    def execute(self, query, params=None, prepare=None):
+        if query == ingest.MERGE_STAGING:
+            new = {row[0]: row for row in self.staging if row[0] not in self.memories}
+            self.memories.update(new)
+            self.rowcount = len(new)
+        return self
+
+    def commit(self):
+        self.staging.clear()          # ON COMMIT DELETE ROWS
+
+
+class FakePool:
+    def __init__(self, conn=None):
+        self.conn = conn or StagingConnection()
+
+    @contextlib.contextmanager
+    def connection(self):
+        yield self.conn
+
+
+def test_pipeline_bounds_in_flight_batches(monkeypatch):
+    written = []
+    state = {'active': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def embed(texts):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.01)
+        with lock:
+            state['active'] -= 1
+        return np.full((len(texts), 4), len(texts), dtype=np.float32)
+
+    monkeypatch.setattr(ingest, 'register_vector', lambda conn: None)
+    monkeypatch.setattr(ingest, 'write_batch',
+                        lambda conn, batch, embeddings, ts: written.append((batch, embeddings)) or len(batch))
+
+    records = [f"memory {i}" for i in range(95)] + [("tagged", "news")]
+    stats = ingest.ingest_memories(records, source='posts', pool=FakePool(), batch_size=10, max_in_flight=3,
+                                   embed=embed)
+
+    assert stats['rows'] == 96 and stats['batches'] == 10
+    assert state['peak'] <= 3
+    contents = [content for batch, _ in written for content, _ in batch]
+    assert contents == [f"memory {i}" for i in range(95)] + ["tagged"]
+    assert written[0][0][0] == ("memory 0", 'posts') and written[-1][0][-1] == ("tagged", 'news')
+    assert all(e.dtype == np.float32 and len(e) == len(b) for b, e in written)
+    assert stats['rows_per_sec'] > 0
+
+
+def test_reingesting_a_batch_skips_stored_content(monkeypatch):
+    monkeypatch.setattr(ingest, 'register_vector', lambda conn: None)
+    conn = StagingConnection()
+    embed = lambda texts: np.zeros((len(texts), 4), dtype=np.float32)
+    records = ["first", "second", "first"]
+
+    first = ingest.ingest_memories(records, source='news', pool=FakePool(conn), batch_size=2, embed=embed)
+    again = ingest.ingest_memories(records + ["third"], source='news', pool=FakePool(conn), batch_size=2, embed=embed)
+
+    assert (first['rows'], first['duplicates']) == (2, 1)
+    assert (again['rows'], again['duplicates']) == (1, 3)
+    assert sorted(conn.memories) == ["first", "second", "third"]
@@ -0,0 +1,69 @@
+import time
+import wave
+
+import numpy as np
+
+from animation.lipsync import LipSync, extract_timings, pair_mouth_events, timings_from_samples
+
+SAMPLE_RATE = 16000     # Not a whole number of samples per 30 fps frame
+
+
+def speech(pattern, sample_rate=SAMPLE_RATE, amplitude=0.3):
+    """A 220 Hz tone switched by pattern: a list of (seconds, on) segments."""
+    chunks = []
+    for seconds, on in pattern:
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        chunks.append(amplitude * on * np.sin(2 * np.pi * 220 * t))
+    return np.concatenate(chunks).astype(np.float32)
+
+
+def test_mouth_follows_the_voice():
+    samples = speech([(0.5, 0), (0.5, 1), (0.5, 0), (0.3, 1), (0.2, 0)])
+    mouth = timings_from_samples(samples, SAMPLE_RATE)['mouth_events']
+    assert [(e['start'], e['end']) for e in mouth] == [(0.5, 1.0), (1.5, 1.8)]
+
+
+def test_hysteresis_ignores_dips_between_the_thresholds():
+    # A 10 dB dip stays above CLOSE_DB (26 dB below the peak), so the mouth stays open through it
+    samples = speech([(0.3, 0), (0.3, 1), (0.3, 10 ** (-10 / 20)), (0.3, 1), (0.3, 0)])
+    mouth = timings_from_samples(samples, SAMPLE_RATE)['mouth_events']
+    assert len(mouth) == 1 and mouth[0]['start'] == 0.3 and mouth[0]['end'] == 1.2
+
+
+def test_blinks_are_seeded():
+    samples = speech([(30, 0)])
+    first = timings_from_samples(samples, SAMPLE_RATE, seed=3)['blink_events']
+    assert first == timings_from_samples(samples, SAMPLE_RATE, seed=3)['blink_events']
+    assert first != timings_from_samples(samples, SAMPLE_RATE, seed=4)['blink_events']
+    gaps = np.diff([b['timestamp'] for b in first])
+    assert len(first) >= 5 and gaps.min() >= 2.0 - 1 / 30 and gaps.max() <= 6.0 + 1 / 30
+
+
+def test_streaming_matches_the_whole_clip(tmp_path):
+    samples = speech([(0.4, 0), (0.7, 1), (0.3, 0), (1.1, 1), (0.5, 0)] * 4)
+    sync = LipSync(SAMPLE_RATE, seed=9)
+    changes, blinks = [], []
+    for start in range(0, len(samples), 333):      # Chunks that never line up with frames
+        events = sync.feed(samples[start:start + 333])
+        changes += events['mouth_events']
+        blinks += events['blink_events']
+    changes += sync.finish()['mouth_events']
+    assert sync.frames == round(len(samples) * 30 / SAMPLE_RATE)
+    whole = timings_from_samples(samples, SAMPLE_RATE, seed=9)
+    assert pair_mouth_events(changes) == whole['mouth_events'] and blinks == whole['blink_events']
+
+    path = str(tmp_path / 'voice.wav')
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples * 32767).astype(np.int16).tobytes())
+    assert extract_timings(path, seed=9) == whole
+
+
+def test_a_minute_of_audio_takes_well_under_a_second():
+    samples = speech([(0.25, 1), (0.15, 0)] * 150, sample_rate=44100)
+    start = time.perf_counter()
+    timings = timings_from_samples(samples, 44100)
+    assert time.perf_counter() - start < 0.5
+    assert len(timings['mouth_events']) == 150
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from database.local_embedder import LocalEmbedder
+
+WORDS = ['[PAD]', '[UNK]', 'mercury', 'venus', 'mars', 'stations', 'direct', 'retrograde', 'in', 'capricorn']
+
+
+def make_tokenizer():
+    tokenizer = Tokenizer(WordLevel({w: i for i, w in enumerate(WORDS)}, unk_token='[UNK]'))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_padding(pad_id=0, pad_token='[PAD]')
+    return tokenizer
+
+
+class FakeSession:
+    """Token embeddings are a fixed random table lookup; padding rows get large garbage values."""
+
+    def __init__(self):
+        self.table = np.random.default_rng(0).standard_normal((len(WORDS), 8)).astype(np.float32)
+        self.table[0] = 100.0
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def get_inputs(self):
+        return [type('Input', (), {'name': name})() for name in ('input_ids', 'attention_mask', 'token_type_ids')]
+
+    def run(self, outputs, feeds):
+        assert set(feeds) == {'input_ids', 'attention_mask', 'token_type_ids'}
+        with self.lock:
+            self.batch_sizes.append(len(feeds['input_ids']))
+        return [self.table[feeds['input_ids']]]
+
+
+def expected(session, text):
+    ids = [WORDS.index(w) for w in text.lower().split()]
+    pooled = session.table[ids].mean(axis=0)
+    return pooled / np.linalg.norm(pooled)
+
+
+def test_mean_pooling_ignores_padding_and_keeps_order():
+    session = FakeSession()
+    embedder = LocalEmbedder(session=session, tokenizer=make_tokenizer(), max_batch_size=2)
+    texts = ["mercury stations direct in capricorn", "mars", "venus retrograde", "mars"]
+    vectors = embedder.embed(texts)
+    assert vectors.dtype == np.float32 and vectors.shape == (4, 8)
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, expected(session, text), rtol=1e-5)
+    assert session.batch_sizes == [2, 2]
+
+
+def test_concurrent_single_calls_are_batched():
+    session = FakeSession()
+    embedder = LocalEmbedder(session=session, tokenizer=make_tokenizer(), max_batch_size=16, max_wait_ms=50)
+    texts = ["mercury retrograde", "venus in capricorn", "mars stations direct"] * 10
+    with ThreadPoolExecutor(max_workers=30) as pool:
+        vectors = list(pool.map(embedder.embed_one, texts))
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, expected(session, text), rtol=1e-5)
+    assert len(session.batch_sizes) < len(texts) and max(session.batch_sizes) <= 16
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import ai_brain.response_cache as response_cache
+import pipeline.horoscope_pipeline as horoscope_pipeline
+from config.settings import reload_settings
+from orchestrator import LuminaOrchestrator
+
+
+class FakePipeline:
+    errors = []
+
+
+def orchestrator():
+    # Skips __init__, which needs API keys and LLM backends
+    lumina = LuminaOrchestrator.__new__(LuminaOrchestrator)
+    lumina.post_manager = None
+    return lumina
+
+
+def test_daily_cycle_runs_the_horoscope_pipeline(monkeypatch):
+    runs = []
+
+    async def run_daily(now=None, use_farm=True):
+        runs.append(now)
+        return FakePipeline(), ['Aries.mp4']
+
+    monkeypatch.setattr(horoscope_pipeline, 'run_daily', run_daily)
+    asyncio.run(orchestrator().run_social_media_cycle('daily'))
+    assert runs == [None]
+
+
+def test_cycles_without_a_post_manager_are_skipped(monkeypatch, caplog):
+    monkeypatch.setattr(horoscope_pipeline, 'run_daily', None)     # Must not be reached
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(orchestrator().run_social_media_cycle('new_moon'))
+    assert "not implemented" in caplog.text
+
+
+def test_response_cache_is_sized_from_the_settings(monkeypatch):
+    monkeypatch.setenv('MISTRAL_API_KEY', 'test-key')
+    monkeypatch.setenv('LLM_CACHE_MAX_ENTRIES', '42')
+    reload_settings()
+    monkeypatch.setattr(response_cache, 'ResponseCache', lambda **kwargs: kwargs)
+    cache = LuminaOrchestrator().mistral_api.cache
+    monkeypatch.undo()
+    reload_settings()
+    assert cache['max_entries'] == 42 and cache['ttl_seconds'] == 7 * 24 * 3600
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+from pipeline.framework import Pipeline, Stage, format_stats
+
+
+def square(x):
+    return x * x
+
+
+def test_items_stream_through_before_the_batch_finishes():
+    events = []
+
+    async def slow_source_stage(x):
+        await asyncio.sleep(0.02 * x)
+        events.append(('generated', x))
+        return x
+
+    async def finish(x):
+        events.append(('finished', x))
+        return x
+
+    pipeline = Pipeline([Stage('generate', slow_source_stage), Stage('finish', finish)])
+    results = asyncio.run(pipeline.run(range(1, 5)))
+
+    assert results == [1, 2, 3, 4]
+    # The first item leaves the pipeline before the last one is generated
+    assert events.index(('finished', 1)) < events.index(('generated', 4))
+    stats = pipeline.stats()
+    assert stats['items_in'] == 4 and stats['items_out'] == 4
+    assert stats['first_output_s'] < stats['elapsed_s']
+
+
+def test_bounded_queues_apply_backpressure():
+    gate = threading.Event()
+
+    def blocked(x):
+        gate.wait(5)
+        return x
+
+    async def scenario():
+        pipeline = Pipeline([Stage('fast', lambda x: x, executor='thread'),
+                             Stage('slow', blocked, executor='thread', queue_size=2)], queue_size=2)
+        run = asyncio.create_task(pipeline.run(range(20)))
+        await asyncio.sleep(0.2)
+        stats = pipeline.stats()
+        gate.set()
+        await run
+        return stats
+
+    stats = asyncio.run(scenario())
+    # Source and 'fast' stalled behind the full queue instead of reading all 20 items
+    assert stats['stages']['slow']['queue_depth'] == 2
+    assert stats['items_in'] < 20
+
+
+def test_worker_pools_fan_out_and_failures():
+    def explode_on_three(x):
+        if x == 3:
+            raise ValueError("three")
+        return x
+
+    pipeline = Pipeline([
+        Stage('split', lambda n: range(n), fan_out=True),
+        Stage('check', explode_on_three, workers=2, executor='thread'),
+        Stage('square', square, workers=2, executor='process'),
+    ])
+    results = asyncio.run(pipeline.run([5]))
+
+    assert sorted(results) == [0, 1, 4, 16]
+    assert [(stage, item) for stage, item, _ in pipeline.errors] == [('check', 3)]
+    stages = pipeline.stats()['stages']
+    assert stages['split']['emitted'] == 5
+    assert stages['check']['failed'] == 1 and stages['square']['processed'] == 4
+    assert 'square' in format_stats(pipeline.stats())
+
+
+def test_parallel_workers_overlap():
+    def sleepy(x):
+        time.sleep(0.1)
+        return x
+
+    pipeline = Pipeline([Stage('sleepy', sleepy, workers=4)])
+    start = time.perf_counter()
+    asyncio.run(pipeline.run(range(4)))
+    assert time.perf_counter() - start < 0.3
+
+
+def test_retries():
+    attempts = []
+
+    async def flaky(x):
+        attempts.append(x)
+        if len(attempts) < 3:
+            raise ConnectionError("busy")
+        return x
+
+    pipeline = Pipeline([Stage('flaky', flaky, retries=2, retry_delay_s=0.001)])
+    assert asyncio.run(pipeline.run(['Aries'])) == ['Aries']
+    assert attempts == ['Aries'] * 3 and not pipeline.errors
+
+
+def test_callable_objects_with_async_call_run_on_the_loop():
+    class Doubler:
+        async def __call__(self, x):
+            return 2 * x
+
+    stage = Stage('double', Doubler())
+    assert stage.executor is None
+    assert asyncio.run(Pipeline([stage]).run([1, 2])) == [2, 4]
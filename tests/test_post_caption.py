@@ -0,0 +1,19 @@
+import logging
+import types
+
+from social_media import post_caption
+
+
+def test_posting_without_a_poster_fails_with_a_logged_error(caplog, capsys):
+    with caplog.at_level(logging.ERROR):
+        assert post_caption.main(['--text', 'Full Moon in Libra #astrology', '--platform', 'x']) == 1
+    assert "Posting to x is not implemented yet" in caplog.text
+    assert capsys.readouterr().out == "Full Moon in Libra #astrology\n"
+
+
+def test_dry_run_and_implemented_posters_succeed(monkeypatch):
+    posted = []
+    assert post_caption.main(['--text', 'Full Moon in Libra', '--platform', 'x', '--dry-run']) == 0
+    monkeypatch.setattr(post_caption.importlib, 'import_module', lambda name: types.SimpleNamespace(post=posted.append))
+    assert post_caption.main(['--text', 'Full Moon in Libra', '--platform', 'x']) == 0
+    assert posted == ['Full Moon in Libra']
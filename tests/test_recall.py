@@ -0,0 +1,50 @@
+import datetime
+
+import numpy as np
+
+from database.recall import recall_query, recommended_lists, search
+
+
+def test_filters_are_pushed_into_sql():
+    since = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    query, params = recall_query()
+    assert 'WHERE' not in query.as_string() and params == []
+
+    query, params = recall_query(source='news', since=since)
+    text = query.as_string()
+    assert 'WHERE source = %s AND timestamp >= %s ORDER BY distance LIMIT %s' in text
+    assert params == ['news', since]
+
+    query, params = recall_query(source=['news', 'post'])
+    assert 'source = ANY(%s)' in query.as_string() and params == [['news', 'post']]
+
+
+def test_recommended_lists():
+    assert recommended_lists(500) == 1
+    assert recommended_lists(1_000_000) == 1000
+    assert recommended_lists(4_000_000) == 2000
+
+
+class RecordingConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def execute(self, query, params=None, prepare=None):
+        self.calls.append((query, params, prepare))
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_search_scopes_ef_search_to_the_transaction():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    conn = RecordingConnection([(7, 'Mercury stations direct', 'news', now, 0.125)])
+    results = search(conn, np.ones(3, dtype=np.float32), k=3, source='news', ef_search=80)
+
+    settings, query = conn.calls
+    assert "set_config('hnsw.ef_search', %s, true)" in settings[0] and settings[1] == ('80', '10')
+    assert query[1] == [[1.0, 1.0, 1.0], 'news', 3] and query[2] is True
+    assert results == [{'id': 7, 'content': 'Mercury stations direct', 'source': 'news', 'timestamp': now,
+                        'distance': 0.125}]
@@ -0,0 +1,144 @@
+import asyncio
+import base64
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import animation.build_scene as build_scene
+import animation.render_farm as render_farm
+from animation.render_farm import RenderFarm, concat_command, concat_list, split_frames
+
+
+def test_split_frames_covers_every_frame_once():
+    assert split_frames(7, 3) == [(0, 3), (3, 6), (6, 7)]
+    assert split_frames(2, 10) == [(0, 2)]
+    assert split_frames(5, 0) == [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5)]
+
+
+def test_concat_list_and_command():
+    assert concat_list(['/r/a.mp4', "/r/it's.mp4"]) == "file '/r/a.mp4'\nfile '/r/it'\\''s.mp4'\n"
+    command = concat_command('list.txt', 'out.mp4', audio_path='voice.wav')
+    assert command[command.index('-c:v') + 1] == 'copy'     # Segments are joined without re-encoding
+    assert ['-map', '0:v', '-map', '1:a'] == command[command.index('-map'):command.index('-map') + 4]
+    assert '-map' not in concat_command('list.txt', 'out.mp4')
+
+
+class FakeCDP:
+    def __init__(self, frame):
+        self.frame = frame
+
+    async def send(self, method, params):
+        return {'data': base64.b64encode(self.frame).decode()}
+
+    async def detach(self):
+        pass
+
+
+class FakePage:
+    """Stands in for a warm browser page; records the timeline positions it was seeked to."""
+
+    def __init__(self, frame, seeks):
+        self.context = self
+        self.cdp = FakeCDP(frame)
+        self.seeks = seeks
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+    async def goto(self, url):
+        pass
+
+    async def wait_for_function(self, expression):
+        pass
+
+    async def evaluate(self, expression, t):
+        self.seeks.append(t)
+        await asyncio.sleep(0)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.skipif(shutil.which(build_scene.FFMPEG) is None, reason="ffmpeg not installed")
+def test_farm_renders_segments_concurrently_and_joins_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_scene, 'OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(render_farm, 'OUTPUT_DIR', str(tmp_path))
+    frame = subprocess.run([build_scene.FFMPEG, '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=c=blue:s=64x64',
+                            '-frames:v', '1', '-f', 'mjpeg', '-'], capture_output=True, check=True).stdout
+    seeks = []
+    opened = []
+
+    async def new_page():
+        opened.append(1)
+        return FakePage(frame, seeks)
+
+    scenes = [{'name': f'sign{i}', 'character': 'coffee', 'audio_path': None, 'duration': 1.0,
+               'timings': {'mouth_events': [], 'blink_events': []}} for i in range(2)]
+
+    async def main():
+        async with RenderFarm(workers=2, segment_s=0.4, fps=10, new_page=new_page) as farm:
+            return await farm.render_many(scenes), farm.stats()
+
+    paths, stats = asyncio.run(main())
+
+    assert len(opened) == 2                              # Pages are opened once and reused
+    assert stats['scenes'] == 2 and stats['segments'] == 6 and stats['frames'] == 20
+    assert sorted(seeks) == sorted([i / 10 for i in range(10)] * 2)
+    for path in paths:
+        probe = subprocess.run([build_scene.FFMPEG, '-i', path, '-f', 'null', '-'], capture_output=True, text=True)
+        assert re.findall(r'frame=\s*(\d+)', probe.stderr)[-1] == '10'
+    assert not list(tmp_path.glob('*_segments'))
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class WedgingRenderer:
+    """Fails every segment rendered on a page in `wedged`."""
+
+    def __init__(self, wedged):
+        self.wedged = wedged
+
+    async def open_scene(self, page, html_path):
+        if page in self.wedged:
+            raise TimeoutError("page wedged")
+
+    async def render_frames(self, page, times, output_path):
+        return len(times)
+
+
+def test_failed_segment_closes_its_browser_and_replaces_the_page():
+    pages = []
+    failures = [RuntimeError("launch failed")]
+
+    async def new_page():
+        if len(pages) == 1 and failures:
+            raise failures.pop()
+        page = FakePage(b'', [])
+        page.browser = FakeBrowser()
+        pages.append(page)
+        return page
+
+    async def main():
+        farm = RenderFarm(workers=1, new_page=new_page)
+        await farm.start()
+        wedged = pages[0]
+        farm._browsers.append(wedged.browser)
+        renderer = WedgingRenderer({wedged})
+        with pytest.raises(TimeoutError):
+            await farm._render_segment(renderer, 'scene.html', [0.0], 'out.mp4')
+        assert wedged.browser.closed and wedged.browser not in farm._browsers
+        # Opening the replacement failed, so the slot is empty and the next segment opens one
+        assert farm._idle.qsize() == 1 and farm._idle.get_nowait() is None
+        farm._idle.put_nowait(None)
+        assert await farm._render_segment(renderer, 'scene.html', [0.0, 0.1], 'out.mp4') == 2
+        assert farm._idle.get_nowait() is pages[1]
+
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+from openai.types.chat import ChatCompletionChunk
+
+from ai_brain.mistral_api_interface import MistralAPIInterface
+from ai_brain.response_cache import ResponseCache, cache_key
+
+MESSAGES = [{"role": "system", "content": "You are Lumina."}, {"role": "user", "content": "Hello"}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_chunk(content):
+    return ChatCompletionChunk.model_validate({
+        "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 1, "model": "test",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+    })
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return iter([make_chunk(word) for word in ["Hi", " there", "!"]])
+        message = type("Message", (), {"content": "Hi there!"})()
+        return type("Response", (), {"choices": [type("Choice", (), {"message": message})()]})()
+
+
+def make_interface(cache):
+    llm = MistralAPIInterface("test", cache=cache)
+    completions = FakeCompletions()
+    llm.client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})()})()
+    return llm, completions
+
+
+def test_key_is_canonical_and_covers_params():
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+    assert cache_key("m", MESSAGES, 0.7, 250, 1) == cache_key("m", reordered, 0.7, 250, 1)
+    assert cache_key("m", MESSAGES, 0.7, 250, 1) != cache_key("m", MESSAGES, 0.7, 250, 2)
+    assert cache_key("m", MESSAGES, 0.7, 250) != cache_key("m", MESSAGES, 0.2, 250)
+
+
+def test_ttl_and_lru_eviction():
+    clock = Clock()
+    cache = ResponseCache(":memory:", ttl_seconds=60, max_entries=2, clock=clock)
+    cache.put("a", "A")
+    clock.now += 1
+    cache.put("b", "B")
+    clock.now += 1
+    assert cache.get_text("a") == "A"   # a is now more recent than b
+    clock.now += 1
+    cache.put("c", "C")
+    assert cache.get_text("b") is None
+    assert cache.get_text("a") == "A" and cache.get_text("c") == "C"
+
+    clock.now += 61
+    assert cache.get_text("a") is None
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 2
+
+
+def test_completion_served_from_cache():
+    llm, completions = make_interface(ResponseCache(":memory:"))
+    assert llm.get_completion(MESSAGES, seed=7) == "Hi there!"
+    assert llm.get_completion(MESSAGES, seed=7) == "Hi there!"
+    assert completions.calls == 1
+    llm.get_completion(MESSAGES, seed=8)
+    assert completions.calls == 2
+    assert llm.cache.stats()["hits"] == 1
+
+
+def test_stream_replay_matches_live_stream():
+    llm, completions = make_interface(ResponseCache(":memory:"))
+    live = list(llm.get_completion(MESSAGES, stream=True))
+    replayed = list(llm.get_completion(MESSAGES, stream=True))
+    assert completions.calls == 1
+    assert replayed == live
+    assert all(isinstance(chunk, ChatCompletionChunk) for chunk in replayed)
+    # The recorded stream also answers the non-streaming request
+    assert llm.get_completion(MESSAGES) == "Hi there!"
+    assert completions.calls == 1
@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import re
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import streaming.screencast_capture as screencast_capture
+from streaming.screencast_capture import (AudioClock, ScreencastSource, ScreencastStreamer, SteppedSource,
+                                          children_cpu_s, ffmpeg_command)
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which(screencast_capture.FFMPEG) is None, reason="ffmpeg not installed")
+
+
+class FakeClock:
+    """Audio clock that only moves when the streamer sleeps or a capture takes time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeCDP:
+    def __init__(self, frame):
+        self.frame = frame
+        self.handlers = {}
+        self.sent = []
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def send(self, method, params=None):
+        self.sent.append(method)
+        if method == 'Page.startScreencast':
+            self.handlers['Page.screencastFrame']({'data': base64.b64encode(self.frame).decode(), 'sessionId': 1})
+        return {'data': base64.b64encode(self.frame).decode()}
+
+    async def detach(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, frame, clock=None, capture_s=0.0):
+        self.context = self
+        self.cdp = FakeCDP(frame)
+        self.clock = clock
+        self.capture_s = capture_s
+        self.seeks = []
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+    async def wait_for_function(self, expression):
+        pass
+
+    async def evaluate(self, expression, t):
+        self.seeks.append(t)
+        self.clock.now += self.capture_s
+
+
+def jpeg():
+    return subprocess.run([screencast_capture.FFMPEG, '-loglevel', 'error', '-f', 'lavfi', '-i', 'color=c=blue:s=64x64',
+                           '-frames:v', '1', '-f', 'mjpeg', '-'], capture_output=True, check=True).stdout
+
+
+def frame_count(path):
+    probe = subprocess.run([screencast_capture.FFMPEG, '-i', path, '-f', 'null', '-'], capture_output=True, text=True)
+    return int(re.findall(r'frame=\s*(\d+)', probe.stderr)[-1])
+
+
+def test_ffmpeg_command_for_files_and_live_targets():
+    live = ffmpeg_command('rtmp://localhost/live/test', fps=25, audio_path='voice.wav')
+    assert live[live.index('-f') + 1] == 'image2pipe' and live[live.index('-framerate') + 1] == '25'
+    assert live[live.index('-re') + 1:live.index('-re') + 3] == ['-i', 'voice.wav']
+    assert live[-3:] == ['-f', 'flv', 'rtmp://localhost/live/test']
+
+    local = ffmpeg_command('out.mp4', audio_path='voice.wav')
+    assert '-re' not in local and '-shortest' in local and 'flv' not in local
+    pulse = ffmpeg_command('out.flv', audio_args=['-f', 'pulse', '-i', 'default'])
+    assert 'pulse' in pulse and '-c:a' in pulse and pulse[-3:] == ['-f', 'flv', 'out.flv']
+    assert '-c:a' not in ffmpeg_command('out.mp4')
+
+
+@needs_ffmpeg
+def test_screencast_frames_are_acked_and_sent_at_a_constant_rate(tmp_path):
+    clock = FakeClock()
+    page = FakePage(jpeg())
+    target = str(tmp_path / 'out.flv')
+    streamer = ScreencastStreamer(ScreencastSource(page, size=(64, 64)), target, fps=10,
+                                  clock=AudioClock(clock), sleep=clock.sleep)
+
+    assert asyncio.run(streamer.run(duration=1.5)) == 15
+    assert 'Page.screencastFrameAck' in page.cdp.sent and page.cdp.sent[-1] == 'Page.stopScreencast'
+    assert clock.now == pytest.approx(1.4)          # The last frame went out when the clock reached it
+    assert frame_count(target) == 15
+
+
+@needs_ffmpeg
+def test_late_captures_repeat_frames_to_stay_on_the_audio_clock(tmp_path):
+    clock = FakeClock()
+    page = FakePage(jpeg(), clock, capture_s=0.25)  # Each capture takes 2.5 frame slots at 10 fps
+    target = str(tmp_path / 'out.mp4')
+    streamer = ScreencastStreamer(SteppedSource(page, size=(64, 64)), target, fps=10,
+                                  clock=AudioClock(clock), sleep=clock.sleep)
+
+    asyncio.run(streamer.run(duration=2.0))
+    stats = streamer.stats()
+    assert stats['frames'] == 20 and stats['captured'] + stats['repeated'] == 20
+    assert stats['repeated'] >= 10
+    assert page.seeks[0] == 0 and all(b > a for a, b in zip(page.seeks, page.seeks[1:]))
+    assert clock.now <= 2.0 + 0.25                  # Video never fell more than one capture behind
+    assert frame_count(target) == 20
+
+
+def test_child_cpu_time_degrades_without_the_resource_module(monkeypatch):
+    assert children_cpu_s() >= 0
+    monkeypatch.setitem(sys.modules, 'resource', None)      # As on Windows: importing it fails
+    assert children_cpu_s() is None
@@ -0,0 +1,120 @@
+import os
+import time
+
+import pydantic
+import pytest
+
+import config.settings as config_settings
+from config.settings import SettingsWatcher, load_settings, on_reload, reload_settings
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    """Throwaway .env, settings.yml and persona; the environment and shared settings are restored afterwards."""
+    env_file, settings_file, persona_file = tmp_path / '.env', tmp_path / 'settings.yml', tmp_path / 'persona.txt'
+    env_file.write_text("LLM_CACHE_MAX_ENTRIES=42\nTEST_SETTINGS_TOKEN=from-dotenv\n")
+    settings_file.write_text("database:\n  pool_max_size: 5\nllm:\n  cache_max_entries: 7\n  backend_concurrency: 4\n")
+    persona_file.write_text("You are Lumina, tested.")
+    monkeypatch.setattr(config_settings, '_settings', None)
+    monkeypatch.setattr(config_settings, '_callbacks', [])
+    monkeypatch.setattr(config_settings, '_injected', {})
+    monkeypatch.delenv('LLM_CACHE_MAX_ENTRIES', raising=False)
+    environ = dict(os.environ)
+    yield {'env_file': str(env_file), 'settings_file': str(settings_file), 'persona_file': str(persona_file)}
+    os.environ.clear()
+    os.environ.update(environ)
+
+
+def test_layering_and_persona(files, monkeypatch):
+    settings = load_settings(**files)
+    assert settings.database.pool_max_size == 5 and settings.database.pool_min_size == 1
+    assert settings.llm.backend_concurrency == 4
+    assert settings.llm.cache_max_entries == 42          # .env beats settings.yml
+    assert settings.get('TEST_SETTINGS_TOKEN') == 'from-dotenv' == os.environ['TEST_SETTINGS_TOKEN']
+    assert settings.persona == "You are Lumina, tested."
+
+    monkeypatch.setenv('TEST_SETTINGS_TOKEN', 'from-environment')
+    monkeypatch.setenv('LLM_CACHE_MAX_ENTRIES', '9')
+    settings = load_settings(**files)
+    assert settings.get('TEST_SETTINGS_TOKEN') == 'from-environment'   # The real environment beats .env
+    assert settings.llm.cache_max_entries == 9
+
+
+def test_settings_are_frozen_and_validated(files, tmp_path):
+    settings = load_settings(**files)
+    with pytest.raises(pydantic.ValidationError):
+        settings.llm.backend_concurrency = 8
+    bad = tmp_path / 'bad.yml'
+    bad.write_text("llm:\n  backend_concurrency: 0\n")
+    with pytest.raises(pydantic.ValidationError):
+        load_settings(files['env_file'], str(bad), files['persona_file'])
+
+
+def test_reload_calls_back_and_keeps_old_settings_on_error(files, tmp_path):
+    seen = []
+    on_reload(lambda new, old: seen.append((old.llm.backend_concurrency, new.llm.backend_concurrency)))
+    first = reload_settings(**files)
+
+    assert reload_settings(**files) is first and seen == []     # Nothing changed, nothing swapped
+    tmp_path.joinpath('settings.yml').write_text("llm:\n  backend_concurrency: 6\n")
+    assert reload_settings(**files).llm.backend_concurrency == 6
+    assert seen == [(4, 6)]
+
+    tmp_path.joinpath('settings.yml').write_text("llm: [unclosed\n")
+    assert reload_settings(**files).llm.backend_concurrency == 6
+    assert config_settings.get_settings().llm.backend_concurrency == 6 and len(seen) == 1
+
+
+@pytest.mark.parametrize('use_watchdog', [False, True])
+def test_watcher_reloads_on_file_change(files, tmp_path, use_watchdog):
+    reloads = []
+    watcher = SettingsWatcher(files.values(), poll_interval_s=0.05, debounce_s=0.05, use_watchdog=use_watchdog,
+                              reload=lambda: reloads.append(load_settings(**files))).start()
+    try:
+        assert watcher.backend == ('watchdog' if use_watchdog else 'polling')
+        time.sleep(0.1)
+        tmp_path.joinpath('persona.txt').write_text("You are Lumina, edited.")
+        deadline = time.monotonic() + 5
+        while not reloads and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+    assert reloads and reloads[-1].persona == "You are Lumina, edited."
+
+
+def test_modules_take_their_defaults_from_the_settings(files, tmp_path, monkeypatch):
+    from ai_brain.async_llm_client import Backend
+    from database import ingest, local_embedder
+    from pipeline.horoscope_pipeline import build_pipeline
+
+    tmp_path.joinpath('settings.yml').write_text(
+        "llm:\n  backend_concurrency: 5\ngeneration:\n  horoscope_concurrency: 7\nembedding:\n  backend: local\n")
+    reload_settings(**files)
+
+    assert Backend('a', 'http://a/v1', 'model').max_concurrency == 5
+    assert {stage.name: stage.workers for stage in build_pipeline().stages}['llm'] == 7
+
+    class FakeEmbedder:
+        def embed(self, texts):
+            return ['local'] * len(texts)
+
+    monkeypatch.setattr(local_embedder, 'get_local_embedder', FakeEmbedder)
+    assert ingest.embed_texts(['a', 'b']) == ['local', 'local']
+
+
+def test_servers_and_database_are_read_from_the_settings(files, tmp_path, monkeypatch):
+    from ai_brain.async_llm_client import backends_from_env
+    from database.connection import conninfo
+
+    tmp_path.joinpath('.env').write_text("LM_STUDIO_URL=http://gpu-a:1234/v1, http://gpu-b:1234/v1\n"
+                                         "LLM_FALLBACK_URL=https://api.example.com/v1\nOPENAI_API_KEY=sk-test\n"
+                                         "DB_HOST=db.internal:6543\nDB_USER=lumina\nDB_PASSWORD=secret\n")
+    settings = reload_settings(**files)
+    assert settings.llm.ollama_url == 'http://localhost:11434' and settings.api_keys.llm_fallback == 'sk-test'
+    assert 'secret' not in repr(settings) and 'password' not in settings.tuning()['database']
+
+    backends = backends_from_env()
+    assert [b.base_url for b in backends] == ['http://gpu-a:1234/v1', 'http://gpu-b:1234/v1',
+                                              'http://localhost:11434/v1', 'https://api.example.com/v1']
+    assert backends[-1].fallback and backends[-1].client.api_key == 'sk-test'
+    assert conninfo() == "dbname=lumina user=lumina password=secret host=db.internal port=6543"
@@ -0,0 +1,88 @@
+import datetime
+import json
+
+import numpy as np
+import swisseph as swe
+
+from ai_brain.prompts import build_horoscope_prompt
+from data_ingestion import solar_data
+from data_ingestion.solar_data import LONGITUDE, SPEED, get_planet_positions_batch
+
+# Bodies covered by swisseph's built-in Moshier ephemeris (no .se1 files needed)
+PLANETS = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn',
+           'Uranus', 'Neptune', 'Pluto', 'North Node', 'South Node']
+
+
+def test_batch_matches_scalar_calc():
+    jds = 2460000.5 + np.arange(48) / 24.0
+    batch = get_planet_positions_batch(jds, bodies=PLANETS)
+
+    assert batch.values.shape == (48, len(PLANETS), 4)
+    flags = swe.FLG_SWIEPH | swe.FLG_SPEED
+    for t in (0, 17, 47):
+        for b, name in enumerate(PLANETS):
+            if name == 'South Node':
+                continue
+            pos, _ = swe.calc_ut(jds[t], solar_data.BODIES[name], flags)
+            np.testing.assert_allclose(batch.values[t, b], pos[:4])
+
+
+def test_south_node_opposes_north_node():
+    batch = get_planet_positions_batch([2460000.5, 2460100.5], bodies=['South Node'])
+    north = get_planet_positions_batch([2460000.5, 2460100.5], bodies=['North Node'])
+    separation = (batch.values[:, 0, LONGITUDE] - north.values[:, 0, LONGITUDE]) % 360
+    np.testing.assert_allclose(separation, 180)
+    np.testing.assert_array_equal(batch.retrograde, north.retrograde)
+
+
+def test_sign_and_retrograde_columns():
+    jds = solar_data.julian_day_range(datetime.datetime(2024, 1, 1),
+                                      datetime.datetime(2024, 2, 1), step_hours=6)
+    batch = get_planet_positions_batch(jds, bodies=PLANETS)
+
+    signs = batch.signs()
+    for t in range(0, jds.size, 25):
+        for b in range(len(PLANETS)):
+            assert signs[t, b] == solar_data.get_zodiac_sign(batch.values[t, b, LONGITUDE])
+    np.testing.assert_array_equal(batch.retrograde, batch.values[..., SPEED] < 0)
+
+
+def test_sky_views_share_positions_and_aspects():
+    now = datetime.datetime(2024, 5, 6, 15, 10)
+    positions = {
+        'Sun': {'longitude': 46.0, 'degree': 16.0, 'minute': 0.0},
+        'Mars': {'longitude': 346.5, 'degree': 16.5, 'minute': 30.0},
+        'Venus': {'longitude': 45.0, 'degree': 15.0, 'minute': 0.0},
+    }
+    signs = {'Sun': 'Taurus', 'Mars': 'Pisces', 'Venus': 'Taurus'}
+    aspects = [
+        {'body1': 'Sun', 'body2': 'Mars', 'aspect': 'sextile', 'angle': 59.5, 'sign1': 'Taurus', 'sign2': 'Pisces'},
+        {'body1': 'Sun', 'body2': 'Venus', 'aspect': 'conjunction', 'angle': 1.0, 'sign1': 'Taurus', 'sign2': 'Taurus'},
+    ]
+    sky = solar_data.Sky(now, positions, signs, dict.fromkeys(signs, False), aspects)
+
+    aries = sky.view('Aries')
+    assert aries.focus_planet == 'Mars'
+    assert aries.focus_aspects == [aspects[0]]
+    assert sky.view('Taurus').focus_aspect_indices == [1]
+    assert sky.view('Capricorn').focus_aspects == []
+
+    data = sky.to_dict()
+    assert data['aspects'] is aspects
+    assert data['data']['Leo'] == {'zodiac_sign': 'Leo', 'focus_planet': 'Sun',
+                                   'focus_aspects': [0, 1], 'focus_house': None}
+    assert set(data['data']) == set(solar_data.ZODIAC_SIGNS)
+
+
+def test_sky_rebuilt_from_a_snapshot_gives_the_same_prompts():
+    now = datetime.datetime(2024, 5, 6, 15, 10)
+    positions = {'Sun': {'longitude': 46.0, 'degree': 16.0, 'minute': 0.0},
+                 'Mars': {'longitude': 346.5, 'degree': 16.5, 'minute': 30.0}}
+    signs = {'Sun': 'Taurus', 'Mars': 'Pisces'}
+    aspects = [{'body1': 'Sun', 'body2': 'Mars', 'aspect': 'sextile', 'angle': 59.5,
+                'sign1': 'Taurus', 'sign2': 'Pisces'}]
+    sky = solar_data.Sky(now, positions, signs, {'Sun': False, 'Mars': True}, aspects)
+
+    rebuilt = solar_data.Sky.from_dict(json.loads(json.dumps(sky.to_dict())))
+    assert rebuilt.now == now and rebuilt.to_dict() == sky.to_dict()
+    assert build_horoscope_prompt(rebuilt.view('Aries')) == build_horoscope_prompt(sky.view('Aries'))
@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.bench_startup import IMPORT_BUDGETS_MS, parse_importtime, profile_import
+
+
+def test_parse_importtime():
+    rows = parse_importtime("import time: self [us] | cumulative | imported package\n"
+                            "import time:       120 |        120 |     yaml.error\n"
+                            "import time:      2500 |       9000 | yaml\n")
+    assert rows == [('yaml.error', 120, 120, 2), ('yaml', 2500, 9000, 0)]
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS_MS))
+def test_job_modules_import_without_heavy_dependencies(module):
+    rows, heavy = profile_import(module)
+    assert heavy == []
+    assert any(name == module for name, _, _, _ in rows)
@@ -0,0 +1,81 @@
+import asyncio
+
+from ai_brain.tiered_generation import TieredGenerator
+
+SECTIONS = [("One", "First."), ("Two", "Second."), ("Three", "Third.")]
+TIERS = {
+    "caption": {"mode": "small"},
+    "reading": {"mode": "tiered", "sections": SECTIONS},
+    "post": {"mode": "tiered", "persona": True},
+}
+
+
+class FakeOllama:
+    """Drafts 'draft N'; the large model passes every draft except the one for section Two."""
+
+    def __init__(self, rewrite="Rewritten section two."):
+        self.rewrite = rewrite
+        self.calls = []
+        self.closed_early = 0
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        self.calls.append((model, stream, messages))
+        if not stream:
+            return {"message": {"content": f"{model} text {len(self.calls)}"}}
+        review = messages[-1]["content"]
+        reply = self.rewrite if "small text" in review and 'section "Two"' in messages[-2]["content"] \
+            else "PASS and some trailing words the model never gets to decode"
+        return self._stream(reply)
+
+    async def _stream(self, reply):
+        try:
+            for word in reply.split(" "):
+                yield {"message": {"content": word + " "}, "done": False}
+            yield {"message": {"content": ""}, "done": True}
+        except GeneratorExit:
+            self.closed_early += 1
+            raise
+
+
+def generator(client):
+    return TieredGenerator(draft_model="small", large_model="large", tiers=TIERS, persona="You are Lumina.",
+                           client=client)
+
+
+def test_small_only_content_skips_the_large_model():
+    client = FakeOllama()
+    result = asyncio.run(generator(client).generate("caption", "Write a caption."))
+    assert result["mode"] == "small"
+    assert [call[0] for call in client.calls] == ["small"]
+
+
+def test_sections_are_verified_and_rewritten():
+    client = FakeOllama()
+    result = asyncio.run(generator(client).generate("reading", "Read the sky."))
+    assert [s["accepted"] for s in result["sections"]] == [True, False, True]
+    assert result["accepted"] == 2 and result["rewritten"] == 1
+    assert "Rewritten section two." in result["text"]
+    assert result["text"].startswith("One\n\nsmall text 1")
+    assert client.closed_early == 2
+    # Later sections are drafted after the accepted text of the earlier ones
+    assert "Rewritten section two." in client.calls[-2][2][-2]["content"]
+
+
+def test_rewrite_starting_with_pass_letters_is_not_a_pass():
+    client = FakeOllama(rewrite="Passionate new take on section two.")
+    result = asyncio.run(generator(client).generate("reading", "Read the sky."))
+    assert [s["accepted"] for s in result["sections"]] == [True, False, True]
+    assert "Passionate new take on section two." in result["text"]
+
+
+def test_persona_gate_and_large_baseline():
+    client = FakeOllama()
+    asyncio.run(generator(client).generate("post", "Write a post."))
+    review = client.calls[-1][2]
+    assert review[0] == {"role": "system", "content": "You are Lumina."}
+    assert "persona" in review[-1]["content"]
+
+    client = FakeOllama()
+    result = asyncio.run(generator(client).generate("reading", "Read the sky.", mode="large"))
+    assert {call[0] for call in client.calls} == {"large"} and len(client.calls) == len(SECTIONS)
+    assert "sections" not in result
@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+
+from database.work_queue import WorkQueue, backoff_seconds, file_sha256
+from planets.horoscope_batch import generate_sign
+
+
+class RecordingConnection:
+    def __init__(self, rows=(), rowcount=1):
+        self.rows = list(rows)
+        self.rowcount = rowcount
+        self.calls = []
+
+    def execute(self, query, params=None, prepare=None):
+        self.calls.append((query, params))
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        yield self.conn
+
+
+def test_backoff_doubles_up_to_the_cap():
+    assert [backoff_seconds(n, base=30, maximum=200) for n in (1, 2, 3, 4)] == [30, 60, 120, 200]
+
+
+def test_claim_skips_rows_locked_by_other_workers():
+    conn = RecordingConnection([(1, '2025-05-06', 'Aries', 'horoscope', {'time_utc': 'x'}, 1, 4)])
+    queue = WorkQueue(pool=FakePool(conn), worker_id='host-a:1', lease_s=600)
+    items = queue.claim(['horoscope'], limit=3)
+
+    query, params = conn.calls[0]
+    assert 'FOR UPDATE SKIP LOCKED' in query
+    assert params == ('host-a:1', ['horoscope'], 600.0, 3)
+    assert items == [{'id': 1, 'date': '2025-05-06', 'sign': 'Aries', 'stage': 'horoscope',
+                      'payload': {'time_utc': 'x'}, 'attempts': 1, 'max_attempts': 4}]
+
+
+def test_fail_backs_off_then_gives_up():
+    conn = RecordingConnection()
+    queue = WorkQueue(pool=FakePool(conn), worker_id='w', backoff_base_s=10)
+    item = {'id': 5, 'sign': 'Leo', 'stage': 'horoscope', 'attempts': 2, 'max_attempts': 3}
+    queue.fail(item, 'timeout')
+    queue.fail({**item, 'attempts': 3}, 'timeout')
+    assert [params[:3] for _, params in conn.calls] == [('pending', 'timeout', 20), ('failed', 'timeout', 0.0)]
+
+
+def test_complete_hashes_the_artifact_and_verify_requeues_changed_files(tmp_path):
+    artifact = tmp_path / 'Aries.json'
+    artifact.write_text("Mercury is fine, actually.")
+    conn = RecordingConnection()
+    queue = WorkQueue(pool=FakePool(conn), worker_id='w')
+    queue.complete({'id': 1, 'sign': 'Aries', 'stage': 'horoscope'}, artifact=str(artifact))
+    assert conn.calls[0][1] == (str(artifact), file_sha256(str(artifact)), 1, 'w')
+
+    done = [(1, 'Aries', 'horoscope', str(artifact), file_sha256(str(artifact))),
+            (2, 'Leo', 'horoscope', str(tmp_path / 'Leo.json'), 'abc')]
+    conn = RecordingConnection(done)
+    assert WorkQueue(pool=FakePool(conn)).verify('2025-05-06') == 1
+    assert conn.calls[-1][1] == (2,)
+    artifact.write_text("Edited")
+    assert WorkQueue(pool=FakePool(RecordingConnection(done[:1]))).verify('2025-05-06') == 1
+
+
+class OneLineClient:
+    async def generate(self, **kwargs):
+        async def stream():
+            yield {'response': 'Fresh reading.', 'done': True}
+        return stream()
+
+
+def test_changed_artifact_is_moved_aside_so_the_worker_regenerates_it(tmp_path):
+    artifact = tmp_path / 'Aries.json'
+    artifact.write_text("Original")
+    done = [(1, 'Aries', 'horoscope', str(artifact), file_sha256(str(artifact)))]
+    artifact.write_text("Tampered")
+
+    assert WorkQueue(pool=FakePool(RecordingConnection(done))).verify('2025-05-06') == 1
+    assert not artifact.exists() and (tmp_path / 'Aries.json.stale').read_text() == "Tampered"
+    result = asyncio.run(generate_sign(OneLineClient(), asyncio.Semaphore(1), 'Aries', 'prompt', str(artifact)))
+    assert result['status'] == 'generated' and artifact.read_text() == "Fresh reading."
+
+
+def test_retry_failed_resets_exhausted_items():
+    conn = RecordingConnection(rowcount=2)
+    assert WorkQueue(pool=FakePool(conn)).retry_failed('2025-05-06') == 2
+    query, params = conn.calls[0]
+    assert "status = 'failed'" in query and "attempts = 0" in query and params == ('2025-05-06',)